@@ -0,0 +1,133 @@
+"""원시 캡처 오버헤드 벤치마크 (로컬 pty 쌍 사용, Linux/macOS)
+
+사용법:
+    python benchmarks/bench_capture.py [--seconds 5] [--baud 921600] [--slice-ms 1]
+
+921600 baud 속도로 pty에 데이터를 흘려보내면서 SerialReader 리더 스레드의 CPU 사용률을
+캡처 없음/캡처 있음으로 비교하고, 캡처 파일의 시각 탐색 및 텍스트/CSV 변환 시간을 잰다.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serial.core.capture import (CaptureReader, CaptureWriter,  # noqa: E402
+                                     export_csv, export_text)
+from thread_reader import SerialReader  # noqa: E402
+from bench_serial_reader import open_pty_pair  # noqa: E402
+
+
+def paced_writer(master, baud, seconds, slice_ms, stop):
+    """baud 속도(10 bit/byte)에 맞춰 slice_ms 간격으로 조금씩 전송"""
+    bytes_per_slice = max(1, int(baud / 10 * slice_ms / 1000))
+    line = b'I (12345) wifi: sta connected, rssi -42, channel 6, ip 192.168.0.10\n'
+    data = line * (bytes_per_slice // len(line) + 2)
+    start = time.perf_counter()
+    offset = 0
+    sent = 0
+    while time.perf_counter() - start < seconds:
+        chunk = data[offset:offset + bytes_per_slice]
+        offset = (offset + bytes_per_slice) % len(line)
+        sent += os.write(master, chunk)
+        # 누적 전송량 기준으로 다음 전송 시각 계산
+        delay = start + sent / (baud / 10) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    stop.set()
+    return sent
+
+
+def run_case(name, capture, args):
+    master, port = open_pty_pair()
+    reader = SerialReader(port)
+    if capture is not None:
+        reader.set_capture(capture, 'bench')
+    stop = threading.Event()
+    result = {'bytes': 0}
+
+    def read_loop():
+        start_cpu = time.thread_time()
+        while not (stop.is_set() and not port.in_waiting):
+            result['bytes'] += len(reader.read_chunk(0.05))
+        result['cpu'] = time.thread_time() - start_cpu
+
+    thread = threading.Thread(target=read_loop)
+    thread.start()
+    start = time.perf_counter()
+    paced_writer(master, args.baud, args.seconds, args.slice_ms, stop)
+    thread.join()
+    elapsed = time.perf_counter() - start
+    port.close()
+    os.close(master)
+
+    cpu_percent = result['cpu'] / elapsed * 100
+    print(f"{name:10} {result['bytes']:>10,} bytes  {result['bytes'] / elapsed / 1024:8.1f} KiB/s  "
+          f"reader CPU {cpu_percent:5.2f} %")
+    return cpu_percent
+
+
+def micro_write(path, chunk_size, count):
+    """리더 없이 CaptureWriter.write 자체 비용 측정"""
+    capture = CaptureWriter(path)
+    port_id = capture.port_id('bench')
+    chunk = os.urandom(chunk_size)
+    start = time.perf_counter()
+    for _ in range(count):
+        capture.write(port_id, chunk)
+    capture.close()
+    elapsed = time.perf_counter() - start
+    print(f"write {chunk_size:>5} B chunks  {elapsed / count * 1e9:8.0f} ns/record  "
+          f"{chunk_size * count / elapsed / 1024 / 1024:8.1f} MiB/s")
+
+
+def main():
+    if os.name != 'posix':
+        print("pty 벤치마크는 Linux/macOS에서만 실행 가능합니다.")
+        return 1
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--baud', type=int, default=921600)
+    parser.add_argument('--slice-ms', type=float, default=1.0,
+                        help='전송 간격 (작을수록 청크가 작아지고 레코드 수가 늘어남)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.scap')
+
+        print("== CaptureWriter ==")
+        micro_write(os.path.join(directory, 'micro.scap'), 64, 200000)
+        micro_write(os.path.join(directory, 'micro.scap'), 4096, 50000)
+
+        print(f"== Reader CPU at {args.baud} baud ==")
+        baseline = run_case('no capture', None, args)
+        capture = CaptureWriter(path)
+        captured = run_case('capture', capture, args)
+        capture.close()
+        print(f"capture overhead {captured - baseline:+.2f} % of one core  "
+              f"({capture.records:,} records, {os.path.getsize(path):,} bytes on disk)")
+
+        print("== Reading ==")
+        reader = CaptureReader(path)
+        middle = reader.start_ns + int(args.seconds / 2 * 1e9)
+        start = time.perf_counter()
+        first = next(reader.records(start_ns=middle), None)
+        print(f"seek to t+{args.seconds / 2:.1f}s  {(time.perf_counter() - start) * 1e3:8.2f} ms  "
+              f"(found record at t+{(first.timestamp_ns - reader.start_ns) / 1e9:.3f}s)"
+              if first else "seek: no record")
+        for name, export in (('text', export_text), ('csv', export_csv)):
+            out_path = os.path.join(directory, f'bench.{name}')
+            start = time.perf_counter()
+            export(reader, out_path)
+            print(f"export {name:4}  {time.perf_counter() - start:8.2f} s  "
+                  f"{os.path.getsize(out_path):,} bytes")
+        reader.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
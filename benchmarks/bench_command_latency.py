@@ -0,0 +1,181 @@
+"""장치 셸 명령 지연 벤치마크: 글자 단위 1ms 전송 vs 청크 단위 전송 (로컬 pty, Linux/macOS)
+
+사용법:
+    python benchmarks/bench_command_latency.py [--fifo 16] [--service-ms 1] [--rounds 20]
+    python benchmarks/bench_command_latency.py --sleep-granularity 15.6   # Windows 타이머 해상도 흉내
+
+pty 반대편에 수신 FIFO가 fifo 바이트인 가상 장치를 두고, 장치 펌웨어가 service-ms 마다
+FIFO를 비운다고 가정한다 (그 사이에 FIFO보다 많이 들어오면 넘친 바이트는 버려짐).
+모델 정보 쓰기 + 다시 읽어 확인하는 과정을 다음 방식으로 비교한다.
+- legacy: 기존 QCManagementDialog 방식 (글자마다 write/flush/sleep 1ms, 0.1초 대기, readline)
+- paced:  CommandEngine + 장치 프로필 (쓰기/읽기 명령 파이프라이닝)
+- calibrated: CommandEngine.calibrate()로 측정한 프로필
+"""
+import argparse
+import os
+import select
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serial.core.broker import port_broker  # noqa: E402
+from src.serial.core.pacing import PROFILES  # noqa: E402
+from src.serial.core.protocol import CommandEngine, parse_fields  # noqa: E402
+from bench_serial_reader import open_pty_pair  # noqa: E402
+
+READ_COMMAND = "db r model"
+READ_END = "serial_number ="
+
+
+class FakeDevice(threading.Thread):
+    """수신 FIFO가 작은 장치 셸 흉내 (에코, db r/w model 명령 처리)"""
+
+    def __init__(self, master, fifo_size, service_ms):
+        super().__init__(daemon=True)
+        self.master = master
+        self.fifo_size = fifo_size
+        self.service = service_ms / 1000
+        self.overrun_bytes = 0
+        self.model = ('EVS', 'EVSCA000000')
+        self._line = b''
+        self._stop_event = threading.Event()
+        os.set_blocking(master, False)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            time.sleep(self.service)  # 펌웨어가 FIFO를 비우는 주기
+            try:
+                data = os.read(self.master, 4096)
+            except (BlockingIOError, OSError):
+                continue
+            if len(data) > self.fifo_size:
+                self.overrun_bytes += len(data) - self.fifo_size
+                data = data[:self.fifo_size]
+            self._send(data)  # 에코
+            self._line += data
+            while b'\n' in self._line:
+                line, self._line = self._line.split(b'\n', 1)
+                self._execute(line.strip().decode('utf-8', errors='replace'))
+
+    def _execute(self, line):
+        parts = line.split()
+        if parts[:3] == ['db', 'r', 'model']:
+            self._send(f"model_name = {self.model[0]}\r\n"
+                       f"serial_number = {self.model[1]}\r\n> ".encode())
+        elif parts[:3] == ['db', 'w', 'model'] and len(parts) == 6:
+            self.model = (parts[4], parts[5])
+            self._send(b"OK\r\n> ")
+        elif parts:
+            self._send(b"unknown command\r\n> ")
+
+    def _send(self, data):
+        while data:
+            try:
+                data = data[os.write(self.master, data):]
+            except BlockingIOError:
+                select.select([], [self.master], [], 0.1)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def legacy_round(port, model, serial_number, granularity):
+    """기존 방식: 글자 단위 전송 → 0.1초 대기 → 읽기 명령 → readline 대기"""
+    command = f"db w model 1 {model} {serial_number}\r\n"
+    for char in command:
+        port.write(char.encode('utf-8'))
+        port.flush()
+        time.sleep(max(0.001, granularity))
+    time.sleep(0.1)
+    port.reset_input_buffer()
+    port.write(f"{READ_COMMAND}\r\n".encode())
+    response = []
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline:
+        line = port.readline().decode('utf-8', errors='ignore')
+        response.append(line.strip())
+        if READ_END in line:
+            break
+    return parse_fields(response)
+
+
+def paced_round(engine, model, serial_number):
+    """CommandEngine: 쓰기/읽기 명령을 파이프라이닝 (응답 한 번 왕복)"""
+    futures = engine.send_many([(f"db w model 1 {model} {serial_number}", None),
+                                (READ_COMMAND, READ_END)])
+    return parse_fields(futures[-1].result(5).lines)
+
+
+def measure(name, rounds, run_round):
+    times = []
+    failures = 0
+    for i in range(rounds):
+        model, serial_number = 'M%02d' % (i % 100), 'EVSCA%06d' % i
+        start = time.perf_counter()
+        try:
+            fields = run_round(model, serial_number)
+        except Exception:
+            fields = {}
+        times.append(time.perf_counter() - start)
+        if fields.get('model_name') != model or fields.get('serial_number') != serial_number:
+            failures += 1
+    print(f"{name:28} median {statistics.median(times) * 1000:8.1f} ms  "
+          f"max {max(times) * 1000:8.1f} ms  failures {failures}/{rounds}")
+    return statistics.median(times)
+
+
+def main():
+    if os.name != 'posix':
+        print("pty 벤치마크는 Linux/macOS에서만 실행 가능합니다.")
+        return 1
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fifo', type=int, default=16, help='가상 장치 수신 FIFO 크기(바이트)')
+    parser.add_argument('--service-ms', type=float, default=1.0, help='가상 장치 FIFO 처리 주기')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--sleep-granularity', type=float, default=0.0,
+                        help='legacy 방식의 sleep 최소 단위(ms, Windows 기본 타이머는 약 15.6)')
+    args = parser.parse_args()
+
+    master, port = open_pty_pair()
+    port.baudrate = args.baud
+    device = FakeDevice(master, args.fifo, args.service_ms)
+    device.start()
+
+    print(f"== fifo {args.fifo} B, service {args.service_ms} ms, {args.baud} baud ==")
+    legacy = measure('legacy (char + 1 ms sleep)', args.rounds,
+                     lambda m, s: legacy_round(port, m, s, args.sleep_granularity / 1000))
+
+    engine = CommandEngine(port_broker().attach(port))
+    results = {}
+    for name in ('legacy', 'default', 'esp32'):
+        engine.profile = PROFILES[name]
+        results[name] = measure(f"paced ({name} profile)", args.rounds,
+                                lambda m, s: paced_round(engine, m, s))
+
+    start = time.perf_counter()
+    # 가상 장치는 앞쪽 공백을 무시하므로 FIFO보다 긴 시험 명령으로 측정
+    profile = engine.calibrate(READ_COMMAND, READ_END, probe_size=64).result(120)
+    print(f"calibrate  {time.perf_counter() - start:8.2f} s  -> {profile}")
+    if profile is not None:
+        engine.profile = profile
+        results['calibrated'] = measure('paced (calibrated)', args.rounds,
+                                        lambda m, s: paced_round(engine, m, s))
+
+    best = min(results.values())
+    print(f"speedup vs legacy {legacy / best:6.1f}x  (device overrun bytes {device.overrun_bytes:,})")
+
+    engine.close()
+    port_broker().close(port)
+    device.stop()
+    os.close(master)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
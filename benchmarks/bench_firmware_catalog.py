@@ -0,0 +1,97 @@
+"""펌웨어 카탈로그 벤치마크 (작업마다 읽기/해시/구간 나누기 vs 카탈로그 조회)
+
+사용법:
+    python benchmarks/bench_firmware_catalog.py [--jobs 16]
+
+config 폴더를 임시 디렉터리에 복사해 카탈로그를 처음 만들 때(콜드)와 다시 열 때(웜)
+시간을 재고, STM32 다운로드 작업 하나가 sparse 이미지를 준비하는 비용을 비교한다.
+기존 방식은 보드마다 파일을 읽고 MD5를 계산하고 0xFF 페이지를 찾아 구간을 나누며,
+카탈로그 방식은 경로 조회 + stat 한 번으로 해시를 얻어 이미 나눈 구간을 꺼낸다.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.controllers.stm_image import PAGE_SIZE, SparseImage  # noqa: E402
+from src.models.firmware_catalog import CONFIG_PATH, FirmwareCatalog  # noqa: E402
+
+
+def prepare_direct(paths, directory):
+    """카탈로그 없이 작업 하나가 하던 준비 (읽기 + MD5 + 구간 나누기)"""
+    for path in paths:
+        with open(path, 'rb') as f:
+            SparseImage(f.read(), PAGE_SIZE, directory=directory)
+
+
+def prepare_catalog(catalog, paths, cache):
+    """카탈로그로 작업 하나가 하는 준비 (조회 + 해시로 캐시된 SparseImage 찾기)"""
+    for path in paths:
+        entry = catalog.entry(path)
+        if entry.sha256 not in cache:
+            cache[entry.sha256] = SparseImage(entry.read(), PAGE_SIZE, entry.sha256,
+                                              os.path.join(entry.object_dir, 'segments'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=16, help="다운로드 작업(보드) 수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_catalog_') as workdir:
+        config = os.path.join(workdir, 'config')
+        shutil.copytree(CONFIG_PATH / 'esp', os.path.join(config, 'esp'))
+        shutil.copytree(CONFIG_PATH / 'stm', os.path.join(config, 'stm'))
+
+        start = time.perf_counter()
+        catalog = FirmwareCatalog(config)
+        catalog.refresh()
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        catalog = FirmwareCatalog(config)
+        catalog.refresh()
+        warm = time.perf_counter() - start
+
+        entries = catalog.entries()
+        total = sum(entry.size for entry in entries)
+        print(f"{len(entries)} images, {total // 1024} KB")
+        print(f"catalog build (cold): {cold * 1000:8.1f} ms")
+        print(f"catalog open  (warm): {warm * 1000:8.1f} ms")
+
+        paths = [os.path.join(config, 'stm', 'AC', 'stm32AC.bin'),
+                 os.path.join(config, 'stm', 'DC', 'stm32DC.bin')]
+        start = time.perf_counter()
+        for _ in range(args.jobs):
+            prepare_direct(paths, os.path.join(workdir, 'direct'))
+        direct = (time.perf_counter() - start) / args.jobs
+
+        cache = {}
+        start = time.perf_counter()
+        for _ in range(args.jobs):
+            prepare_catalog(catalog, paths, cache)
+        cached = (time.perf_counter() - start) / args.jobs
+
+        print(f"STM job prepare, direct : {direct * 1000:8.1f} ms/board")
+        print(f"STM job prepare, catalog: {cached * 1000:8.3f} ms/board")
+
+        ac_firmware = os.path.join(config, 'stm', 'AC', 'stm32AC.bin')
+        start = time.perf_counter()
+        for _ in range(1000):
+            os.path.exists(ac_firmware)
+        exists = (time.perf_counter() - start) / 1000
+        start = time.perf_counter()
+        for _ in range(1000):
+            catalog.exists(ac_firmware)
+        lookup = (time.perf_counter() - start) / 1000
+        print(f"firmware check, os.path.exists: {exists * 1e6:6.2f} us")
+        print(f"firmware check, catalog.exists: {lookup * 1e6:6.2f} us")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""모니터링 경로 벤치마크: pty 재생 → 포트 브로커 → LogViewer (Linux/macOS)
+
+사용법:
+    python benchmarks/bench_monitor.py                      # 합성 로그 폭주 (최대 속도)
+    python benchmarks/bench_monitor.py --source log/x.scap --speed 10
+    python benchmarks/bench_monitor.py --json result.json --baseline previous.json
+
+수신 속도(lines/s, MiB/s), GUI 이벤트 루프 지연(10ms 타이머 기준 p50/p99/max),
+메모리(RSS 최대/종료 시)를 출력한다. --baseline을 주면 이전 결과와 비교해
+--tolerance 이상 나빠진 항목이 있을 때 종료 코드 1을 반환한다.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serial  # noqa: E402
+from PyQt5.QtCore import QElapsedTimer, QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from src.serial.core.broker import port_broker  # noqa: E402
+from src.serial.core.replay import PtyReplay, open_source  # noqa: E402
+from src.ui.components.log_viewer import LogViewer  # noqa: E402
+
+TICK_MS = 10
+
+# 값이 클수록 좋은 항목 (나머지는 작을수록 좋음)
+HIGHER_IS_BETTER = {'lines_per_sec', 'mib_per_sec'}
+
+
+def make_storm(path, line_count):
+    """ESP-IDF 스타일 로그 폭주 (ANSI 색상/한글 포함)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(line_count):
+            if i % 50 == 0:
+                f.write(f"\x1b[31mE ({i}) app: 오류 발생 code={i % 7}\x1b[0m\n")
+            else:
+                f.write(f"I ({i}) wifi: sta rssi -{40 + i % 30}, channel {i % 13 + 1}, "
+                        f"heap {200000 - i % 5000}\n")
+
+
+def rss_mib():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        return 0.0
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(args, source_path):
+    app = QApplication.instance() or QApplication([])
+    viewer = LogViewer()
+    viewer.resize(900, 600)
+    viewer.show()
+
+    replay = PtyReplay(open_source(source_path, args.port),
+                       speed=args.speed, baud=args.baud)
+    port = serial.Serial(replay.port_name, timeout=1)
+    viewer.start_monitoring(port)
+
+    # 이벤트 루프 지연: 10ms 타이머가 실제로 얼마나 늦게 호출되는지 측정
+    lags = []
+    clock = QElapsedTimer()
+    clock.start()
+    last = [clock.nsecsElapsed()]
+
+    def tick():
+        now = clock.nsecsElapsed()
+        lags.append(max(0.0, (now - last[0]) / 1e6 - TICK_MS))
+        last[0] = now
+
+    timer = QTimer()
+    timer.setInterval(TICK_MS)
+    timer.timeout.connect(tick)
+    timer.start()
+
+    rss_start = rss_mib()
+    peak_rss = rss_start
+    start = time.perf_counter()
+    replay.start()
+
+    # 재생이 끝나고 수신 줄 수가 더 이상 늘지 않을 때까지 실행
+    last_count = -1
+    stable_since = None
+    while time.perf_counter() - start < args.timeout:
+        app.processEvents()
+        time.sleep(0.001)
+        peak_rss = max(peak_rss, rss_mib())
+        if replay.is_alive():
+            continue
+        count = viewer.log_buffer.total_lines
+        if count != last_count:
+            last_count = count
+            stable_since = time.perf_counter()
+        elif time.perf_counter() - stable_since > 0.5:
+            break
+    elapsed = stable_since - start if stable_since else time.perf_counter() - start
+
+    timer.stop()
+    stats = viewer.get_delivery_stats()
+    lines = viewer.log_buffer.total_lines
+    viewer.stop_monitoring()
+    port_broker().close(port)
+    replay.stop()
+    viewer.shutdown()
+
+    return {
+        'lines': lines,
+        'bytes': replay.bytes_sent,
+        'elapsed_s': round(elapsed, 3),
+        'lines_per_sec': round(lines / elapsed, 1),
+        'mib_per_sec': round(replay.bytes_sent / elapsed / 1024 / 1024, 3),
+        'lag_p50_ms': round(percentile(lags, 0.5), 2),
+        'lag_p99_ms': round(percentile(lags, 0.99), 2),
+        'lag_max_ms': round(max(lags, default=0.0), 2),
+        'rss_peak_mib': round(peak_rss, 1),
+        'rss_growth_mib': round(peak_rss - rss_start, 1),
+        'maxrss_mib': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'replay_max_lag_ms': round(replay.max_lag * 1000, 1),
+        'delivery': stats,
+    }
+
+
+def compare(result, baseline, tolerance, lag_slack_ms):
+    """이전 결과 대비 tolerance(비율) 이상 나빠진 항목 목록
+
+    이벤트 루프 지연은 값이 작아 흔들림이 크므로 lag_slack_ms 이상 늘어난 경우만 본다.
+    """
+    regressions = []
+    for key, value in result.items():
+        old = baseline.get(key)
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+            continue
+        change = (value - old) / old
+        if key in HIGHER_IS_BETTER:
+            change = -change
+        if key.startswith(('lag_', 'rss_')) or key in HIGHER_IS_BETTER:
+            print(f"  {key:16} {old:>12} -> {value:>12}  ({change * 100:+.1f} % worse)")
+            if key.startswith('lag_') and value - old <= lag_slack_ms:
+                continue
+            if change > tolerance:
+                regressions.append(key)
+    return regressions
+
+
+def main():
+    if os.name != 'posix':
+        print("pty 벤치마크는 Linux/macOS에서만 실행 가능합니다.")
+        return 1
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--source', help='재생할 텍스트 로그 또는 .scap (없으면 합성 로그)')
+    parser.add_argument('--lines', type=int, default=300000, help='합성 로그 줄 수')
+    parser.add_argument('--speed', type=float, default=0,
+                        help='재생 배속 (0 = 최대 속도, 기본)')
+    parser.add_argument('--baud', type=int, default=921600, help='텍스트 로그 재생 속도')
+    parser.add_argument('--port', help='.scap에서 재생할 포트 이름')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--json', help='결과를 JSON으로 저장')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='회귀로 판단할 악화 비율 (기본 0.2 = 20%%)')
+    parser.add_argument('--lag-slack-ms', type=float, default=20.0,
+                        help='이벤트 루프 지연 회귀 판단 시 무시할 절대 증가량 (ms)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = args.source
+        if source_path is None:
+            source_path = os.path.join(directory, 'storm.log')
+            make_storm(source_path, args.lines)
+        result = run(args, source_path)
+
+    for key, value in result.items():
+        print(f"{key:18} {value}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("== Baseline ==")
+        regressions = compare(result, baseline, args.tolerance, args.lag_slack_ms)
+        if regressions:
+            print(f"회귀: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
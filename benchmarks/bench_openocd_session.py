@@ -0,0 +1,307 @@
+"""STM32 연속 다운로드 벤치마크: 보드마다 OpenOCD 새 프로세스 vs 떠 있는 서버 재사용 (TCL RPC)
+
+사용법:
+    python benchmarks/bench_openocd_session.py [--boards 10] [--startup 0.8] [--flash 0.5]
+    python benchmarks/bench_openocd_session.py --disconnect 3 --wedge 6   # 보드 교체/서버 멈춤 흉내
+    python benchmarks/bench_openocd_session.py --differential --size 512  # 차등 플래시 비교
+    python benchmarks/bench_openocd_session.py --sparse config/stm/AC/stm32AC.bin  # 0xFF 구간 건너뛰기
+
+실제 OpenOCD/ST-Link 대신 가짜 OpenOCD 프로세스(이 스크립트의 --serve)를 띄운다.
+가짜 서버는 시작할 때 startup초(설정 파싱, 어댑터 초기화)를 쓰고, TCL RPC(0x1a 구분)로
+reset init / flash write_image / verify_image(_checksum) / reset run 명령을 받는다.
+플래시 내용은 파일로 흉내 내며, 이미지 전체(size KB)를 쓰는 데 flash초의 80%,
+CRC 검증에 20%가 걸리도록 바이트 수에 비례해 대기한다.
+- oneshot: 기존 방식, 보드마다 프로세스를 띄워 쓰고 종료 (startup + flash)
+- session: OpenOCDSession, 서버를 한 번 띄워 두고 보드마다 RPC 명령만 보냄
+--disconnect N은 N번째 보드에서 reset init을 한 번 실패시키고(보드 미연결),
+--wedge N은 N번째 보드에서 서버가 응답을 멈춰 세션이 서버를 다시 띄우는지 확인한다.
+--differential은 이미 펌웨어가 들어 있는 보드(일부 섹터만 다름)를 전체/차등으로 다시 쓴다.
+--sparse는 0xFF로 채운 이미지를 전체로 쓸 때와 코드 구간만 쓸 때를 비교한다.
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.controllers.openocd_session import (OpenOCDSession, RPC_TERMINATOR,  # noqa: E402
+                                             TargetNotConnected)
+
+CAPTURE = re.compile(r'capture \{(.*)\}\} _r')
+FILE_ARGS = re.compile(r'\{(.+?)\}\s*(0x[0-9a-fA-F]+)?')
+FLASH_BASE = 0x08000000
+FLASH_SIZE = 0x80000
+SECTOR_SIZE = 0x800
+ERASE_TIME = 0.1  # 바이트당 쓰기 시간 대비 지우기 시간 (지우기는 SWD 전송 없이 칩 안에서 처리)
+COMMAND_LATENCY = 0.002  # RPC 왕복 + 어댑터 명령 처리
+
+
+class FakeFlash:
+    """파일로 저장하는 타깃 플래시 (서버를 다시 띄워도 내용 유지)"""
+
+    def __init__(self, path, write_time, verify_time):
+        self.path = path
+        self.write_time = write_time    # 바이트당 지우기+쓰기 시간
+        self.verify_time = verify_time  # 바이트당 CRC 시간
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(b'\xff' * FLASH_SIZE)
+
+    def _args(self, command):
+        match = FILE_ARGS.search(command)
+        with open(match.group(1), 'rb') as f:
+            data = f.read()
+        return data, int(match.group(2), 16) - FLASH_BASE if match.group(2) else 0
+
+    def write(self, command):
+        data, offset = self._args(command)
+        start = offset // SECTOR_SIZE * SECTOR_SIZE
+        end = -(-(offset + len(data)) // SECTOR_SIZE) * SECTOR_SIZE
+        time.sleep((end - start) * self.write_time)
+        with open(self.path, 'r+b') as f:
+            f.seek(start)
+            f.write(b'\xff' * (end - start))  # 섹터 단위로 지운 뒤 쓰기
+            f.seek(offset)
+            f.write(data)
+        return f"wrote {len(data)} bytes from file"
+
+    def erase(self, command):
+        address, size = (int(value, 16) for value in command.split()[-2:])
+        start = (address - FLASH_BASE) // SECTOR_SIZE * SECTOR_SIZE
+        end = -(-(address - FLASH_BASE + size) // SECTOR_SIZE) * SECTOR_SIZE
+        time.sleep((end - start) * self.write_time * ERASE_TIME)
+        with open(self.path, 'r+b') as f:
+            f.seek(start)
+            f.write(b'\xff' * (end - start))
+        return "erased sectors"
+
+    def verify(self, command):
+        data, offset = self._args(command)
+        time.sleep(len(data) * self.verify_time)
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            if f.read(len(data)) != data:
+                return "ERROR: checksum mismatch - attempting binary compare"
+        return f"verified {len(data)} bytes"
+
+
+def serve(port, startup, flash, size, disconnect, wedge, state_path):
+    """가짜 OpenOCD: startup초 후 TCL RPC 포트를 열고 명령 처리"""
+    time.sleep(startup)
+    memory = FakeFlash(state_path + '.flash', flash * 0.8 / size, flash * 0.2 / size)
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('127.0.0.1', port))
+    server.listen(1)
+    print("Info : Listening on port %d for tcl connections" % port, flush=True)
+
+    def board_count(increment=0):
+        # 서버를 다시 띄워도 보드 번호가 이어지도록 파일에 저장
+        count = int(open(state_path).read() or 0) if os.path.exists(state_path) else 0
+        if increment:
+            count += increment
+            with open(state_path, 'w') as f:
+                f.write(str(count))
+        return count
+
+    while True:
+        conn, _ = server.accept()
+        buffer = b''
+        while True:
+            data = conn.recv(4096)
+            if not data:
+                break
+            buffer += data
+            while RPC_TERMINATOR in buffer:
+                request, _, buffer = buffer.partition(RPC_TERMINATOR)
+                match = CAPTURE.search(request.decode())
+                command = match.group(1) if match else request.decode()
+                response = ""
+                time.sleep(COMMAND_LATENCY)
+                if command == "shutdown":
+                    conn.sendall(b"shutdown command invoked" + RPC_TERMINATOR)
+                    return
+                if command == "version":
+                    response = "Open On-Chip Debugger 0.12.0 (fake)"
+                elif command == "flash info 0":
+                    response = (f"#0 : stm32l4x at {FLASH_BASE:#010x}, size {FLASH_SIZE:#010x}\n"
+                                f"\t#  0: 0x00000000 ({SECTOR_SIZE:#x} {SECTOR_SIZE // 1024}kB) "
+                                f"not protected")
+                elif command == "reset init":
+                    board = board_count(1)
+                    if board == disconnect:
+                        response = "ERROR: Error: init mode failed (unable to connect to the target)"
+                elif command.startswith(("flash write_image", "verify_image")):
+                    wedged = state_path + '.wedged'  # 다시 띄운 서버에서는 멈추지 않도록
+                    if board_count() == wedge and not os.path.exists(wedged):
+                        open(wedged, 'w').close()
+                        time.sleep(3600)
+                    if command.startswith("flash"):
+                        response = memory.write(command)
+                    else:
+                        response = memory.verify(command)
+                elif command.startswith("flash erase_address"):
+                    response = memory.erase(command)
+                conn.sendall(response.encode() + RPC_TERMINATOR)
+        conn.close()
+
+
+def run_oneshot(args):
+    """보드마다 가짜 OpenOCD 프로세스를 띄우고 종료될 때까지 대기"""
+    command = [sys.executable, os.path.abspath(__file__), '--oneshot',
+               '--startup', str(args.startup), '--flash', str(args.flash)]
+    times = []
+    for _ in range(args.boards):
+        start = time.monotonic()
+        subprocess.run(command, check=True)
+        times.append(time.monotonic() - start)
+    return times
+
+
+def open_session(args, state_path, disconnect=0, wedge=0):
+    command = [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(args.port),
+               '--startup', str(args.startup), '--flash', str(args.flash),
+               '--size', str(args.size), '--disconnect', str(disconnect), '--wedge', str(wedge),
+               '--state', state_path]
+    session = OpenOCDSession(command, port=args.port, name='fake')
+    session.FLASH_TIMEOUT = max(2.0, args.flash * 4)  # 멈춘 서버를 빨리 알아채도록
+    return session
+
+
+def run_session(args, firmware, state_path):
+    session = open_session(args, state_path, args.disconnect, args.wedge)
+    times, saved, failures = [], [], 0
+    try:
+        for board in range(1, args.boards + 1):
+            start = time.monotonic()
+            try:
+                report = session.flash(firmware, FLASH_BASE)
+            except TargetNotConnected:
+                failures += 1
+                print(f"  board {board}: target not connected, retrying")
+                report = session.flash(firmware, FLASH_BASE)
+            times.append(time.monotonic() - start)
+            saved.append(report.saved)
+    finally:
+        session.stop()
+    return times, saved, failures, session.restarts
+
+
+def run_differential(args, firmware, tmp):
+    """펌웨어가 이미 들어 있는 보드를 다시 쓸 때 전체 vs 차등 (바뀐 섹터 수별)"""
+    with open(firmware, 'rb') as f:
+        data = f.read()
+    sectors = -(-len(data) // SECTOR_SIZE)
+    print(f"\nreflash {len(data) // 1024} KB image ({sectors} sectors of {SECTOR_SIZE // 1024} KB)")
+    print(f"{'changed':>8} {'full':>8} {'diff':>8} {'written':>8}")
+    for changed in [0, 1, 8, sectors // 4, sectors]:
+        results = []
+        for differential in (False, True):
+            state_path = os.path.join(tmp, f"diff_{changed}_{differential}")
+            # 보드에 같은 펌웨어가 있고 changed개 섹터만 다른 상태
+            flash = bytearray(b'\xff' * FLASH_SIZE)
+            flash[:len(data)] = data
+            for sector in range(0, sectors, max(1, sectors // changed) if changed else sectors):
+                if changed and sector // max(1, sectors // changed) < changed:
+                    flash[sector * SECTOR_SIZE] ^= 0xFF
+            with open(state_path + '.flash', 'wb') as f:
+                f.write(flash)
+            session = open_session(args, state_path)
+            try:
+                session.start()
+                report = session.flash(firmware, FLASH_BASE, differential=differential)
+            finally:
+                session.stop()
+            results.append(report)
+        full, diff = results
+        print(f"{changed:>8} {full.elapsed:>7.2f}s {diff.elapsed:>7.2f}s "
+              f"{diff.written:>4}/{diff.total}")
+
+
+def run_sparse(args, firmware, tmp):
+    """0xFF로 채운 이미지: 전체 쓰기 vs 코드 구간만 쓰기 (빈 보드 / 다른 펌웨어가 있는 보드)"""
+    with open(firmware, 'rb') as f:
+        data = f.read()
+    size = len(data)
+    code = len(data.rstrip(b'\xff'))
+    print(f"\n{os.path.basename(firmware)}: {size // 1024} KB file, "
+          f"{code // 1024} KB before trailing 0xFF")
+    print(f"{'board':>8} {'full':>8} {'sparse':>8} {'written':>8}")
+    for board in ('blank', 'used'):
+        results = []
+        for sparse in (False, True):
+            state_path = os.path.join(tmp, f"sparse_{board}_{sparse}")
+            with open(state_path + '.flash', 'wb') as f:
+                f.write(b'\xff' * FLASH_SIZE if board == 'blank' else os.urandom(FLASH_SIZE))
+            session = open_session(args, state_path)
+            try:
+                session.start()
+                report = session.flash(firmware, FLASH_BASE, sparse=sparse)
+            finally:
+                session.stop()
+            with open(state_path + '.flash', 'rb') as f, open(firmware, 'rb') as image:
+                assert f.read(size) == image.read(), "flash contents differ from image"
+            results.append(report)
+        full, sparse = results
+        print(f"{board:>8} {full.elapsed:>7.2f}s {sparse.elapsed:>7.2f}s "
+              f"{sparse.written}/{sparse.total}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--boards', type=int, default=10)
+    parser.add_argument('--startup', type=float, default=0.8, help="OpenOCD 시작/종료 시간(초)")
+    parser.add_argument('--flash', type=float, default=0.5, help="이미지 전체 쓰기+검증 시간(초)")
+    parser.add_argument('--size', type=int, default=128, help="펌웨어 크기(KB)")
+    parser.add_argument('--port', type=int, default=16666)
+    parser.add_argument('--disconnect', type=int, default=0)
+    parser.add_argument('--wedge', type=int, default=0)
+    parser.add_argument('--differential', action='store_true')
+    parser.add_argument('--sparse', metavar='FIRMWARE', help="0xFF로 채운 .bin 펌웨어")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--oneshot', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--state', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.startup, args.flash, args.size * 1024, args.disconnect, args.wedge,
+              args.state)
+        return
+    if args.oneshot:
+        time.sleep(args.startup + args.flash)
+        return
+
+    if args.sparse:
+        args.size = os.path.getsize(args.sparse) // 1024
+        with tempfile.TemporaryDirectory() as tmp:
+            run_sparse(args, args.sparse, tmp)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        firmware = os.path.join(tmp, 'firmware.bin')
+        with open(firmware, 'wb') as f:
+            f.write(os.urandom(args.size * 1024))
+        if args.differential:
+            run_differential(args, firmware, tmp)
+            return
+
+        print(f"{args.boards} boards, startup {args.startup:.1f} s, flash {args.flash:.1f} s")
+        oneshot = run_oneshot(args)
+        session, saved, failures, restarts = run_session(args, firmware,
+                                                         os.path.join(tmp, 'boards'))
+
+    print(f"{'board':>5} {'oneshot':>9} {'session':>9} {'saved':>7}")
+    for board, (before, after, reused) in enumerate(zip(oneshot, session, saved), 1):
+        print(f"{board:>5} {before:>8.2f}s {after:>8.2f}s {reused:>6.2f}s")
+    print(f"total  {sum(oneshot):>8.2f}s {sum(session):>8.2f}s {sum(saved):>6.2f}s")
+    print(f"per board: {sum(oneshot) / len(oneshot):.2f} s -> {sum(session) / len(session):.2f} s "
+          f"(target not connected {failures}, server restarts {restarts})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""시리얼 리더 처리량 벤치마크 (로컬 pty 쌍 사용, Linux/macOS)
+
+사용법:
+    python benchmarks/bench_serial_reader.py [--lines 200000] [--line-length 80]
+
+기존 폴링 루프(in_waiting + readline + 10ms sleep)와 이벤트 기반 SerialReader의
+처리량(lines/s)과 리더 스레드 CPU 사용률을 비교한다.
+
+--ports N 으로 N개 포트를 포트별 스레드(SerialReader)와 단일 asyncio 루프
+(AsyncSerialConnection)로 각각 읽을 때의 처리 시간/CPU도 비교한다.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+import tty
+
+import serial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serial.core.connection import AsyncSerialConnection  # noqa: E402
+from thread_reader import SerialReader  # noqa: E402
+
+
+def open_pty_pair():
+    """pty 쌍 생성 후 (master fd, slave에 연결된 serial.Serial) 반환"""
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    port = serial.Serial(os.ttyname(slave), baudrate=921600, timeout=1)
+    os.close(slave)
+    return master, port
+
+
+def make_payload(line_count, line_length):
+    # 멀티바이트 문자가 read 경계에 걸리도록 한글을 섞는다
+    body = ('로그' + 'x' * line_length)[:line_length]
+    return ''.join(f"{i:08d} {body}\n" for i in range(line_count)).encode('utf-8')
+
+
+def writer(master, payload):
+    view = memoryview(payload)
+    while view:
+        written = os.write(master, view[:4096])
+        view = view[written:]
+
+
+def legacy_reader(port, expected, result):
+    """기존 SerialReaderThread.run 과 같은 폴링 루프"""
+    count = 0
+    start_cpu = time.thread_time()
+    while count < expected:
+        if port.in_waiting:
+            data = port.readline().decode('utf-8', errors='ignore')
+            if data:
+                count += 1
+        time.sleep(0.01)
+    result['cpu'] = time.thread_time() - start_cpu
+    result['lines'] = count
+
+
+def bulk_reader(port, expected, result):
+    reader = SerialReader(port)
+    count = 0
+    start_cpu = time.thread_time()
+    while count < expected:
+        count += len(reader.read_lines())
+    result['cpu'] = time.thread_time() - start_cpu
+    result['lines'] = count
+
+
+def idle_cpu(reader_func, seconds):
+    """데이터가 없을 때 리더 스레드의 CPU 사용률 측정"""
+    master, port = open_pty_pair()
+    result = {}
+    stop = threading.Event()
+
+    def run():
+        start_cpu = time.thread_time()
+        if reader_func is legacy_reader:
+            while not stop.is_set():
+                if port.in_waiting:
+                    port.readline()
+                time.sleep(0.01)
+        else:
+            reader = SerialReader(port)
+            while not stop.is_set():
+                reader.read_lines()
+        result['cpu'] = time.thread_time() - start_cpu
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    port.close()
+    os.close(master)
+    return result['cpu'] / seconds * 100
+
+
+def run_case(name, reader_func, payload, line_count):
+    master, port = open_pty_pair()
+    result = {}
+    thread = threading.Thread(target=reader_func, args=(port, line_count, result))
+    start = time.perf_counter()
+    thread.start()
+    writer(master, payload)
+    thread.join()
+    elapsed = time.perf_counter() - start
+    port.close()
+    os.close(master)
+
+    lines_per_sec = result['lines'] / elapsed
+    cpu_percent = result['cpu'] / elapsed * 100
+    print(f"{name:8} {result['lines']:>10} lines  {elapsed:8.2f} s  "
+          f"{lines_per_sec:>12,.0f} lines/s  CPU {cpu_percent:5.1f} %")
+
+
+def many_ports(name, port_count, payload, line_count):
+    """port_count개 포트에 동시에 전송하고 모두 수신할 때까지의 시간/CPU"""
+    pairs = [open_pty_pair() for _ in range(port_count)]
+    writers = [threading.Thread(target=writer, args=(master, payload)) for master, _ in pairs]
+
+    def run_threads():
+        threads = [threading.Thread(target=bulk_reader, args=(port, line_count, {}))
+                   for _, port in pairs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(threads)
+
+    async def read_port(port):
+        connection = AsyncSerialConnection(port)
+        await connection.open()
+        count = 0
+        while count < line_count:
+            count += len(await connection.read_lines())
+        await connection.close()
+
+    def run_async():
+        async def run_all():
+            await asyncio.gather(*(read_port(port) for _, port in pairs))
+        asyncio.run(run_all())
+        return 1
+
+    start = time.perf_counter()
+    start_cpu = time.process_time()
+    for thread in writers:
+        thread.start()
+    reader_threads = run_async() if name == 'asyncio' else run_threads()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    for master, port in pairs:
+        port.close()
+        os.close(master)
+    print(f"{name:8} {port_count} ports  {reader_threads:>2} reader threads  {elapsed:8.2f} s  "
+          f"{port_count * line_count / elapsed:>12,.0f} lines/s  CPU {cpu:6.2f} s (writers 포함)")
+
+
+def main():
+    if os.name != 'posix':
+        print("pty 벤치마크는 Linux/macOS에서만 실행 가능합니다.")
+        return 1
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--legacy-lines', type=int, default=2000,
+                        help='기존 폴링 루프는 느리므로 별도 줄 수 사용')
+    parser.add_argument('--line-length', type=int, default=80)
+    parser.add_argument('--idle-seconds', type=float, default=2.0)
+    parser.add_argument('--ports', type=int, default=8)
+    args = parser.parse_args()
+
+    print("== Throughput ==")
+    run_case('legacy', legacy_reader,
+             make_payload(args.legacy_lines, args.line_length), args.legacy_lines)
+    run_case('bulk', bulk_reader,
+             make_payload(args.lines, args.line_length), args.lines)
+
+    print("== Idle CPU ==")
+    print(f"legacy   CPU {idle_cpu(legacy_reader, args.idle_seconds):5.2f} %")
+    print(f"bulk     CPU {idle_cpu(bulk_reader, args.idle_seconds):5.2f} %")
+
+    print("== Many ports ==")
+    per_port = args.lines // args.ports
+    payload = make_payload(per_port, args.line_length)
+    many_ports('threads', args.ports, payload, per_port)
+    many_ports('asyncio', args.ports, payload, per_port)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
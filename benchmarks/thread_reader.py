@@ -0,0 +1,111 @@
+"""벤치마크 비교용 스레드 기반 시리얼 리더
+
+포트마다 스레드 하나가 블로킹 대기하며 읽는 방식으로, 앱은 AsyncSerialConnection을
+쓴다. bench_serial_reader/bench_capture가 폴링 루프, asyncio 연결과 비교하는 데 쓴다.
+"""
+import os
+import select
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serial.core.connection import port_fileno  # noqa: E402
+from src.serial.core.packet import LineDecoder  # noqa: E402
+
+
+class SerialReader:
+    """시리얼 포트를 이벤트 기반으로 읽어 줄 단위로 분리하는 리더
+
+    폴링/슬립 대신 포트에서 블로킹 대기하고, 수신된 데이터를 한 번에
+    재사용 버퍼로 읽어들인다.
+    """
+
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, serial_port, idle_timeout=0.2, buffer_size=BUFFER_SIZE):
+        self.serial_port = serial_port
+        self.idle_timeout = idle_timeout  # 데이터가 없을 때 대기 시간(초)
+        self.decoder = LineDecoder()
+        self.running = True
+        self._last_data_time = time.monotonic()
+        
+        # 원시 캡처 (CaptureWriter, 포트 ID)
+        self.capture = None
+        self.capture_port_id = None
+
+        # 재사용 수신 버퍼
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+
+        # POSIX에서는 fd에 select로 대기, 그 외(Windows)는 블로킹 read 사용
+        self._fd = port_fileno(serial_port)
+
+    def set_capture(self, capture, port_name=None):
+        """수신 바이트 원시 캡처 시작 (capture=None이면 중지)"""
+        if capture is None:
+            self.capture = None
+            return
+        if port_name is None:
+            port_name = getattr(self.serial_port, 'port', None) or 'serial'
+        self.capture_port_id = capture.port_id(port_name)
+        self.capture = capture
+
+    def read_chunk(self, timeout=None):
+        """수신 가능한 데이터를 한 번에 읽어 memoryview로 반환
+
+        반환된 memoryview는 다음 호출 전까지만 유효하다.
+        대기 시간 내 수신 데이터가 없으면 빈 memoryview를 반환한다.
+        timeout을 지정하지 않으면 idle_timeout 만큼 대기한다 (POSIX 전용).
+        """
+        if timeout is None:
+            timeout = self.idle_timeout
+        if self._fd is not None:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if not readable:
+                return self._view[:0]
+            count = os.readv(self._fd, [self._view])
+            if count == 0:
+                # 읽기 가능 상태인데 데이터가 없으면 장치 연결 해제
+                raise IOError("device reports readiness to read but returned no data")
+            return self._captured(self._view[:count])
+
+        # 첫 바이트는 포트 timeout 동안 블로킹 대기
+        count = self.serial_port.readinto(self._view[:1])
+        if not count:
+            return self._view[:0]
+        waiting = min(self.serial_port.in_waiting, len(self._buffer) - 1)
+        if waiting:
+            count += self.serial_port.readinto(self._view[1:1 + waiting])
+        return self._captured(self._view[:count])
+
+    def _captured(self, chunk):
+        """캡처 중이면 수신 시각과 함께 원시 데이터 기록"""
+        capture = self.capture
+        if capture is not None:
+            capture.write(self.capture_port_id, chunk, time.monotonic_ns())
+        return chunk
+
+    def read_lines(self, timeout=None):
+        """수신 데이터를 읽어 완성된 줄 목록 반환
+
+        idle_timeout 동안 추가 수신이 없으면 미완성 줄도 함께 반환한다.
+        """
+        chunk = self.read_chunk(timeout)
+        now = time.monotonic()
+        if chunk:
+            self._last_data_time = now
+            return self.decoder.feed(chunk)
+        if self.decoder.pending and now - self._last_data_time >= self.idle_timeout:
+            return [self.decoder.flush()]
+        return []
+
+    def stop(self):
+        """읽기 중지 (블로킹 read 중이면 취소)"""
+        self.running = False
+        cancel_read = getattr(self.serial_port, 'cancel_read', None)
+        if self._fd is None and cancel_read is not None:
+            try:
+                cancel_read()
+            except Exception:
+                pass
@@ -11,6 +11,8 @@ import logging
 from pathlib import Path
 import esptool  # 직접 import
 
+from .esp_flasher import BaudLadder, flash_esp, flash_gang
+
 # 로거 설정
 logger = logging.getLogger(__name__)
 
@@ -44,13 +46,21 @@ class ESPController:
             ports.append(port.device)
         return ports
 
+    def _subprocess_baud(self):
+        """esptool 하위 프로세스용 보레이트
+
+        실패해도 낮춰서 다시 시도할 수 없으므로 이 어댑터에서 성공했던 보레이트를 쓰고,
+        기록이 없으면 460800을 쓴다.
+        """
+        return BaudLadder(self.settings.port).stable() or 460800
+
     def _create_flash_command(self):
         """플래시 명령어 생성"""
         cmd = [
             self.esptool_path,
             "--chip", "esp32",
             "--port", self.settings.port,
-            "--baud", str(self.settings.BAUD_RATE_FLASH),
+            "--baud", str(self._subprocess_baud()),
             "--before", "default_reset",
             "--after", "hard_reset",
             "write_flash",
@@ -169,7 +179,7 @@ class ESPController:
                 sys.executable, "-m", "esptool",  # python -m esptool 형식으로 실행
                 "--chip", "esp32",
                 "--port", self.settings.port,
-                "--baud", "460800",
+                "--baud", str(self._subprocess_baud()),
                 "--before", "default_reset",
                 "--after", "hard_reset",
                 "write_flash",
@@ -217,7 +227,7 @@ class ESPController:
                 sys.executable, "-m", "esptool",
                 "--chip", "esp32",
                 "--port", self.settings.port,
-                "--baud", "460800",
+                "--baud", str(self._subprocess_baud()),
                 "--before", "default_reset",
                 "--after", "hard_reset",
                 "write_flash",
@@ -266,6 +276,7 @@ class DownloadThread(QThread):
     def __init__(self, settings):
         super().__init__()
         self.settings = settings
+        self.success = False
         self.logger = logging.getLogger('ESP32')
         self.logger.setLevel(logging.INFO)
         if not self.logger.handlers:
@@ -273,134 +284,65 @@ class DownloadThread(QThread):
             formatter = logging.Formatter('[ESP32] %(message)s')
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
-        
-        # 진행률 계산을 위한 변수들
-        self.app_start_address = 0x00010000  # 애플리케이션 시작 주소
-        self.current_address = 0
-        self.total_size = 0
-        self.is_app_section = False
 
-    def _calculate_progress(self, address_str):
-        try:
-            current_addr = int(address_str, 16)
-            
-            # 0x00010000 이전 주소는 준비 단계
-            if current_addr < self.app_start_address:
-                return 0
-            
-            # 애플리케이션 섹션 시작
-            if not self.is_app_section and current_addr >= self.app_start_address:
-                self.is_app_section = True
-                return 0
-            
-            # 애플리케이션 섹션에서의 진행률 계산
-            if self.is_app_section and self.total_size > 0:
-                relative_addr = current_addr - self.app_start_address
-                progress = (relative_addr * 100) // (self.total_size)
-                return min(max(progress, 0), 100)
-            
-            return 0
-            
-        except Exception as e:
-            self.logger.error(f"Progress calculation error: {str(e)}")
-            return 0
+    def _on_log(self, message):
+        self.logger.info(f" {message}")
+
+    def _on_progress(self, percent):
+        # esptool 5.x는 "Writing at ..."을 로그가 아닌 진행률 콜백으로만 알림
+        self.progress_updated.emit(percent)
+        self.status_updated.emit(f"Writing firmware... {percent}%")
 
     def run(self):
+        # esptool을 하위 프로세스 없이 이 스레드에서 직접 호출 (진행률은 콜백으로 수신)
         try:
             self.logger.info("Starting ESP32 firmware download...")
-            
-            if sys.platform == 'win32':
-                python_executable = 'python'
-            else:
-                python_executable = sys.executable
-            
-            cmd = [
-                python_executable,
-                "-m", "esptool",
-                "--chip", "esp32",
-                "--port", self.settings.port,
-                "--baud", "921600",
-                "--before", "default_reset",
-                "--after", "hard_reset",
-                "write_flash",
-                "-z", "--flash_mode", "dio",
-                "--flash_freq", "40m",
-                "--flash_size", "detect",
-                "0x1000", self.settings.bootloader_path,
-                "0x8000", self.settings.partition_path,
-                "0xd000", self.settings.ota_path,
-                "0x10000", self.settings.app_path
-            ]
-
-            self.logger.info(f"Executing command: {' '.join(cmd)}")
-            
-            # 환경 변수 설정 - 버퍼링 비활성화
-            env = os.environ.copy()
-            env['PYTHONUNBUFFERED'] = '1'
-            
-            # subprocess.PIPE 대신 subprocess.STDOUT 사용하여 출력 통합
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,  # stderr를 stdout으로 리다이렉트
-                text=True,
-                shell=sys.platform == 'win32',
-                bufsize=0,  # 버퍼링 완전 비활성화
-                env=env,
-                universal_newlines=True
-            )
-            
-            # 출력 처리를 위한 변수들
-            for line in iter(self.process.stdout.readline, ''):
-                line = line.strip()
-                if line:
-                    # 앱 섹션의 전체 크기 캡처
-                    if "Compressed" in line and "bytes to" in line:
-                        try:
-                            size_str = line.split("Compressed ")[1].split(" bytes")[0]
-                            self.total_size = int(size_str)
-                            if self.total_size > 100000:  # 앱 섹션의 크기인 경우만 처리
-                                self.logger.info(f"Application size: {self.total_size} bytes")
-                        except:
-                            pass
-                    
-                    # Writing at 주소 처리
-                    elif "Writing at" in line:
-                        try:
-                            addr = line.split("Writing at ")[1].split("...")[0]
-                            
-                            # 0x00010000 이전은 preparing으로 표시
-                            if int(addr, 16) < self.app_start_address:
-                                self.logger.info(f" Writing at {addr}... (preparing)")
-                            else:
-                                progress = self._calculate_progress(addr)
-                                self.progress_updated.emit(progress)
-                                self.logger.info(f" Writing at {addr}... ({progress}%)")
-                            
-                            self.status_updated.emit(f"Writing at {addr}...")
-                        except Exception as e:
-                            self.logger.error(f"Address parsing error: {str(e)}")
-                    
-                    # 기타 로그 처리
-                    else:
-                        self.logger.info(f" {line}")
-                        
-                        # 앱 섹션의 검증 완료 시 100% 설정
-                        if "Hash of data verified" in line and self.is_app_section:
-                            self.progress_updated.emit(100)
-                            self.status_updated.emit("Download completed")
-            
-            # 프로세스 완료 대기
-            self.process.wait()
-            
-            # 종료 코드 확인
-            if self.process.returncode == 0:
-                self.logger.info("\n Download completed successfully")
-                self.download_completed.emit(True)
-            else:
-                self.logger.error("\n Download failed")
-                self.download_completed.emit(False)
-                
+            self.status_updated.emit("Connecting...")
+            baud = flash_esp(self.settings.port, self.settings.flash_images(),
+                             baud=self.settings.flash_baud(),
+                             flash_mode=self.settings.FLASH_MODE,
+                             flash_freq=self.settings.FLASH_FREQ,
+                             flash_size=self.settings.FLASH_SIZE,
+                             on_progress=self._on_progress,
+                             on_log=self._on_log,
+                             differential=self.settings.differential)
+            self.success = True
+            self.progress_updated.emit(100)
+            self.status_updated.emit(f"Download completed ({baud} bps)")
+            self.logger.info("\n Download completed successfully")
         except Exception as e:
+            self.success = False
+            self.status_updated.emit(f"Download failed: {str(e)}")
             self.logger.error(f" Download failed: {str(e)}")
-            self.download_completed.emit(False)
+        self.download_completed.emit(self.success)
+
+
+class GangDownloadThread(QThread):
+    """같은 펌웨어를 여러 포트에 동시에 다운로드 (포트별 진행률/재시도)"""
+    board_updated = pyqtSignal(object)      # GangResult (작업 스레드에서 발생)
+    gang_completed = pyqtSignal(list)       # 전체 GangResult 목록
+
+    def __init__(self, settings, ports, workers=None, retries=1):
+        super().__init__()
+        self.settings = settings
+        self.ports = list(ports)
+        self.workers = workers
+        self.retries = retries
+        self.results = []
+
+    def run(self):
+        try:
+            self.results = flash_gang(
+                self.ports, self.settings.flash_images(),
+                baud=self.settings.flash_baud(),
+                workers=self.workers,
+                retries=self.retries,
+                on_update=self.board_updated.emit,
+                flash_mode=self.settings.FLASH_MODE,
+                flash_freq=self.settings.FLASH_FREQ,
+                flash_size=self.settings.FLASH_SIZE,
+                differential=self.settings.differential)
+        except Exception as e:
+            logger.error(f"Gang download failed: {str(e)}")
+            self.results = []
+        self.gang_completed.emit(self.results)
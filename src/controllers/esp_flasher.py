@@ -0,0 +1,510 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from esptool.cmds import attach_flash, detect_chip, reset_chip, run_stub, write_flash
+from esptool.logger import TemplateLogger, log
+from esptool.util import FatalError
+from serial import SerialException
+
+from ..models.esp_settings import ESPSettings
+from ..models.firmware_catalog import FirmwareEntry, firmware_catalog
+from ..models.serial_settings import PortCache
+from ..utils.port_utils import port_identity, usb_port
+
+# 플래시에 쓸 이미지 한 개 (address: int, path: 파일 경로, bytes 또는 카탈로그의 FirmwareEntry)
+FlashImage = namedtuple('FlashImage', 'address path')
+
+ROM_BAUD_RATE = 115200  # 부트로더(ROM) 접속 보레이트, 스텁 실행 후 플래시 보레이트로 변경
+
+AUTO_BAUD = ESPSettings.AUTO_BAUD  # 어댑터별로 보레이트를 고름 (BaudLadder)
+BAUD_LADDER = [2000000, 1500000, 921600, 460800, 230400, 115200]  # 빠른 순, 실패하면 한 단계씩
+DEFAULT_FLASH_BAUD = 921600  # 1.5M/2M 지원을 알 수 없는 브리지의 시작 보레이트
+# 1.5M/2M을 지원하는 USB-UART 브리지 (VID, PID)
+FAST_BRIDGES = {(0x10C4, 0xEA60): 'CP210x', (0x1A86, 0x55D4): 'CH9102'}
+PROMOTE_AFTER = 20  # 저장된 보레이트로 연속 성공하면 한 단계 위를 다시 시도
+# 보레이트를 낮추면 나아질 수 있는 esptool 오류 (동기/체크섬/패킷 타임아웃)
+LINK_ERROR_PATTERN = re.compile(r'Invalid head of packet|Timed out waiting for packet|'
+                                r'checksum|MD5 of file does not match|No serial data received|'
+                                r'Packet content transfer stopped|Serial data stream stopped',
+                                re.IGNORECASE)
+
+# 동시에 플래시할 보드 수 상한을 정하는 USB 대역폭 (Full-speed 허브 12 Mbit/s 중 실사용분)
+USB_BUDGET_BPS = 8_000_000
+WORKERS_PER_CPU = 4  # 작업 대부분이 시리얼 대기라 코어 하나로 여러 보드를 처리
+RETRY_DELAY = 1.0  # 실패 후 재시도 전 대기(초), 보드 리셋 후 안정화 시간
+
+SECTOR_SIZE = 0x1000       # 플래시 지우기 단위 (차등 플래시 비교 단위)
+DIFF_BLOCK_SIZE = 0x10000  # 섹터별로 비교하기 전에 먼저 MD5를 비교할 블록 크기
+
+
+class FlashCancelled(Exception):
+    """cancel_event로 플래시를 중단함"""
+
+
+class FlashSink:
+    """플래시 작업 하나의 esptool 출력 수신자 (진행률/로그 콜백)"""
+
+    def __init__(self, sizes, on_progress=None, on_log=None, cancel_event=None):
+        self.cancel_event = cancel_event
+        self.on_progress = on_progress
+        self.on_log = on_log
+        self.set_sizes(sizes)
+        self._last_percent = -1
+
+    def set_sizes(self, sizes):
+        """실제로 쓸 영역 크기 목록으로 진행률 기준 변경 (차등 플래시)"""
+        self.sizes = list(sizes)
+        self.total = sum(self.sizes) or 1
+        self._index = 0
+        self._last_fraction = 0.0
+        self._last_total = None
+
+    def log(self, message):
+        if self.on_log is not None and message:
+            self.on_log(message)
+
+    def check_cancel(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise FlashCancelled("Flash cancelled")
+
+    def progress(self, current, total):
+        """이미지별 진행(current/total)을 전체 바이트 기준 백분율로 바꿔 전달
+
+        esptool의 쓰기 루프 안에서 호출되므로, 취소되었으면 여기서 예외를 올려
+        다음 블록을 보내기 전에 멈춘다.
+        """
+        self.check_cancel()
+        fraction = current / total if total else 1.0
+        # 진행률이 되돌아가거나, 끝난 뒤 크기가 다른 진행이 오면 다음 이미지
+        next_image = (fraction < self._last_fraction or
+                      (self._last_fraction >= 1.0 and total != self._last_total))
+        if next_image and self._index < len(self.sizes) - 1:
+            self._index += 1
+        self._last_fraction = fraction
+        self._last_total = total
+        done = sum(self.sizes[:self._index])
+        size = self.sizes[self._index] if self.sizes else 0
+        percent = min(100, int((done + size * fraction) * 100 / self.total))
+        if percent != self._last_percent and self.on_progress is not None:
+            self._last_percent = percent
+            self.on_progress(percent)
+
+
+class _ProgressRouter(TemplateLogger):
+    """esptool 전역 로거 대신 설치되어 출력을 호출한 스레드의 FlashSink로 전달
+
+    esptool 로거는 프로세스에 하나뿐이므로, 여러 보드를 각자의 스레드에서 동시에
+    플래시해도 스레드별로 진행률이 섞이지 않게 한다. 등록되지 않은 스레드의 출력은
+    콘솔에 그대로 출력한다.
+    """
+
+    def __init__(self):
+        self._sinks = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def route(self, sink):
+        ident = threading.get_ident()
+        with self._lock:
+            self._sinks[ident] = sink
+        try:
+            yield sink
+        finally:
+            with self._lock:
+                self._sinks.pop(ident, None)
+
+    def _sink(self):
+        return self._sinks.get(threading.get_ident())
+
+    def print(self, *args, **kwargs):
+        message = kwargs.get('sep', ' ').join(str(arg) for arg in args).strip()
+        sink = self._sink()
+        if sink is None:
+            print(message)
+        else:
+            sink.log(message)
+
+    def note(self, message):
+        self.print(f"Note: {message}")
+
+    def warning(self, message):
+        self.print(f"Warning: {message}")
+
+    def error(self, message):
+        self.print(f"Error: {message}")
+
+    def stage(self, finish=False):
+        pass
+
+    def progress_bar(self, cur_iter, total_iters, prefix="", suffix="", bar_length=30):
+        sink = self._sink()
+        if sink is not None:
+            sink.progress(cur_iter, total_iters)
+
+    def set_verbosity(self, verbosity):
+        pass
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def progress_router():
+    """esptool 로거를 라우터로 한 번만 교체하고 반환"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = _ProgressRouter()
+            log.set_logger(_router)
+        return _router
+
+
+def error_message(exc):
+    """esptool 예외 메시지의 첫 줄 (힌트 등 뒤따르는 설명 제외)"""
+    text = str(exc).strip()
+    return text.splitlines()[0] if text else type(exc).__name__
+
+
+def _image_size(path):
+    if isinstance(path, FirmwareEntry):
+        return path.size
+    if isinstance(path, (bytes, bytearray)):
+        return len(path)
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        return f.tell()
+
+
+def _md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+def changed_sectors(esp, address, data):
+    """대상 플래시 내용과 다른 섹터의 오프셋 목록
+
+    이미지 전체 → 64 KB 블록 → 4 KB 섹터 순으로 플래시 MD5(스텁이 계산)를 비교하므로,
+    바뀌지 않은 이미지는 MD5 한 번으로 끝난다.
+    """
+    def differs(offset, size):
+        return esp.flash_md5sum(address + offset, size) != _md5(data[offset:offset + size])
+
+    if not data or not differs(0, len(data)):
+        return []
+    changed = []
+    for block in range(0, len(data), DIFF_BLOCK_SIZE):
+        block_size = min(DIFF_BLOCK_SIZE, len(data) - block)
+        if not differs(block, block_size):
+            continue
+        for sector in range(block, block + block_size, SECTOR_SIZE):
+            if differs(sector, min(SECTOR_SIZE, len(data) - sector)):
+                changed.append(sector)
+    return changed
+
+
+def _sector_runs(changed):
+    """연속한 섹터를 묶은 (오프셋, 크기) 목록 (write_flash에 이미지 하나로 넘기는 단위)"""
+    runs = []
+    for offset in changed:
+        if runs and runs[-1][0] + runs[-1][1] == offset:
+            runs[-1][1] += SECTOR_SIZE
+        else:
+            runs.append([offset, SECTOR_SIZE])
+    return runs
+
+
+def _load(path):
+    if isinstance(path, FirmwareEntry):
+        return path.read()
+    if isinstance(path, (bytes, bytearray)):
+        return bytes(path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _diff_images(esp, images, sink):
+    """이미지마다 플래시와 다른 섹터를 찾아 연속 구간별 FlashImage 목록으로 반환
+
+    바뀐 구간만 write_flash에 따로 넘기므로 esptool이 구간마다 지우고 쓰고 MD5로 검증한다.
+    부트로더는 write_flash가 헤더의 플래시 설정(과 뒤에 붙은 SHA-256)을 고쳐 쓰므로
+    플래시 내용과 비교할 수 없고, 잘라 넘기면 헤더를 고치지 않으므로 항상 전체를 쓴다.
+    """
+    to_write = []
+    for image in images:
+        sink.check_cancel()
+        data = _load(image.path)
+        if image.address == esp.BOOTLOADER_FLASH_OFFSET:
+            to_write.append(FlashImage(image.address, data))
+            continue
+        data += b'\xff' * (-len(data) % 4)  # write_flash와 같은 4바이트 정렬
+        changed = changed_sectors(esp, image.address, data)
+        sink.log(f"{image.address:#010x}: {len(changed)}/{-(-len(data) // SECTOR_SIZE)} "
+                 f"sectors changed")
+        to_write += [FlashImage(image.address + offset, data[offset:offset + size])
+                     for offset, size in _sector_runs(changed)]
+    sink.set_sizes([len(image.path) for image in to_write])
+    return to_write
+
+
+def _catalog_image(image):
+    """파일 경로 이미지를 카탈로그 항목으로 바꾸기 (색인 조회 + stat 한 번)"""
+    if isinstance(image.path, (str, os.PathLike)):
+        entry = firmware_catalog().entry(image.path)
+        if entry is not None:
+            return FlashImage(image.address, entry)
+    return image
+
+
+class BaudRateError(Exception):
+    """보레이트를 올린 뒤 생긴 통신 오류 (한 단계 낮은 보레이트로 다시 시도할 수 있음)
+
+    rejected는 드라이버/브리지가 보레이트 변경 자체를 거부한 경우 (다시 시도해도 같음).
+    """
+
+    def __init__(self, baud, error, rejected=False):
+        super().__init__(f"{baud} bps: {error_message(error)}")
+        self.baud = baud
+        self.error = error
+        self.rejected = rejected
+
+
+def _link_error(exc):
+    """USB-UART 브리지가 보레이트를 따라가지 못할 때 나는 오류인지 (동기/체크섬/타임아웃)"""
+    return isinstance(exc, SerialException) or (
+        isinstance(exc, FatalError) and LINK_ERROR_PATTERN.search(str(exc)) is not None)
+
+
+def adapter_key(port):
+    """플래시 보레이트를 기억할 USB 어댑터 식별자 (VID:PID:시리얼 번호, 없으면 포트 식별자)"""
+    info = usb_port(port)
+    if info is None:
+        return port_identity(port)
+    return f"usb:{info.vid:04X}:{info.pid:04X}:{info.serial_number or info.location or port}"
+
+
+class BaudLadder:
+    """USB 어댑터별 플래시 보레이트 선택 (빠른 값부터 시도, 실패하면 한 단계씩 내림)
+
+    어댑터(VID/PID/시리얼 번호)마다 마지막으로 성공한 보레이트를 PortCache에 저장해
+    다음 작업은 그 값부터 시작하고, 같은 값으로 PROMOTE_AFTER번 연속 성공하면 한 단계
+    위를 다시 시도한다. 처음 보는 어댑터는 1.5M/2M을 지원하는 브리지(CP210x/CH9102)면
+    2M부터, 그 밖에는 921600부터 내려가며 찾는다.
+    """
+
+    def __init__(self, port, cache=None):
+        info = usb_port(port)
+        self.bridge = FAST_BRIDGES.get((info.vid, info.pid)) if info is not None else None
+        self.key = adapter_key(port)
+        self.cache = cache or PortCache()
+        top = BAUD_LADDER[0] if self.bridge else DEFAULT_FLASH_BAUD
+        self.rates = [rate for rate in BAUD_LADDER if rate <= top]
+
+    def _stored(self):
+        stored = self.cache.get(self.key)
+        rate = stored.get('flash_baudrate')
+        successes = stored.get('flash_successes')
+        return (rate if rate in self.rates else None,
+                successes if isinstance(successes, int) else 0)
+
+    def stable(self):
+        """이 어댑터에서 마지막으로 성공한 보레이트 (기록이 없으면 None)"""
+        return self._stored()[0]
+
+    def candidates(self):
+        """이번 작업에서 시도할 보레이트 목록 (빠른 순)"""
+        rate, successes = self._stored()
+        if rate is None:
+            return list(self.rates)
+        index = self.rates.index(rate)
+        if successes >= PROMOTE_AFTER and index > 0:
+            index -= 1
+        return self.rates[index:]
+
+    def succeeded(self, rate, fell_back=False):
+        """성공한 보레이트 저장 (더 높은 값에서 실패했으면 연속 성공 횟수를 새로 셈)"""
+        stored, successes = self._stored()
+        successes = successes + 1 if rate == stored and not fell_back else 0
+        self.cache.update(self.key, flash_baudrate=rate, flash_successes=successes)
+
+    def rejected(self, rate):
+        """드라이버가 거부한 보레이트 기록 (한 단계 아래를 저장해 다음 작업은 그 값부터 시작)"""
+        if rate not in self.rates or rate == self.rates[-1]:
+            return
+        lower = self.rates[self.rates.index(rate) + 1]
+        self.cache.update(self.key, flash_baudrate=lower, flash_successes=0)
+
+
+def _flash_at(port, images, baud, sink, flash_mode, flash_freq, flash_size, differential):
+    """한 보레이트로 플래시 (보레이트 변경이 거부되거나 바꾼 뒤 통신 오류가 나면 BaudRateError)"""
+    sink.check_cancel()
+    with detect_chip(port, ROM_BAUD_RATE, 'default-reset') as rom:
+        changed = False
+        try:
+            sink.check_cancel()
+            sink.log(f"Chip: {rom.get_chip_description()}")
+            esp = run_stub(rom)  # 스텁 로더도 같은 포트를 쓰므로 with를 나가면 함께 닫힘
+            if baud and baud != ROM_BAUD_RATE:
+                try:
+                    esp.change_baud(baud)
+                except (FatalError, SerialException) as e:
+                    raise BaudRateError(baud, e, rejected=True) from e
+                changed = True
+            attach_flash(esp)
+            if differential:
+                images = _diff_images(esp, images, sink)
+            else:
+                images = [FlashImage(image.address, _load(image.path)) for image in images]
+            if images:
+                write_flash(esp, list(images), flash_freq=flash_freq, flash_mode=flash_mode,
+                            flash_size=flash_size, compress=True)
+            reset_chip(esp, 'hard-reset')
+        except Exception as e:
+            if changed and _link_error(e):
+                raise BaudRateError(baud, e) from e
+            raise
+
+
+def flash_esp(port, images, baud=921600, flash_mode='dio', flash_freq='40m',
+              flash_size='detect', on_progress=None, on_log=None, cancel_event=None,
+              differential=False):
+    """esptool을 프로세스 안에서 호출해 이미지들을 플래시하고 사용한 보레이트 반환
+
+    python -m esptool 하위 프로세스를 띄우지 않으므로 인터프리터 시작/esptool import
+    비용이 없고, 진행률은 esptool 로거의 progress_bar 호출로 받는다.
+    on_progress(percent)는 전체 이미지 바이트 기준 0~100, on_log(message)는 esptool 출력.
+    differential이면 플래시 내용과 다른 섹터만 지우고 쓴다 (재작업/재플래시용,
+    부트로더는 항상 전체).
+    baud가 AUTO_BAUD이면 BaudLadder로 어댑터별 보레이트를 고르고, 보레이트 변경이
+    거부되거나 동기/체크섬 오류가 나면 한 단계 낮춰 처음부터 다시 쓴다. 거부된 보레이트는
+    바로 불안정으로 기록해 작업이 끝내 실패해도 다음 작업은 그 아래부터 시작한다.
+    실패하면 esptool 예외(FatalError, SerialException 등)를 그대로 올리고,
+    cancel_event가 설정되면 다음 진행률 보고 시점에 FlashCancelled를 올린다.
+    """
+    images = [_catalog_image(FlashImage(int(address, 0) if isinstance(address, str) else address,
+                                        path))
+              for address, path in images]
+    sizes = [_image_size(image.path) for image in images]
+    sink = FlashSink(sizes, on_progress, on_log, cancel_event)
+    ladder = BaudLadder(port) if baud == AUTO_BAUD else None
+    rates = ladder.candidates() if ladder is not None else [baud]
+    start = time.monotonic()
+    with progress_router().route(sink):
+        for index, rate in enumerate(rates):
+            try:
+                _flash_at(port, images, rate, sink, flash_mode, flash_freq, flash_size,
+                          differential)
+                break
+            except BaudRateError as e:
+                if ladder is not None and e.rejected:
+                    ladder.rejected(rate)
+                if index == len(rates) - 1:
+                    raise e.error
+                sink.log(f"{e}, retrying at {rates[index + 1]} bps")
+                sink.set_sizes(sizes)
+    if ladder is not None:
+        ladder.succeeded(rate, fell_back=index > 0)
+    if sink.on_progress is not None:
+        sink.on_progress(100)
+    sink.log(f"Flash completed in {time.monotonic() - start:.1f} s at {rate} bps")
+    return rate
+
+
+class GangResult:
+    """갱 프로그래밍에서 포트 하나의 플래시 결과"""
+
+    WAITING = 'Waiting'
+    FLASHING = 'Flashing'
+    DONE = 'Done'
+    FAILED = 'Failed'
+
+    def __init__(self, port):
+        self.port = port
+        self.status = self.WAITING
+        self.progress = 0
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.message = ''
+
+    @property
+    def ok(self):
+        return self.status == self.DONE
+
+
+def gang_workers(count, baud=921600):
+    """동시 플래시 작업 수 (보드 수, USB 대역폭, CPU 수 중 가장 작은 값)
+
+    플래시는 대부분 시리얼 대기라 CPU보다 USB 대역폭이 먼저 한계가 되고,
+    CPU는 보드별 이미지 압축에만 쓰인다. AUTO_BAUD이면 DEFAULT_FLASH_BAUD 기준으로 잡는다.
+    """
+    if baud == AUTO_BAUD:
+        baud = DEFAULT_FLASH_BAUD
+    usb_limit = max(1, USB_BUDGET_BPS // baud) if baud else count
+    return max(1, min(count, usb_limit, (os.cpu_count() or 1) * WORKERS_PER_CPU))
+
+
+def load_images(images):
+    """(주소, 파일) 목록을 카탈로그 항목으로 바꿔 두기 (보드마다 경로를 다시 조회하지 않도록)
+
+    카탈로그에 없는 이미지(bytes 등)는 메모리에 읽어 둔다.
+    """
+    loaded = []
+    for address, path in images:
+        image = _catalog_image(FlashImage(address, path))
+        if not isinstance(image.path, FirmwareEntry):
+            image = FlashImage(address, _load(path))
+        loaded.append(image)
+    return loaded
+
+
+def flash_gang(ports, images, baud=921600, workers=None, retries=1, on_update=None,
+               **flash_options):
+    """같은 이미지들을 여러 포트에 동시에 플래시하고 포트별 GangResult 목록 반환
+
+    포트마다 스레드 풀의 작업 하나가 flash_esp를 실행하고, 실패하면 retries번까지
+    다시 시도한다. on_update(result)는 상태/진행률이 바뀔 때마다 작업 스레드에서 호출된다.
+    """
+    images = load_images(images)
+    results = [GangResult(port) for port in ports]
+    if not results:
+        return results
+
+    def notify(result):
+        if on_update is not None:
+            on_update(result)
+
+    def run(result):
+        start = time.monotonic()
+        for attempt in range(1, retries + 2):
+            result.attempts = attempt
+            result.status = result.FLASHING
+            result.progress = 0
+            notify(result)
+
+            def on_progress(percent):
+                result.progress = percent
+                notify(result)
+
+            try:
+                rate = flash_esp(result.port, images, baud=baud, on_progress=on_progress,
+                                 **flash_options)
+                result.status = result.DONE
+                result.message = f"{rate} bps"
+                break
+            except Exception as e:
+                result.status = result.FAILED
+                result.message = error_message(e)
+                if attempt <= retries:
+                    notify(result)
+                    time.sleep(RETRY_DELAY)
+        result.elapsed = time.monotonic() - start
+        notify(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers or gang_workers(len(results), baud),
+                            thread_name_prefix='esp-gang') as pool:
+        return list(pool.map(run, results))
@@ -3,8 +3,11 @@ import os
 import time
 from pathlib import Path
 from ..models.nrf_settings import NRFSettings
+from .openocd_session import OpenOCDError, openocd_session
 
 class NRFController:
+    NRF_FLASH_START = 0x00000000
+
     def __init__(self):
         self.settings = NRFSettings()
         self.firmware_path = None
@@ -14,6 +17,7 @@ class NRFController:
         # OpenOCD 설정
         self.openocd_path = "openocd"
         self.openocd_script = self._get_openocd_script()
+        self.openocd_target = "target/nrf52.cfg"
         
         # J-Link 설정
         self.jlink_path = "JLinkExe"
@@ -48,46 +52,26 @@ exit"""
         return script_path
 
     def download_with_openocd(self, progress_callback=None):
-        """OpenOCD를 사용한 다운로드"""
+        """OpenOCD를 사용한 다운로드 (떠 있는 OpenOCD 서버를 TCL RPC로 재사용)"""
         if not self.openocd_script:
             print("Error: OpenOCD script not found")
             return False
 
-        cmd = [
-            self.openocd_path,
-            "-f", self.openocd_script,
-            "-c", "init",
-            "-c", "reset halt",
-            "-c", f"program {self.firmware_path} verify",
-            "-c", "reset",
-            "-c", "exit"
-        ]
-
-        try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
-                    if progress_callback:
-                        if "Programming Started" in output:
-                            progress_callback(20)
-                        elif "Programming Finished" in output:
-                            progress_callback(60)
-                        elif "Verified OK" in output:
-                            progress_callback(100)
+        # .bin은 플래시 시작 주소(0x0)에 쓰고, .hex/.elf는 파일에 든 주소 사용
+        flash_start = self.NRF_FLASH_START if self.firmware_path.endswith('.bin') else None
 
-            return process.returncode == 0
+        def on_progress(percent, status):
+            print(status)
+            if progress_callback:
+                progress_callback(percent)
 
-        except Exception as e:
+        try:
+            session = openocd_session(target=self.openocd_target, interface=self.openocd_script)
+            report = session.flash(self.firmware_path, flash_start, on_progress, sparse=False)
+            if report.saved:
+                print(f"Reused OpenOCD (-{report.saved:.1f} s)")
+            return True
+        except (OpenOCDError, OSError) as e:
             print(f"Error during OpenOCD download: {str(e)}")
             return False
 
@@ -0,0 +1,438 @@
+import atexit
+import os
+import re
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+
+from .stlink_pool import openocd_server_command, slot_ports, tcl_path
+from .stm_image import PAGE_SIZE, firmware_data, sparse_image
+
+RPC_TERMINATOR = b'\x1a'  # OpenOCD TCL RPC 명령/응답 구분 문자
+
+# 보드 하나 다운로드 결과 (elapsed: 걸린 시간, saved: 새 프로세스 방식 대비 아낀 시간,
+# written/total: 차등 플래시에서 다시 쓴 섹터 수/전체 섹터 수)
+FlashReport = namedtuple('FlashReport', 'elapsed saved written total', defaults=(None, None))
+
+DIFF_BLOCK_SIZE = 0x10000     # 섹터별로 비교하기 전에 먼저 CRC를 비교할 블록 크기
+# 서버가 죽었거나 멈춘 것으로 보는 오류 (TCL 연결 끊김/거부/시간 초과)
+# 구간 파일 쓰기 같은 로컬 파일 오류(OSError)는 서버를 다시 띄우지 않고 그대로 올린다.
+SERVER_ERRORS = (ConnectionError, socket.timeout)
+
+
+class OpenOCDError(Exception):
+    """OpenOCD 명령 실패 또는 서버 응답 없음"""
+
+
+class TargetNotConnected(OpenOCDError):
+    """프로브에 보드가 연결되어 있지 않음 (reset init 실패)"""
+
+
+class TclRpcClient:
+    """OpenOCD TCL RPC 포트(기본 6666) 클라이언트
+
+    명령 뒤에 0x1a를 붙여 보내고 0x1a가 올 때까지 응답을 읽는다.
+    """
+
+    def __init__(self, host='127.0.0.1', port=6666, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._socket = None
+        self._buffer = b''
+
+    @property
+    def connected(self):
+        return self._socket is not None
+
+    def connect(self, timeout=None):
+        self.close()
+        self._socket = socket.create_connection((self.host, self.port), timeout or self.timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = b''
+
+    def command(self, command, timeout=None):
+        """명령을 보내고 응답 문자열 반환 (연결 끊김/시간 초과 시 OSError)"""
+        if self._socket is None:
+            self.connect()
+        self._socket.settimeout(timeout or self.timeout)
+        try:
+            self._socket.sendall(command.encode('utf-8') + RPC_TERMINATOR)
+            while RPC_TERMINATOR not in self._buffer:
+                data = self._socket.recv(4096)
+                if not data:
+                    raise ConnectionError("OpenOCD closed the TCL connection")
+                self._buffer += data
+        except OSError:
+            self.close()
+            raise
+        response, _, self._buffer = self._buffer.partition(RPC_TERMINATOR)
+        return response.decode('utf-8', errors='replace')
+
+    def call(self, command, timeout=None):
+        """OpenOCD 명령 실행 후 출력 반환 (명령 오류는 OpenOCDError)
+
+        명령 출력은 capture로 받고, 오류는 catch로 잡아 'ERROR: '를 붙여 돌려받는다.
+        """
+        response = self.command(
+            f"if {{[catch {{capture {{{command}}}}} _r]}} {{set _r \"ERROR: $_r\"}} else {{set _r}}",
+            timeout)
+        if response.startswith("ERROR: "):
+            raise OpenOCDError(response[len("ERROR: "):].strip() or command)
+        return response
+
+    def close(self):
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+
+class OpenOCDSession:
+    """프로브 하나에 OpenOCD를 한 번만 띄워 두고 TCL RPC로 보드를 차례로 다운로드
+
+    보드마다 새 OpenOCD 프로세스를 띄우면 설정 파싱, 어댑터 초기화, 종료를 매번
+    반복하므로, 이 시간(startup_time)을 보드마다 아낀다. 보드가 바뀌는 것은
+    reset init 성공/실패로 확인하고, 서버가 죽었거나 응답이 없을 때만 다시 띄운다.
+    command가 None이면 이미 떠 있는 서버(host:port)에 붙기만 한다.
+    """
+
+    START_TIMEOUT = 10.0
+    COMMAND_TIMEOUT = 5.0
+    FLASH_TIMEOUT = 120.0
+
+    def __init__(self, command=None, host='127.0.0.1', port=6666, name='openocd', probe=None):
+        self.command = command
+        self.name = name
+        self.probe = probe
+        self.client = TclRpcClient(host, port, self.COMMAND_TIMEOUT)
+        self.process = None
+        self.startup_time = 0.0   # 서버 시작 ~ 첫 응답까지 (보드당 아끼는 시간)
+        self.restarts = 0
+        self.boards = 0
+        self.saved_time = 0.0
+        self.output = deque(maxlen=50)  # OpenOCD 출력 마지막 줄들 (오류 메시지용)
+        self._lock = threading.RLock()
+        self._aborted = False
+        self._sector_size = None
+
+    @classmethod
+    def for_probe(cls, probe=None, slot=0, target="target/stm32g4x.cfg",
+                  interface="interface/stlink.cfg"):
+        """ST-Link 프로브(없으면 처음 찾은 것)용 세션 (슬롯별 TCL 포트 사용)"""
+        return cls(openocd_server_command(probe, slot, target, interface),
+                   port=slot_ports(slot).tcl,
+                   name=probe.serial if probe is not None else 'openocd', probe=probe)
+
+    @property
+    def running(self):
+        if self.command is None:
+            return self.client.connected
+        return self.process is not None and self.process.poll() is None
+
+    def _read_output(self, process):
+        for line in iter(process.stdout.readline, ''):
+            line = line.strip()
+            if line:
+                self.output.append(line)
+
+    def start(self):
+        """OpenOCD를 띄우고 TCL 포트가 응답할 때까지 대기"""
+        with self._lock:
+            if self.running:
+                return
+            start = time.monotonic()
+            if self.command is not None:
+                self.output.clear()
+                self.process = subprocess.Popen(self.command, stdout=subprocess.PIPE,
+                                                stderr=subprocess.STDOUT, text=True)
+                threading.Thread(target=self._read_output, args=(self.process,),
+                                 name=f"openocd-{self.name}", daemon=True).start()
+            deadline = start + self.START_TIMEOUT
+            while True:
+                if self.command is not None and self.process.poll() is not None:
+                    self.process = None
+                    raise OpenOCDError(f"OpenOCD exited: {self.last_output()}")
+                try:
+                    self.client.connect(timeout=0.5)
+                    self.client.command("version")
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        self.stop()
+                        raise OpenOCDError("OpenOCD TCL port did not respond")
+                    time.sleep(0.05)
+            self.startup_time = time.monotonic() - start
+
+    def stop(self):
+        """서버 종료 (shutdown 후 응답이 없으면 강제 종료)"""
+        with self._lock:
+            shutdown = False
+            if self.client.connected:
+                try:
+                    self.client.command("shutdown", timeout=1.0)
+                    shutdown = True
+                except OSError:
+                    pass
+            self.client.close()
+            if self.process is not None:
+                if not shutdown:
+                    self.process.terminate()
+                try:
+                    self.process.wait(timeout=2.0)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+                self.process = None
+
+    def restart(self):
+        """응답이 없는(wedged) 서버 다시 시작"""
+        with self._lock:
+            self.stop()
+            self.restarts += 1
+            self.start()
+
+    def abort(self):
+        """다운로드 중인 서버를 바로 종료 (다른 스레드에서 호출, 다음 flash에서 다시 띄움)"""
+        self._aborted = True
+        process = self.process
+        if process is not None:
+            process.terminate()
+        self.client.close()
+
+    def last_output(self):
+        return self.output[-1] if self.output else "no output"
+
+    def target_connected(self):
+        """보드 연결 확인 (reset init 성공 여부, 보드는 halt 상태로 남음)"""
+        try:
+            self.call("reset init")
+            return True
+        except TargetNotConnected:
+            return False
+
+    def call(self, command, timeout=None):
+        """서버에 명령 실행 (서버가 죽었거나 응답이 없으면 한 번 다시 띄우고 재시도)"""
+        return self._retry(lambda: self._call(command, timeout), command)
+
+    def _retry(self, run, what):
+        with self._lock:
+            for attempt in range(2):
+                if self._aborted:
+                    raise OpenOCDError("OpenOCD stopped")
+                try:
+                    if not self.running:
+                        self.start() if attempt == 0 else self.restart()
+                    return run()
+                except SERVER_ERRORS:
+                    if attempt or self.command is None or self._aborted:
+                        raise OpenOCDError(f"OpenOCD not responding: {what}")
+                    self.restart()
+
+    def _call(self, command, timeout=None):
+        try:
+            return self.client.call(command, timeout)
+        except OpenOCDError as e:
+            if command.startswith("reset"):
+                raise TargetNotConnected(str(e)) from e
+            raise
+
+    def sector_size(self):
+        """플래시 뱅크 0의 가장 큰 섹터 크기 (차등 플래시 비교 단위, 지우기 단위보다 작으면 안 됨)"""
+        if self._sector_size is None:
+            try:
+                sizes = re.findall(r'\(0x([0-9a-fA-F]+) \d+\s*[kKmM]?B\)', self._call("flash info 0"))
+            except OpenOCDError:
+                sizes = []
+            self._sector_size = max((int(size, 16) for size in sizes), default=PAGE_SIZE)
+        return self._sector_size
+
+    def _matches(self, path, address):
+        """타깃 플래시 내용이 파일과 같은지 (타깃에서 계산한 CRC로 비교)"""
+        try:
+            self._call(f"verify_image_checksum {tcl_path(path)} {address:#010x}", self.FLASH_TIMEOUT)
+            return True
+        except OpenOCDError as e:
+            if isinstance(e, TargetNotConnected):
+                raise
+            return False
+
+    def _changed_sectors(self, data, flash_start, workdir, limit):
+        """타깃 플래시와 다른 섹터의 오프셋 목록 (전체 → 64 KB 블록 → 섹터 순으로 CRC 비교)
+
+        limit개를 넘으면 더 비교하지 않고 None 반환 (전체를 쓰는 편이 빠름).
+        """
+        sector = self.sector_size()
+
+        def differs(offset, size):
+            chunk = os.path.join(workdir, f"{offset:08x}_{size:x}.bin")
+            with open(chunk, 'wb') as f:
+                f.write(data[offset:offset + size])
+            return not self._matches(chunk, flash_start + offset)
+
+        if not differs(0, len(data)):
+            return []
+        block_size = max(DIFF_BLOCK_SIZE, sector)
+        changed = []
+        for block in range(0, len(data), block_size):
+            size = min(block_size, len(data) - block)
+            if not differs(block, size):
+                continue
+            for offset in range(block, block + size, sector):
+                if differs(offset, min(sector, len(data) - offset)):
+                    changed.append(offset)
+                    if len(changed) > limit:
+                        return None
+        return changed
+
+    def _write_sectors(self, data, flash_start, changed, workdir, progress):
+        """다른 섹터만 연속 구간으로 묶어 지우고 쓴 뒤 쓴 구간만 검증"""
+        sector = self.sector_size()
+        runs = []
+        for offset in changed:
+            if runs and runs[-1][0] + runs[-1][1] == offset:
+                runs[-1][1] += sector
+            else:
+                runs.append([offset, sector])
+        for index, (offset, size) in enumerate(runs):
+            progress(50 + 35 * index // len(runs), f"Writing {size // sector} sectors "
+                                                   f"at {flash_start + offset:#010x}...")
+            chunk = os.path.join(workdir, f"write_{offset:08x}.bin")
+            with open(chunk, 'wb') as f:
+                f.write(data[offset:offset + size])
+            self._call(f"flash write_image erase {tcl_path(chunk)} {flash_start + offset:#010x}",
+                       self.FLASH_TIMEOUT)
+            self._call(f"verify_image {tcl_path(chunk)} {flash_start + offset:#010x}",
+                       self.FLASH_TIMEOUT)
+
+    def _flash_changed(self, firmware_path, flash_start, counts, progress):
+        """다른 섹터만 쓰기 (다른 섹터가 절반을 넘어 전체를 써야 하면 False)"""
+        data = firmware_data(firmware_path)
+        with tempfile.TemporaryDirectory(prefix='openocd_diff_') as workdir:
+            progress(40, "Comparing flash sectors...")
+            total = -(-len(data) // self.sector_size())
+            changed = self._changed_sectors(data, flash_start, workdir, total // 2)
+            if changed is None:
+                counts[:] = [total, total]
+                return False
+            counts[:] = [len(changed), total]
+            self._write_sectors(data, flash_start, changed, workdir, progress)
+        return True
+
+    def _flash_sparse(self, firmware_path, flash_start, counts, progress):
+        """코드가 있는 구간만 지우고 쓰고 검증 (0xFF 구간은 지워져 있는지만 확인)
+
+        0xFF로 채운 페이지가 없으면 False를 돌려 전체 쓰기로 처리한다.
+        """
+        sector = self.sector_size()
+        image = sparse_image(firmware_path, sector)
+        if not image.sparse:
+            return False
+        counts[:] = [-(-image.occupied // sector), -(-image.size // sector)]
+        progress(40, "Checking blank pages...")
+        for offset, size in image.gaps:
+            # 이미 지워진 구간은 CRC 비교 한 번으로 끝, 아니면 지우기만 (쓰기/검증 없음)
+            if not self._matches(image.blank_file(size), flash_start + offset):
+                self._call(f"flash erase_address pad {flash_start + offset:#010x} {size:#x}",
+                           self.FLASH_TIMEOUT)
+        for index, segment in enumerate(image.segments):
+            address = flash_start + segment.offset
+            progress(50 + 45 * index // len(image.segments),
+                     f"Writing {segment.size // 1024} KB at {address:#010x}...")
+            self._call(f"flash write_image erase {tcl_path(segment.path)} {address:#010x}",
+                       self.FLASH_TIMEOUT)
+            self._call(f"verify_image {tcl_path(segment.path)} {address:#010x}",
+                       self.FLASH_TIMEOUT)
+        return True
+
+    def flash(self, firmware_path, flash_start=None, on_progress=None, differential=False,
+              sparse=True):
+        """연결된 보드에 펌웨어 쓰기 + 검증 후 실행 → FlashReport
+
+        flash_start는 .bin 파일의 시작 주소 (.hex/.elf는 None).
+        on_progress(percent, status)로 단계별 진행률을 알린다.
+        differential이면 (.bin만) 타깃 플래시와 CRC가 다른 섹터만 지우고 쓰므로,
+        바뀌지 않은 보드는 검증 시간만에 끝난다. 비교에서 같다고 확인된 섹터는 다시
+        검증하지 않고, 절반 넘게 다르면 전체를 한 번에 쓴다.
+        sparse이면 (.bin만) 0xFF로 채운 페이지는 쓰지 않고 지우기만 한다.
+        도중에 서버가 멈추면 다시 띄우고 reset init부터 다시 한다.
+        """
+        def progress(percent, status):
+            if on_progress is not None:
+                on_progress(percent, status)
+
+        path = tcl_path(firmware_path)
+        address = f" {flash_start:#010x}" if flash_start is not None else ""
+        differential = differential and flash_start is not None
+        sparse = sparse and flash_start is not None
+        counts = [None, None]
+
+        def run():
+            progress(30, "Resetting target...")
+            self._call("reset init")
+            if differential and self._flash_changed(firmware_path, flash_start, counts, progress):
+                self._call("reset run")
+                return
+            if sparse and self._flash_sparse(firmware_path, flash_start, counts, progress):
+                self._call("reset run")
+                return
+            progress(50, "Writing firmware...")
+            self._call(f"flash write_image erase {path}{address}", self.FLASH_TIMEOUT)
+            progress(85, "Verifying firmware...")
+            self._call(f"verify_image {path}{address}", self.FLASH_TIMEOUT)
+            self._call("reset run")
+
+        with self._lock:
+            self._aborted = False
+            start = time.monotonic()
+            restarts = self.restarts
+            fresh = not self.running
+            progress(10, "Connecting to OpenOCD...")
+            self._retry(run, "flash")
+            progress(100, "Download completed")
+
+            # 서버가 이미 떠 있었으면 시작/종료 시간만큼 아낌
+            saved = 0.0 if fresh or self.restarts != restarts else self.startup_time
+            self.boards += 1
+            self.saved_time += saved
+            return FlashReport(time.monotonic() - start, saved, *counts)
+
+
+_sessions = {}  # slot -> OpenOCDSession
+_sessions_lock = threading.Lock()
+
+
+def openocd_session(probe=None, slot=0, target="target/stm32g4x.cfg",
+                    interface="interface/stlink.cfg"):
+    """슬롯(프로브)별 공용 세션 반환
+
+    같은 슬롯에 다른 프로브/타깃 설정을 요청하면 기존 서버를 닫고 새로 만든다
+    (어댑터는 한 프로세스만 열 수 있으므로). 프로브 미지정 세션은 아무 프로브나
+    잡으므로, 프로브 지정 세션과는 함께 두지 않는다.
+    """
+    command = openocd_server_command(probe, slot, target, interface)
+    with _sessions_lock:
+        for key, other in list(_sessions.items()):
+            if (key == slot and other.command != command) or \
+                    ((probe is None) != (other.probe is None)):
+                other.stop()
+                del _sessions[key]
+        session = _sessions.get(slot)
+        if session is None:
+            session = _sessions[slot] = OpenOCDSession.for_probe(probe, slot, target, interface)
+        return session
+
+
+@atexit.register
+def close_sessions():
+    """열어 둔 OpenOCD 서버 모두 종료"""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.stop()
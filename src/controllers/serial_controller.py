@@ -1,15 +1,19 @@
 import serial
 import serial.tools.list_ports
 
+from ..models.serial_settings import SerialSettings
+
 class PortManager:
-    def __init__(self):
+    def __init__(self, baudrate=SerialSettings.BAUD_RATE):
         self.current_port = None
-        self.baudrate = 115200
+        self.baudrate = baudrate
 
     def get_available_ports(self):
         return [port.device for port in serial.tools.list_ports.comports()]
 
-    def connect(self, port):
+    def connect(self, port, baudrate=None):
+        if baudrate is not None:
+            self.baudrate = baudrate
         try:
             self.current_port = serial.Serial(port, self.baudrate)
             return True
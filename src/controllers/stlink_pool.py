@@ -0,0 +1,272 @@
+import queue
+import re
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import serial.tools.list_ports
+
+from .stm_image import sparse_image
+
+STLINK_VID = 0x0483
+STLINK_PIDS = {
+    0x3748,                          # ST-LINK/V2
+    0x374B, 0x3752,                  # ST-LINK/V2-1
+    0x374A,                          # ST-LINK/V2-1 (어댑터 전용)
+    0x374D, 0x374E, 0x374F, 0x3753, 0x3754, 0x3757,  # STLINK-V3 계열
+}
+
+STLinkProbe = namedtuple('STLinkProbe', 'serial description')
+
+# OpenOCD 인스턴스별 포트 (프로브 슬롯마다 기본 포트 + 슬롯 번호)
+OpenOCDPorts = namedtuple('OpenOCDPorts', 'gdb telnet tcl')
+BASE_PORTS = OpenOCDPorts(3333, 4444, 6666)
+
+
+def slot_ports(slot):
+    """프로브 슬롯 번호에 해당하는 GDB/telnet/TCL 포트"""
+    return OpenOCDPorts(*(port + slot for port in BASE_PORTS))
+
+
+def enumerate_stlinks():
+    """연결된 ST-Link 목록 (시리얼 번호 순)
+
+    가상 COM 포트가 있는 V2-1/V3는 pyserial로, VCP가 없는 V2는 st-info --probe
+    (stlink 도구가 설치된 경우)로 찾는다.
+    """
+    probes = {}
+    for port in serial.tools.list_ports.comports():
+        if port.vid == STLINK_VID and port.pid in STLINK_PIDS and port.serial_number:
+            probes[port.serial_number] = STLinkProbe(port.serial_number, port.description)
+    try:
+        result = subprocess.run(["st-info", "--probe"], capture_output=True, text=True, timeout=10)
+        for serial_number in re.findall(r'serial:\s*([0-9A-Fa-f]+)', result.stdout):
+            probes.setdefault(serial_number, STLinkProbe(serial_number, "ST-LINK"))
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    return [probes[key] for key in sorted(probes)]
+
+
+@lru_cache(maxsize=1)
+def openocd_version():
+    """설치된 OpenOCD 버전 튜플 (확인할 수 없으면 (0, 0))"""
+    try:
+        result = subprocess.run(["openocd", "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return (0, 0)
+    match = re.search(r'Open On-Chip Debugger (\d+)\.(\d+)', result.stdout + result.stderr)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+def adapter_serial_command(serial_number):
+    """프로브 선택 명령 (OpenOCD 0.12부터 adapter serial, 이전 버전은 hla_serial)"""
+    if openocd_version() >= (0, 12):
+        return f"adapter serial {serial_number}"
+    return f"hla_serial {serial_number}"
+
+
+def openocd_server_command(probe=None, slot=0, target="target/stm32g4x.cfg",
+                           interface="interface/stlink.cfg"):
+    """어댑터/타깃 설정까지의 OpenOCD 명령 (뒤에 -c 명령을 붙여 사용)
+
+    probe를 지정하면 해당 시리얼 번호의 ST-Link에만 붙고, 슬롯별로 다른
+    GDB/telnet/TCL 포트를 써서 여러 인스턴스를 동시에 띄울 수 있다.
+    """
+    cmd = ["openocd", "-f", interface]
+    if probe is not None:
+        cmd += ["-c", adapter_serial_command(probe.serial)]
+    ports = slot_ports(slot)
+    cmd += [
+        "-c", f"gdb_port {ports.gdb}",
+        "-c", f"telnet_port {ports.telnet}",
+        "-c", f"tcl_port {ports.tcl}",
+        "-f", target,
+    ]
+    return cmd
+
+
+def tcl_path(path):
+    """OpenOCD 명령에 넣을 파일 경로 (공백이 있어도 되도록 {}로 감싸고 슬래시로 통일)"""
+    return "{" + str(path).replace('\\', '/') + "}"
+
+
+def _write_commands(firmware_path, flash_start, sparse):
+    """펌웨어 쓰기 + 검증 명령 (sparse이면 0xFF 구간은 지우기만 하고 코드 구간만 쓰기)"""
+    image = sparse_image(firmware_path) if sparse and firmware_path.endswith('.bin') else None
+    if image is None or not image.sparse:
+        path = tcl_path(firmware_path)
+        return [f"flash write_image erase {path} {flash_start:#010x}",
+                f"verify_image {path} {flash_start:#010x}"]
+    commands = [f"flash erase_address pad {flash_start + offset:#010x} {size:#x}"
+                for offset, size in image.gaps]
+    for segment in image.segments:
+        path = tcl_path(segment.path)
+        commands += [f"flash write_image erase {path} {flash_start + segment.offset:#010x}",
+                     f"verify_image {path} {flash_start + segment.offset:#010x}"]
+    return commands
+
+
+def openocd_flash_command(firmware_path, probe=None, slot=0, flash_start=0x08000000,
+                          target="target/stm32g4x.cfg", sparse=True):
+    """펌웨어 쓰기 + 검증 후 리셋하고 종료하는 OpenOCD 명령 (보드마다 새 프로세스)"""
+    cmd = openocd_server_command(probe, slot, target)
+    cmd.insert(1, "-d2")
+    cmd += ["-c", "init", "-c", "reset init", "-c", "halt"]
+    for command in _write_commands(str(firmware_path), flash_start, sparse):
+        cmd += ["-c", command]
+    cmd += [
+        "-c", "reset run",
+        "-c", "shutdown",
+    ]
+    return cmd
+
+
+class STMResult:
+    """ST-Link 풀에서 보드 하나의 다운로드 결과"""
+
+    WAITING = 'Waiting'
+    FLASHING = 'Flashing'
+    DONE = 'Done'
+    FAILED = 'Failed'
+
+    def __init__(self, board):
+        self.board = board
+        self.probe = ''
+        self.status = self.WAITING
+        self.progress = 0
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.saved = 0.0  # 떠 있던 OpenOCD 서버를 재사용해 아낀 시간
+        self.message = ''
+
+    @property
+    def ok(self):
+        return self.status == self.DONE
+
+
+class STLinkPool:
+    """보드 대기열을 비어 있는 ST-Link에 차례로 나눠 주는 스케줄러
+
+    프로브마다 작업 스레드 하나가 대기열에서 보드를 꺼내 자기 프로브에 묶인
+    OpenOCD 서버(OpenOCDSession)로 다운로드하므로, 처리량이 프로브 수에 비례한다.
+    서버는 프로브마다 한 번만 띄우고 보드가 바뀌어도 TCL RPC로 계속 사용한다.
+    on_update(result)는 작업 스레드에서 호출된다.
+    """
+
+    RETRY_DELAY = 1.0
+
+    def __init__(self, probes, firmware_path, retries=1, on_update=None,
+                 flash_start=0x08000000, on_log=None, differential=False, sparse=True):
+        self.probes = list(probes)
+        self.differential = differential
+        self.sparse = sparse
+        self.firmware_path = firmware_path
+        self.retries = retries
+        self.on_update = on_update
+        self.on_log = on_log
+        self.flash_start = flash_start
+        self._stop_event = threading.Event()
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _notify(self, result):
+        if self.on_update is not None:
+            self.on_update(result)
+
+    def _session(self, probe, slot):
+        # openocd_session이 이 모듈의 명령 함수를 쓰므로 여기서 import
+        from .openocd_session import openocd_session
+        with self._lock:
+            session = self._sessions.get(slot)
+            if session is None:
+                session = self._sessions[slot] = openocd_session(probe, slot)
+            return session
+
+    def flash(self, result, probe, slot):
+        """보드 하나를 지정한 프로브로 다운로드 (실패 시 retries번 재시도)"""
+        from .openocd_session import OpenOCDError, TargetNotConnected
+
+        start = time.monotonic()
+        result.probe = probe.serial
+        session = self._session(probe, slot)
+        for attempt in range(1, self.retries + 2):
+            result.attempts = attempt
+            result.status = result.FLASHING
+            result.progress = 0
+            self._notify(result)
+
+            def on_progress(percent, status):
+                result.progress = percent
+                result.message = status
+                self._notify(result)
+
+            try:
+                report = session.flash(self.firmware_path, self.flash_start, on_progress,
+                                       self.differential, self.sparse)
+                result.status = result.DONE
+                result.saved = report.saved
+                notes = []
+                if report.total is not None:
+                    notes.append(f"{report.written}/{report.total} sectors")
+                if report.saved:
+                    notes.append(f"Reused OpenOCD (-{report.saved:.1f} s)")
+                result.message = ", ".join(notes)
+                break
+            except TargetNotConnected:
+                message = "Target not connected"
+            except OpenOCDError as e:
+                message = str(e)
+            except OSError as e:
+                message = f"Download failed: {str(e)}"
+            if self.on_log is not None:
+                self.on_log(f"[{probe.serial}] {message} ({session.last_output()})")
+            result.status = result.FAILED
+            result.message = message.splitlines()[-1] if message else ''
+            if attempt <= self.retries and not self._stop_event.is_set():
+                self._notify(result)
+                time.sleep(self.RETRY_DELAY)
+            else:
+                break
+        result.elapsed = time.monotonic() - start
+        self._notify(result)
+        return result
+
+    def run(self, boards):
+        """보드 이름 목록을 모두 다운로드하고 STMResult 목록 반환 (끝날 때까지 대기)"""
+        results = [STMResult(board) for board in boards]
+        if not self.probes:
+            for result in results:
+                result.status = result.FAILED
+                result.message = "No ST-Link probe found"
+            return results
+
+        pending = queue.Queue()
+        for result in results:
+            pending.put(result)
+
+        def worker(slot, probe):
+            while not self._stop_event.is_set():
+                try:
+                    result = pending.get_nowait()
+                except queue.Empty:
+                    return
+                self.flash(result, probe, slot)
+
+        threads = [threading.Thread(target=worker, args=(slot, probe), daemon=True,
+                                    name=f"stlink-{probe.serial}")
+                   for slot, probe in enumerate(self.probes)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def stop(self):
+        """남은 보드는 시작하지 않고 실행 중인 OpenOCD 종료"""
+        self._stop_event.set()
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            session.abort()
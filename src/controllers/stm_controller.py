@@ -1,14 +1,13 @@
 import subprocess
-import sys
 import os
-import time
 from ..models.stm_settings import STMSettings
-from PyQt5.QtCore import QProcess
+from .stlink_pool import STLinkPool, openocd_flash_command
+from .openocd_session import TargetNotConnected, openocd_session
+from .stm_image import sparse_image
+from PyQt5.QtCore import QThread, pyqtSignal
 import logging
 from PyQt5.QtWidgets import QMessageBox
 from pathlib import Path
-import tempfile
-import shutil
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -16,7 +15,6 @@ logger = logging.getLogger(__name__)
 class STMController:
     def __init__(self):
         self.settings = STMSettings()
-        self.process = None
         self.logger = logging.getLogger('STM32')
         self.logger.setLevel(logging.INFO)
         if not self.logger.handlers:
@@ -89,31 +87,24 @@ For other Linux:
         """펌웨어 파일 경로 설정"""
         self.settings.firmware_path = firmware_path
 
-    def create_download_command(self):
-        # 경로 처리 개선
-        firmware_path = self.settings.firmware_path
-        
-        # Windows 환경에서 경로 처리
-        if os.name == 'nt':
-            # 경로에 공백이 있으면 따옴표로 감싸기
-            if ' ' in firmware_path:
-                firmware_path = f'"{firmware_path}"'
-            # 백슬래시를 포워드 슬래시로 변환 (OpenOCD 호환성)
-            firmware_path = firmware_path.replace('\\', '/')
-        
-        cmd = [
-            "openocd",
-            "-d2",
-            "-f", "interface/stlink.cfg",
-            "-f", "target/stm32g4x.cfg",
-            "-c", "init",
-            "-c", "reset init",
-            "-c", "halt",
-            "-c", f"flash write_image erase {firmware_path} 0x08000000",
-            "-c", f"verify_image {firmware_path}",
-            "-c", "reset run",
-            "-c", "shutdown"
-        ]
+    def firmware_image(self):
+        """선택한 .bin 펌웨어의 코드/0xFF 구간 목록 (SparseImage, 미리 나눠 캐시해 둠)"""
+        path = self.settings.firmware_path
+        if not self.settings.sparse or not path or not path.endswith('.bin'):
+            return None
+        try:
+            image = sparse_image(path)
+        except OSError as e:
+            self.logger.error(f"Cannot read firmware: {str(e)}")
+            return None
+        self.logger.info(f"Firmware code: {image.occupied // 1024} KB of {image.size // 1024} KB "
+                         f"({len(image.segments)} segments)")
+        return image
+
+    def create_download_command(self, probe=None, slot=0):
+        """OpenOCD 다운로드 명령 생성 (probe: 사용할 ST-Link, 없으면 처음 찾은 것)"""
+        cmd = openocd_flash_command(self.settings.firmware_path, probe, slot,
+                                    self.settings.flash_start, sparse=self.settings.sparse)
         self.logger.info(f"Command: {' '.join(cmd)}")  # 실행 명령어 로깅
         return cmd
 
@@ -137,179 +128,52 @@ For other Linux:
             # 다운로드 시작 시 진행률 표시
             progress_callback(10, "Initializing OpenOCD...")
             
-            # Windows에서는 배치 파일 방식 사용
-            if os.name == 'nt':
-                return self._download_windows(progress_callback)
-            else:
-                return self._download_unix(progress_callback)
+            # Windows도 같은 방식 (TCL 명령의 경로는 {}로 감싸고 슬래시로 바꿔 전달)
+            return self._download_session(progress_callback)
             
         except Exception as e:
             self.logger.error(f"Download error: {str(e)}")
             return False, f"Download failed: {str(e)}"
 
-    def _download_windows(self, progress_callback):
-        """Windows 환경에서 다운로드 실행"""
+    def _download_session(self, progress_callback):
+        """다운로드 실행 (떠 있는 OpenOCD 서버를 보드가 바뀌어도 재사용)"""
         try:
-            # 펌웨어 파일 경로 확인
-            if not os.path.exists(self.settings.firmware_path):
-                self.logger.error(f"Firmware file not found: {self.settings.firmware_path}")
-                return False, f"Firmware file not found: {self.settings.firmware_path}"
-            
-            # 현재 작업 디렉토리에 파일 복사
-            import shutil
-            
-            # 간단한 이름으로 현재 디렉토리에 복사
-            firmware_copy = "firmware_temp.bin"
-            shutil.copy2(self.settings.firmware_path, firmware_copy)
-            self.logger.info(f"Copied firmware to current directory: {firmware_copy}")
-            
-            # 명령어 생성 - 상대 경로 사용
-            cmd = [
-                "openocd",
-                "-d2",
-                "-f", "interface/stlink.cfg",
-                "-f", "target/stm32g4x.cfg",
-                "-c", "init",
-                "-c", "reset init",
-                "-c", "halt",
-                "-c", f"flash write_image erase firmware_temp.bin 0x08000000",
-                "-c", f"verify_image firmware_temp.bin",
-                "-c", "reset run",
-                "-c", "shutdown"
-            ]
-            
-            self.logger.info(f"Command: {' '.join(cmd)}")
-            progress_callback(30, "Connecting to STM32...")
-            
-            # 프로세스 실행
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            
-            # 출력 처리
-            output_lines = []
-            while True:
-                line = self.process.stdout.readline()
-                if not line and self.process.poll() is not None:
-                    break
-                
-                if line:
-                    line = line.strip()
-                    output_lines.append(line)
-                    self.logger.info(f"OpenOCD: {line}")
-                    
-                    # 진행 상태 업데이트
-                    if "auto-selecting first available session" in line:
-                        progress_callback(40, "Detecting STM32...")
-                    elif "Target voltage" in line:
-                        progress_callback(50, "Target detected...")
-                    elif "flash size" in line:
-                        progress_callback(60, "Preparing to flash...")
-                    elif "Adding extra erase range" in line or "auto erase enabled" in line:
-                        progress_callback(70, "Erasing flash...")
-                    elif "wrote" in line:
-                        progress_callback(80, "Writing firmware...")
-                    elif "verified" in line:
-                        progress_callback(90, "Verifying firmware...")
-                    elif "shutdown command invoked" in line:
-                        progress_callback(95, "Finalizing...")
-            
-            # 임시 파일 정리
-            try:
-                os.remove(firmware_copy)
-            except:
-                pass
-            
-            # 프로세스 종료 코드 확인
-            returncode = self.process.poll()
-            self.logger.info(f"OpenOCD process exited with code: {returncode}")
-            
-            if returncode == 0:
-                progress_callback(100, "Download completed")
-                self.logger.info("Download completed successfully")
-                return True, "Download completed successfully"
-            else:
-                error_msg = "\n".join(output_lines[-5:]) if output_lines else "Unknown error"
-                self.logger.error(f"Download failed: {error_msg}")
-                return False, f"Download failed: {error_msg}"
-            
+            session = openocd_session()
+            report = session.flash(self.settings.firmware_path, self.settings.flash_start,
+                                   progress_callback, self.settings.differential,
+                                   self.settings.sparse)
+            if report.total is not None:
+                self.logger.info(f"Sectors written: {report.written}/{report.total}")
+            self.logger.info(f"Download completed in {report.elapsed:.1f} s "
+                             f"(OpenOCD reuse saved {report.saved:.1f} s)")
+            return True, "Download completed successfully"
+
+        except TargetNotConnected as e:
+            self.logger.error(f"Target not connected: {str(e)}")
+            return False, "Download failed: Target not connected"
         except Exception as e:
-            self.logger.error(f"Windows download failed: {str(e)}")
+            self.logger.error(f"Download failed: {str(e)}")
             return False, f"Download failed: {str(e)}"
 
-    def _download_unix(self, progress_callback):
-        """Unix 환경에서 다운로드 실행"""
-        try:
-            # 명령어 생성
-            cmd = [
-                "openocd",
-                "-d2",
-                "-f", "interface/stlink.cfg",
-                "-f", "target/stm32g4x.cfg",
-                "-c", "init",
-                "-c", "reset init",
-                "-c", "halt",
-                "-c", f"flash write_image erase {self.settings.firmware_path} 0x08000000",
-                "-c", f"verify_image {self.settings.firmware_path}",
-                "-c", "reset run",
-                "-c", "shutdown"
-            ]
-            
-            self.logger.info(f"Command: {' '.join(cmd)}")
-            progress_callback(30, "Connecting to STM32...")
-            
-            # 프로세스 실행
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            
-            # 출력 처리
-            output_lines = []
-            while True:
-                line = self.process.stdout.readline()
-                if not line and self.process.poll() is not None:
-                    break
-                
-                if line:
-                    line = line.strip()
-                    output_lines.append(line)
-                    self.logger.info(f"OpenOCD: {line}")
-                    
-                    # 진행 상태 업데이트
-                    if "auto-selecting first available session" in line:
-                        progress_callback(40, "Detecting STM32...")
-                    elif "Target voltage" in line:
-                        progress_callback(50, "Target detected...")
-                    elif "flash size" in line:
-                        progress_callback(60, "Preparing to flash...")
-                    elif "Adding extra erase range" in line or "auto erase enabled" in line:
-                        progress_callback(70, "Erasing flash...")
-                    elif "wrote" in line:
-                        progress_callback(80, "Writing firmware...")
-                    elif "verified" in line:
-                        progress_callback(90, "Verifying firmware...")
-                    elif "shutdown command invoked" in line:
-                        progress_callback(95, "Finalizing...")
-            
-            # 프로세스 종료 코드 확인
-            returncode = self.process.poll()
-            self.logger.info(f"OpenOCD process exited with code: {returncode}")
-            
-            if returncode == 0:
-                progress_callback(100, "Download completed")
-                self.logger.info("Download completed successfully")
-                return True, "Download completed successfully"
-            else:
-                error_msg = "\n".join(output_lines[-5:]) if output_lines else "Unknown error"
-                self.logger.error(f"Download failed: {error_msg}")
-                return False, f"Download failed: {error_msg}"
-            
-        except Exception as e:
-            self.logger.error(f"Unix download failed: {str(e)}")
-            return False, f"Download failed: {str(e)}"
+class STLinkPoolThread(QThread):
+    """보드 대기열을 연결된 ST-Link들로 나눠 동시에 다운로드"""
+    board_updated = pyqtSignal(object)   # STMResult (작업 스레드에서 발생)
+    pool_completed = pyqtSignal(list)
+
+    def __init__(self, probes, firmware_path, boards, retries=1, flash_start=0x08000000,
+                 differential=False, sparse=True):
+        super().__init__()
+        self.boards = list(boards)
+        self.logger = logging.getLogger('STM32')
+        self.pool = STLinkPool(probes, firmware_path, retries,
+                               on_update=self.board_updated.emit,
+                               flash_start=flash_start,
+                               on_log=self.logger.debug,
+                               differential=differential,
+                               sparse=sparse)
+
+    def run(self):
+        self.pool_completed.emit(self.pool.run(self.boards))
+
+    def stop(self):
+        self.pool.stop()
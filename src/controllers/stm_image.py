@@ -0,0 +1,107 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+from ..models.firmware_catalog import firmware_catalog
+
+PAGE_SIZE = 0x1000  # STM32G4 플래시 지우기 단위 상한 (단일 뱅크 4 KB, 듀얼 뱅크 2 KB)
+
+# 펌웨어의 한 구간 (offset: 파일 안 위치, size: 바이트 수, path: 구간만 잘라 둔 파일)
+Segment = namedtuple('Segment', 'offset size path')
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'serialpy_stm_images')
+
+
+class SparseImage:
+    """0xFF(지워진 상태)로만 채워진 페이지를 뺀 .bin 펌웨어
+
+    플래시 크기에 맞춰 0xFF로 채운 이미지도 실제 코드가 있는 페이지(segments)만
+    쓰고 검증하면 되고, 나머지(gaps)는 지워져 있기만 하면 검증된 것으로 본다.
+    구간 파일(과 빈 구간 확인용 0xFF 파일)은 이미지 해시별 캐시 디렉터리(directory)에
+    한 번만 만든다.
+    """
+
+    def __init__(self, data, page_size=PAGE_SIZE, digest=None, directory=None):
+        self.size = len(data)
+        self.page_size = page_size
+        self.digest = digest or hashlib.md5(data).hexdigest()
+        self.segments = []
+        self.gaps = []  # 0xFF 구간 (offset, size)
+
+        blank = b'\xff' * page_size
+        runs = []  # [offset, size, occupied]
+        for offset in range(0, len(data), page_size):
+            page = data[offset:offset + page_size]
+            occupied = page != blank[:len(page)]
+            if runs and runs[-1][2] == occupied:
+                runs[-1][1] += len(page)
+            else:
+                runs.append([offset, len(page), occupied])
+
+        self.directory = directory or os.path.join(CACHE_DIR, f"{self.digest}_{page_size:x}")
+        os.makedirs(self.directory, exist_ok=True)
+        for offset, size, occupied in runs:
+            if not occupied:
+                self.gaps.append((offset, size))
+                continue
+            path = os.path.join(self.directory, f"{offset:08x}.bin")
+            _write_once(path, data[offset:offset + size])
+            self.segments.append(Segment(offset, size, path))
+
+    @property
+    def occupied(self):
+        """실제로 쓸 바이트 수"""
+        return sum(segment.size for segment in self.segments)
+
+    @property
+    def sparse(self):
+        return bool(self.gaps)
+
+    def blank_file(self, size):
+        """0xFF size바이트 파일 (빈 구간이 지워져 있는지 CRC로 확인할 때 사용)"""
+        path = os.path.join(self.directory, f"blank_{size:x}.bin")
+        _write_once(path, b'\xff' * size)
+        return path
+
+
+def _write_once(path, data):
+    """파일이 없을 때만 쓰기 (임시 파일에 쓴 뒤 교체, 여러 프로브 스레드가 동시에 불러도 안전)"""
+    if not os.path.exists(path):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+
+_cache = {}  # (SHA-256, 페이지 크기) -> SparseImage
+_cache_lock = threading.Lock()
+
+
+def firmware_data(path):
+    """펌웨어 파일 내용 (카탈로그에 색인된 파일만, 색인이 최신인지는 stat으로 확인)"""
+    entry = firmware_catalog().entry(path)
+    if entry is None:
+        raise FileNotFoundError(path)
+    return entry.read()
+
+
+def sparse_image(path, page_size=PAGE_SIZE):
+    """펌웨어 파일의 SparseImage (내용이 바뀌지 않았으면 캐시 사용)
+
+    펌웨어 카탈로그의 해시로 찾으므로 작업마다 파일을 다시 읽거나 해시하지 않고,
+    구간 파일은 카탈로그의 이미지별 디렉터리에 두어 프로그램을 다시 시작해도 재사용한다.
+    """
+    entry = firmware_catalog().entry(path)
+    if entry is None:
+        raise FileNotFoundError(path)
+    key = (entry.sha256, page_size)
+    with _cache_lock:
+        image = _cache.get(key)
+    if image is None:
+        image = SparseImage(entry.read(), page_size, entry.sha256,
+                            os.path.join(entry.object_dir, f"segments_{page_size:x}"))
+        with _cache_lock:
+            _cache[key] = image
+    return image
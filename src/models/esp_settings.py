@@ -15,6 +15,7 @@ class ESPSettings:
     # 통신 설정
     BAUD_RATE_FLASH = 921600
     BAUD_RATE_MONITOR = 115200
+    AUTO_BAUD = 'auto'  # 어댑터별로 가장 빠르게 안정적인 보레이트를 찾아 사용
 
     def __init__(self):
         self.port = None
@@ -23,3 +24,18 @@ class ESPSettings:
         self.partition_path = str(base_path / 'partition-table.bin')
         self.ota_path = str(base_path / 'ota_data_initial.bin')
         self.app_path = str(base_path / 'esp32.bin')
+        self.differential = False  # 플래시 내용과 다른 섹터만 쓰기 (재작업/재플래시용)
+        self.adaptive_baud = True  # 빠른 보레이트부터 시도하고 실패하면 낮춤 (어댑터별로 기억)
+
+    def flash_baud(self):
+        """플래시 보레이트 (adaptive_baud이면 AUTO_BAUD)"""
+        return self.AUTO_BAUD if self.adaptive_baud else self.BAUD_RATE_FLASH
+
+    def flash_images(self):
+        """플래시할 (주소, 파일) 목록"""
+        return [
+            (self.BOOTLOADER_ADDR, self.bootloader_path),
+            (self.PARTITION_ADDR, self.partition_path),
+            (self.OTA_DATA_ADDR, self.ota_path),
+            (self.APP_ADDR, self.app_path),
+        ]
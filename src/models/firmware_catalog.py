@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import threading
+from pathlib import Path
+
+from .esp_settings import ESPSettings
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / 'config'
+
+# 카탈로그에 넣을 펌웨어 디렉터리 (config 기준, 하위 history 포함)
+CATALOG_ROOTS = ['esp', 'stm']
+FIRMWARE_EXTENSIONS = {'.bin', '.hex'}
+
+STM_FLASH_START = 0x08000000
+
+# ESP 이미지 헤더의 chip_id (확장 헤더 12~13번째 바이트)
+ESP_CHIP_IDS = {0: 'esp32', 2: 'esp32s2', 5: 'esp32c3', 9: 'esp32s3', 12: 'esp32c2',
+                13: 'esp32c6', 16: 'esp32h2'}
+ESP_IMAGE_MAGIC = 0xE9
+ESP_APP_DESC_MAGIC = 0xABCD5432
+ESP_APP_DESC_OFFSET = 0x20  # 이미지 헤더(24) + 첫 세그먼트 헤더(8)
+
+VERSION_PATTERN = re.compile(r'v(\d+(?:\.\d+)+)')
+
+
+class FirmwareEntry:
+    """카탈로그에 등록된 펌웨어 이미지 한 개 (SHA-256 기준)"""
+
+    # flash_size/flash_md5: 4바이트 정렬로 0xFF를 채운, 실제로 플래시에 쓰는 데이터 기준
+    FIELDS = ['path', 'sha256', 'size', 'mtime_ns', 'version', 'chip', 'address',
+              'flash_size', 'flash_md5']
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+        self.object_dir = None
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def read(self):
+        """원본 이미지 바이트 (메모리에 보관하지 않고 읽을 때마다 파일에서)"""
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+def _esp_metadata(data):
+    """ESP 이미지 헤더/앱 설명에서 (칩, 버전) 읽기 (ESP 이미지가 아니면 None)"""
+    if len(data) < ESP_APP_DESC_OFFSET + 48 or data[0] != ESP_IMAGE_MAGIC:
+        return None, None
+    chip = ESP_CHIP_IDS.get(struct.unpack_from('<H', data, 12)[0])
+    version = None
+    magic, = struct.unpack_from('<I', data, ESP_APP_DESC_OFFSET)
+    if magic == ESP_APP_DESC_MAGIC:
+        raw = data[ESP_APP_DESC_OFFSET + 16:ESP_APP_DESC_OFFSET + 48]
+        version = raw.split(b'\0', 1)[0].decode('ascii', errors='replace') or None
+    return chip, version
+
+
+def _default_address(root, name):
+    """파일 이름/디렉터리로 정한 플래시 주소"""
+    if root == 'stm':
+        return STM_FLASH_START
+    addresses = {'bootloader': ESPSettings.BOOTLOADER_ADDR,
+                 'partition': ESPSettings.PARTITION_ADDR,
+                 'ota_data': ESPSettings.OTA_DATA_ADDR}
+    for prefix, address in addresses.items():
+        if name.startswith(prefix):
+            return int(address, 0)
+    return int(ESPSettings.APP_ADDR, 0)
+
+
+class FirmwareCatalog:
+    """config 아래 펌웨어를 SHA-256으로 색인하고 이미지별 파생 파일 디렉터리를 두는 카탈로그
+
+    색인(config/catalog/index.json)에는 경로, 해시, 메타데이터만 두고 이미지 바이트는
+    메모리에 보관하지 않는다. 파일 크기와 수정 시각이 같으면 다시 해시하지 않고,
+    파생 파일(objects/<sha256>/: STM 코드 구간 파일)은 내용이 같은 이미지끼리 공유한다.
+    해시는 잠금 밖에서 하므로 색인 중에도 조회는 바로 끝난다.
+    다운로드 작업은 entry()로 경로 → 항목을 dict에서 바로 찾으므로 작업마다 해시하지 않는다.
+    """
+
+    def __init__(self, config_path=CONFIG_PATH):
+        self.config_path = Path(os.path.abspath(config_path))
+        self.catalog_path = self.config_path / 'catalog'
+        self.index_path = self.catalog_path / 'index.json'
+        self.objects_path = self.catalog_path / 'objects'
+        self._root_prefixes = [(root, os.path.join(self.config_path, root, '')) for root in CATALOG_ROOTS]
+        self._entries = {}   # 절대 경로 -> FirmwareEntry
+        self._by_hash = {}   # sha256 -> FirmwareEntry
+        self._building = set()  # 파생 파일을 만드는 중인 sha256 (정리 대상에서 제외)
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+        self._refresh_requested = False
+        self._pending_paths = set()
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = []
+        for values in stored if isinstance(stored, list) else []:
+            entry = FirmwareEntry(**values)
+            if entry.path and entry.sha256:
+                self._add(entry)
+
+    def _add(self, entry):
+        entry.object_dir = str(self.objects_path / entry.sha256)
+        self._entries[entry.path] = entry
+        self._by_hash[entry.sha256] = entry
+
+    def save(self):
+        with self._lock:
+            entries = [entry.to_dict() for entry in self._entries.values()]
+        try:
+            self.catalog_path.mkdir(parents=True, exist_ok=True)
+            self._write(str(self.index_path), json.dumps(entries, indent=2).encode('utf-8'))
+        except OSError as e:
+            print(f"펌웨어 카탈로그 저장 실패: {str(e)}")
+
+    def _root(self, key):
+        """파일이 속한 카탈로그 디렉터리 이름 (config 밖이면 None)"""
+        for root, prefix in self._root_prefixes:
+            if key.startswith(prefix):
+                return root
+        return None
+
+    def directories(self):
+        """변경을 감시할 펌웨어 디렉터리 목록 (하위 history 포함)"""
+        directories = []
+        for root in CATALOG_ROOTS:
+            path = self.config_path / root
+            if path.is_dir():
+                directories.append(str(path))
+                directories += [str(child) for child in sorted(path.rglob('*')) if child.is_dir()]
+        return directories
+
+    def files(self):
+        """config 안의 펌웨어 파일 목록 (색인 여부와 상관없이)"""
+        return [os.path.abspath(path) for _, path in self._scan()]
+
+    def _scan(self):
+        for root in CATALOG_ROOTS:
+            for path in sorted((self.config_path / root).rglob('*')):
+                if path.suffix.lower() in FIRMWARE_EXTENSIONS and path.is_file():
+                    yield root, path
+
+    @staticmethod
+    def _stale(entry, stat):
+        """색인 항목을 다시 만들어야 하는지 (없음, 크기/수정 시각 변경)"""
+        return entry is None or (entry.size, entry.mtime_ns) != (stat.st_size, stat.st_mtime_ns)
+
+    def refresh(self):
+        """디렉터리를 다시 훑어 바뀐 파일만 새로 색인하고 없어진 파일/사본 정리
+
+        파일마다 해시하므로 GUI 스레드에서는 refresh_async()를 쓴다.
+        """
+        found = set()
+        changed = False
+        for root, path in self._scan():
+            key = os.path.abspath(path)
+            found.add(key)
+            stat = path.stat()
+            with self._lock:
+                entry = self._entries.get(key)
+            if self._stale(entry, stat):
+                self._index(key, root, stat)
+                changed = True
+        with self._lock:
+            for key in set(self._entries) - found:
+                # config 밖에서 고른 파일은 지워졌을 때만 빼기
+                if self._root(key) is not None or not os.path.exists(key):
+                    del self._entries[key]
+                    changed = True
+            self._by_hash = {entry.sha256: entry for entry in self._entries.values()}
+            self._prune()
+        if changed:
+            self.save()
+
+    def refresh_async(self, paths=()):
+        """refresh()와 paths(config 밖에서 고른 파일) 색인을 작업 스레드에서 실행
+
+        이미 실행 중이면 끝난 뒤 한 번 더 실행한다.
+        """
+        with self._refresh_lock:
+            self._pending_paths.update(os.path.abspath(path) for path in paths if path)
+            self._refresh_requested = True
+            if self._refresh_thread is None:
+                self._refresh_thread = threading.Thread(target=self._refresh_worker, daemon=True,
+                                                        name='firmware-catalog')
+                self._refresh_thread.start()
+
+    def _refresh_worker(self):
+        while True:
+            with self._refresh_lock:
+                if not self._refresh_requested:
+                    self._refresh_thread = None
+                    return
+                self._refresh_requested = False
+                paths, self._pending_paths = self._pending_paths, set()
+            try:
+                for path in paths:
+                    self.entry(path)
+                self.refresh()
+            except OSError as e:
+                print(f"펌웨어 카탈로그 갱신 실패: {str(e)}")
+
+    def _index(self, key, root, stat):
+        """파일 한 개 해시 + 메타데이터 + 파생 파일 생성 (root: 'esp'/'stm', config 밖이면 None)
+
+        잠금 없이 해시하고 색인에 넣을 때만 잠근다.
+        """
+        with open(key, 'rb') as f:
+            data = f.read()
+        sha256 = hashlib.sha256(data).hexdigest()
+        name = os.path.basename(key).lower()
+        chip, version = _esp_metadata(data) if root != 'stm' else (None, None)
+        if version is None:
+            match = VERSION_PATTERN.search(name)
+            version = match.group(1) if match else None
+        padded = data + b'\xff' * (-len(data) % 4)  # esptool write_flash와 같은 정렬
+        entry = FirmwareEntry(path=key, sha256=sha256, size=stat.st_size,
+                              mtime_ns=stat.st_mtime_ns, version=version,
+                              chip=chip or {'esp': 'esp32', 'stm': 'stm32g4'}.get(root),
+                              address=_default_address(root, name) if root else None,
+                              flash_size=len(padded), flash_md5=hashlib.md5(padded).hexdigest())
+        entry.object_dir = str(self.objects_path / sha256)
+
+        # 같은 내용이면 (history 사본 등) 이미 만든 파생 파일 재사용
+        with self._lock:
+            self._building.add(sha256)
+        try:
+            os.makedirs(entry.object_dir, exist_ok=True)
+            with self._lock:
+                self._add(entry)
+        finally:
+            with self._lock:
+                self._building.discard(sha256)
+        return entry
+
+    @staticmethod
+    def _write(path, data):
+        # 여러 스레드가 같은 파일을 만들 수 있으므로 임시 파일 이름을 스레드별로
+        temp = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(data)
+        os.replace(temp, path)
+
+    def _prune(self):
+        """어떤 항목도 쓰지 않는 파생 파일 디렉터리 삭제 (_lock 안에서 호출)"""
+        if not self.objects_path.exists():
+            return
+        for directory in self.objects_path.iterdir():
+            if directory.name not in self._by_hash and directory.name not in self._building:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def entry(self, path):
+        """경로의 FirmwareEntry (색인에 없거나 파일이 바뀌었으면 그 파일만 다시 색인)"""
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        if self._stale(entry, stat):
+            entry = self._index(key, self._root(key), stat)
+            self.save()
+        return entry
+
+    def by_hash(self, sha256):
+        with self._lock:
+            return self._by_hash.get(sha256)
+
+    def exists(self, path):
+        """펌웨어 파일이 있는지
+
+        config의 감시 디렉터리 안에서 색인된 파일은 색인만 보고 (파일 시스템 접근 없음),
+        색인 전이거나 config 밖에서 고른 파일은 실제로 확인한다.
+        """
+        if not path:
+            return False
+        key = os.path.abspath(path)
+        if key in self._entries and self._root(key) is not None:
+            return True
+        return os.path.isfile(key)
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries.values())
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def firmware_catalog():
+    """프로세스 공용 카탈로그 (저장된 색인을 바로 쓰고, 다시 훑기는 작업 스레드에서)"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = FirmwareCatalog()
+            _catalog.refresh_async()
+        return _catalog
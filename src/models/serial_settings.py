@@ -0,0 +1,91 @@
+from pathlib import Path
+import json
+import threading
+
+from ..serial.core.pacing import PROFILES, DEFAULT_PROFILE, DeviceProfile
+
+class SerialSettings:
+    # 통신 설정
+    BAUD_RATE = 115200
+    AUTO_BAUD = '자동'  # 보레이트 선택 목록의 자동 감지 항목
+
+    def __init__(self):
+        # 측정(calibrate)한 장치 프로필 저장 위치
+        self.base_path = Path(__file__).parent.parent.parent / 'config' / 'serial'
+        self.profile_path = self.base_path / 'device_profiles.json'
+
+    def load_profiles(self):
+        """기본 프로필에 저장된 측정값을 덮어쓴 프로필 목록 반환"""
+        profiles = dict(PROFILES)
+        try:
+            with open(self.profile_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return profiles
+        for name, values in saved.items():
+            try:
+                profiles[name] = DeviceProfile(name, int(values['chunk_size']),
+                                               float(values['chunk_gap']))
+            except (KeyError, TypeError, ValueError):
+                print(f"잘못된 장치 프로필 무시: {name}")
+        return profiles
+
+    def get_profile(self, name):
+        """이름에 해당하는 프로필 (없으면 기본 프로필)"""
+        return self.load_profiles().get(name, DEFAULT_PROFILE)
+
+    def save_profile(self, profile):
+        """측정한 프로필 저장 (같은 이름은 덮어씀)"""
+        saved = {}
+        try:
+            with open(self.profile_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            pass
+        saved[profile.name] = {'chunk_size': profile.chunk_size, 'chunk_gap': profile.chunk_gap}
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        with open(self.profile_path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2)
+
+
+class PortCache:
+    """포트 식별자(USB 시리얼 번호 등)별로 감지한 통신 설정 저장 (config/serial/port_cache.json)"""
+
+    _lock = threading.Lock()  # 여러 보드를 동시에 플래시하는 스레드가 같은 파일을 고침
+
+    def __init__(self):
+        self.base_path = Path(__file__).parent.parent.parent / 'config' / 'serial'
+        self.cache_path = self.base_path / 'port_cache.json'
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key):
+        """저장된 설정 dict (없으면 빈 dict)"""
+        entry = self._load().get(key)
+        return entry if isinstance(entry, dict) else {}
+
+    def update(self, key, **values):
+        """key의 설정에 values를 합쳐 저장"""
+        with self._lock:
+            cache = self._load()
+            entry = cache.get(key) if isinstance(cache.get(key), dict) else {}
+            entry.update(values)
+            cache[key] = entry
+            try:
+                self.base_path.mkdir(parents=True, exist_ok=True)
+                with open(self.cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(cache, f, indent=2)
+            except OSError as e:
+                print(f"포트 설정 저장 실패: {str(e)}")
+
+    def get_baudrate(self, key):
+        baudrate = self.get(key).get('baudrate')
+        return baudrate if isinstance(baudrate, int) else None
+
+    def set_baudrate(self, key, baudrate):
+        self.update(key, baudrate=baudrate)
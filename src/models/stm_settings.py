@@ -7,6 +7,8 @@ class STMSettings:
         self.firmware_path = None
         self.flash_start = 0x08000000  # STM32G4 시리즈의 플래시 시작 주소
         self.verify = True             # 기본적으로 검증 활성화
+        self.differential = False      # 플래시 내용과 다른 섹터만 쓰기 (재작업/재플래시용)
+        self.sparse = True             # 0xFF로 채운 페이지는 쓰지 않고 지우기만 (.bin)
         
         # 기본 경로 설정
         self.base_path = Path(__file__).parent.parent.parent / 'config' / 'stm'
@@ -0,0 +1,76 @@
+import time
+
+# 선택 가능한 보레이트 (장치 로그 속도가 높은 펌웨어는 921600, 2M 사용)
+BAUD_RATES = (9600, 19200, 38400, 57600, 115200, 230400, 460800,
+              921600, 1000000, 1500000, 2000000)
+
+# 자동 감지 시 먼저 시도할 순서 (자주 쓰는 속도 우선)
+DETECT_ORDER = (115200, 921600, 2000000, 460800, 230400, 1500000,
+                1000000, 57600, 38400, 19200, 9600)
+
+GOOD_SCORE = 0.9  # 이 이상이면 나머지 후보는 시험하지 않음
+MIN_SCORE = 0.75  # 가장 나은 후보도 이보다 낮으면 감지 실패
+
+_PRINTABLE = frozenset(range(0x20, 0x7f)) | {0x09, 0x0a, 0x0d, 0x1b}
+
+
+def score_sample(data):
+    """수신 바이트가 정상적인 텍스트 로그처럼 보이는 정도 (0~1, 데이터가 없으면 None)
+
+    보레이트가 맞지 않으면 프레이밍이 깨져 제어 문자/0x80 이상 바이트가 섞이고
+    줄바꿈이 거의 나오지 않으므로, 출력 가능 문자 비율에 줄바꿈 빈도를 더해 평가한다.
+    """
+    if not data:
+        return None
+    printable = sum(1 for b in data if b in _PRINTABLE) / len(data)
+    newlines = data.count(b'\n') + data.count(b'\r')
+    if newlines:
+        # 한 줄 평균 길이가 2~256 바이트면 로그 줄로 본다
+        line_length = len(data) / newlines
+        line_score = 1.0 if 2 <= line_length <= 256 else 0.5
+    else:
+        # 짧은 표본은 아직 줄바꿈이 안 나왔을 수 있음
+        line_score = 0.5 if len(data) < 256 else 0.0
+    return printable * 0.8 + line_score * 0.2
+
+
+def sample_port(serial_port, baudrate, window=0.08, min_bytes=64):
+    """보레이트를 바꾸고 window초(또는 min_bytes가 모일 때까지) 동안 받은 바이트 반환"""
+    serial_port.baudrate = baudrate
+    serial_port.reset_input_buffer()
+    data = bytearray()
+    deadline = time.monotonic() + window
+    while len(data) < min_bytes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        serial_port.timeout = min(remaining, 0.02)
+        data += serial_port.read(max(1, serial_port.in_waiting))
+    return bytes(data)
+
+
+def detect_baudrate(serial_port, candidates=DETECT_ORDER, window=0.08, min_bytes=64):
+    """들어오는 로그를 후보 보레이트로 차례로 받아 보고 가장 그럴듯한 보레이트 반환
+
+    GOOD_SCORE 이상인 후보가 나오면 바로 멈추고, 수신이 없거나 MIN_SCORE를 넘는
+    후보가 없으면 None을 반환한다. 포트의 보레이트는 반환값으로 설정된 상태로 남는다
+    (None이면 원래 보레이트로 되돌림). 포트의 timeout은 원래대로 복원한다.
+    """
+    original_baudrate = serial_port.baudrate
+    original_timeout = serial_port.timeout
+    best, best_score = None, 0.0
+    try:
+        for baudrate in candidates:
+            score = score_sample(sample_port(serial_port, baudrate, window, min_bytes))
+            if score is None:
+                continue
+            if score > best_score:
+                best, best_score = baudrate, score
+            if score >= GOOD_SCORE:
+                break
+        if best_score < MIN_SCORE:
+            best = None
+        serial_port.baudrate = best or original_baudrate
+    finally:
+        serial_port.timeout = original_timeout
+    return best
@@ -0,0 +1,320 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+from .connection import AsyncLineReader, AsyncSerialConnection, shared_event_loop
+
+# 구독 큐가 가득 찼을 때의 처리 방식
+DROP_OLDEST = 'drop_oldest'   # 가장 오래된 데이터를 버리고 새 데이터 보관
+DROP_NEWEST = 'drop_newest'   # 새로 들어온 데이터를 버림
+DISCONNECT = 'disconnect'     # 구독을 끊음 (read/get에서 OverflowError 발생)
+
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+
+class Subscription(AsyncLineReader):
+    """BrokeredPort가 읽은 바이트를 받는 구독자별 큐
+
+    이벤트 루프 쪽에서는 read()/read_lines()/lines()로, 다른 스레드(GUI 등)에서는
+    get()으로 꺼낸다. 큐 크기는 max_bytes로 제한하고 넘치면 overflow 정책을 따른다.
+    """
+
+    MAX_BYTES = 1024 * 1024
+
+    def __init__(self, port, name, max_bytes=MAX_BYTES, overflow=DROP_OLDEST, idle_timeout=0.2):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {overflow}")
+        super().__init__(idle_timeout)
+        self.port = port
+        self.name = name
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+        self.received_bytes = 0
+        self.dropped_bytes = 0
+
+        self._chunks = deque()
+        self._size = 0
+        self._closed = False
+        self._exception = None
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._ready = asyncio.Event()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def pending_bytes(self):
+        return self._size
+
+    def _deliver(self, data):
+        """수신 청크 추가 (이벤트 루프 스레드에서 호출)"""
+        with self._lock:
+            if self._closed:
+                return
+            self.received_bytes += len(data)
+            overflow = self._size + len(data) > self.max_bytes
+            if overflow and self.overflow != DROP_OLDEST:
+                self.dropped_bytes += len(data)
+                if self.overflow == DROP_NEWEST:
+                    return
+                self._finish_locked(OverflowError(f"subscriber '{self.name}' queue overflow"))
+            else:
+                while self._chunks and self._size + len(data) > self.max_bytes:
+                    dropped = self._chunks.popleft()
+                    self._size -= len(dropped)
+                    self.dropped_bytes += len(dropped)
+                self._chunks.append(data)
+                self._size += len(data)
+                self._available.notify_all()
+        if self._closed:
+            # DISCONNECT 정책으로 끊긴 구독
+            self.port.unsubscribe(self)
+        self._ready.set()
+
+    def _finish(self, exc=None):
+        """수신 종료 표시 (남은 데이터는 계속 꺼낼 수 있음)"""
+        with self._lock:
+            self._finish_locked(exc)
+        self._wake()
+
+    def _finish_locked(self, exc):
+        if self._closed:
+            return
+        self._closed = True
+        self._exception = exc
+        self._available.notify_all()
+
+    def _wake(self):
+        loop = self.port.event_loop.loop
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._ready.set()
+        else:
+            loop.call_soon_threadsafe(self._ready.set)
+
+    def _pop(self, size):
+        # 잠금을 잡은 상태에서 호출
+        data = self._chunks.popleft()
+        if size and len(data) > size:
+            self._chunks.appendleft(data[size:])
+            data = data[:size]
+        self._size -= len(data)
+        return data
+
+    def _end_of_stream(self):
+        # 잠금을 잡은 상태에서 호출 (큐가 비고 종료된 경우)
+        if self._exception is not None:
+            raise self._exception
+        return b''
+
+    async def read(self, size=None):
+        """수신 데이터 반환 (데이터가 올 때까지 대기, 구독 종료 시 b'')"""
+        while True:
+            with self._lock:
+                if self._chunks:
+                    return self._pop(size)
+                if self._closed:
+                    return self._end_of_stream()
+                self._ready.clear()
+            await self._ready.wait()
+
+    def get(self, timeout=None, size=None):
+        """수신 데이터 반환 (이벤트 루프 밖의 스레드용)
+
+        timeout 동안 데이터가 없으면 None, 구독이 끝났으면 b''를 반환한다.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while not self._chunks:
+                if self._closed:
+                    return self._end_of_stream()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._available.wait(remaining)
+            return self._pop(size)
+
+    def close(self):
+        """구독 해제 (어느 스레드에서나 호출 가능)"""
+        self.port.unsubscribe(self)
+        self._finish()
+
+
+class BrokeredPort:
+    """하나의 시리얼 포트를 단독으로 읽고 모든 구독자에게 같은 바이트를 나눠주는 소유자
+
+    포트는 한 번만 읽고 수신 청크(bytes 객체)를 복사 없이 각 구독자 큐에 넣는다.
+    구독자가 없어도 계속 읽으므로 원시 캡처는 항상 모든 수신 데이터를 기록한다.
+    쓰기도 이 객체를 통해서만 하므로 여러 사용처의 전송이 섞이지 않는다.
+    """
+
+    def __init__(self, serial_port, event_loop=None, **connection_options):
+        self.serial_port = serial_port
+        self.event_loop = event_loop or shared_event_loop()
+        self.connection = AsyncSerialConnection(serial_port, **connection_options)
+        self.error = None
+        self._subscribers = ()
+        self._lock = threading.Lock()
+        self._task = None
+        self._opened = asyncio.Event()
+        self._done = threading.Event()
+        self._future = None
+
+    @property
+    def name(self):
+        return getattr(self.serial_port, 'port', None) or 'serial'
+
+    @property
+    def running(self):
+        return self._future is not None and not self._done.is_set()
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    def start(self):
+        self._future = self.event_loop.submit(self._pump())
+        self._future.add_done_callback(self._on_done)
+
+    async def _pump(self):
+        # 수신 청크를 모든 구독자에게 전달
+        self._task = asyncio.current_task()
+        error = None
+        try:
+            await self.connection.open()
+            self._opened.set()
+            async for data in self.connection:
+                for subscription in self._subscribers:
+                    subscription._deliver(data)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Serial reading error: {str(e)}")
+            error = self.error = e
+        finally:
+            self._opened.set()
+            self._finish_subscribers(error)
+            await self.connection.close()
+
+    def _finish_subscribers(self, error=None):
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, ()
+        for subscription in subscribers:
+            subscription._finish(error)
+
+    def _on_done(self, future):
+        # 코루틴이 시작 전에 취소되어도 구독자가 끝을 알 수 있게 처리
+        self._finish_subscribers(self.error)
+        self._done.set()
+
+    def subscribe(self, name, max_bytes=Subscription.MAX_BYTES, overflow=DROP_OLDEST,
+                  idle_timeout=0.2):
+        """구독 추가 (어느 스레드에서나 호출 가능, 이후 수신분부터 전달)"""
+        subscription = Subscription(self, name, max_bytes, overflow, idle_timeout)
+        with self._lock:
+            if self._done.is_set():
+                subscription._finish(self.error)
+            else:
+                self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    async def send(self, data):
+        """전송 후 포트로 모두 넘어갈 때까지 대기 (이벤트 루프 스레드에서 호출)"""
+        await self._opened.wait()
+        self.connection.write(data)
+        await self.connection.flush()
+
+    def write(self, data):
+        """포트로 전송 (어느 스레드에서나 호출 가능, 전송 완료 시 끝나는 Future 반환)"""
+        return self.event_loop.submit(self.send(bytes(data)))
+
+    def set_capture(self, capture, port_name=None):
+        self.connection.set_capture(capture, port_name)
+
+    def stop(self, timeout=2.0):
+        """읽기 중지 후 모든 구독 종료 (포트는 닫지 않음)"""
+        if self._future is None:
+            return True
+        self.event_loop.call_soon(self._cancel)
+        return self._done.wait(timeout)
+
+    def _cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+        elif self._future is not None:
+            self._future.cancel()
+
+    def close(self, timeout=2.0):
+        """읽기 중지 후 포트 닫기"""
+        self.stop(timeout)
+        try:
+            self.serial_port.close()
+        except Exception:
+            pass
+
+
+class PortBroker:
+    """열린 시리얼 포트마다 하나의 BrokeredPort를 유지하는 관리자"""
+
+    def __init__(self, event_loop=None):
+        self.event_loop = event_loop
+        self._ports = {}  # id(serial_port) -> BrokeredPort
+        self._lock = threading.Lock()
+
+    def attach(self, serial_port):
+        """포트의 BrokeredPort 반환 (처음이면 읽기 시작)"""
+        with self._lock:
+            port = self._ports.get(id(serial_port))
+            if port is None or (port._future is not None and port._done.is_set()):
+                port = BrokeredPort(serial_port, self.event_loop)
+                self._ports[id(serial_port)] = port
+                port.start()
+            return port
+
+    def find(self, serial_port):
+        with self._lock:
+            return self._ports.get(id(serial_port))
+
+    def find_by_name(self, name):
+        """포트 이름(COM3, /dev/ttyUSB0 등)으로 실행 중인 BrokeredPort 찾기"""
+        with self._lock:
+            for port in self._ports.values():
+                if port.running and port.name == name:
+                    return port
+        return None
+
+    def close(self, serial_port, timeout=2.0):
+        """포트 읽기를 멈추고 닫기 (broker에 없는 포트도 닫음)"""
+        with self._lock:
+            port = self._ports.pop(id(serial_port), None)
+        if port is not None:
+            port.close(timeout)
+        else:
+            serial_port.close()
+
+    def ports(self):
+        with self._lock:
+            return list(self._ports.values())
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def port_broker():
+    """프로세스 공용 포트 브로커"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = PortBroker()
+        return _broker
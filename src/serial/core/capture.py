@@ -0,0 +1,244 @@
+import csv
+import datetime
+import os
+import struct
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from .packet import LineDecoder
+
+# 파일 헤더: 매직, 버전, 예약, 시작 시각(wall clock ns), 시작 시각(monotonic ns)
+HEADER = struct.Struct('<4sBxxxqq')
+MAGIC = b'SCAP'
+VERSION = 1
+
+# 레코드 헤더: 종류, 수신 시각(monotonic ns), 포트 ID, 길이 + 길이만큼의 데이터
+RECORD = struct.Struct('<BqHI')
+KIND_DATA = 0
+KIND_PORT = 1  # 포트 ID 등록 (데이터 = UTF-8 포트 이름)
+
+# 인덱스 항목: 레코드 시각, 레코드 시작 오프셋
+INDEX_ENTRY = struct.Struct('<qQ')
+
+CaptureRecord = namedtuple('CaptureRecord', 'timestamp_ns port_id data')
+
+
+def index_path_for(path):
+    return path + '.idx'
+
+
+class CaptureWriter:
+    """수신 바이트 청크를 수신 시각/포트 ID와 함께 기록하는 원시 캡처 파일
+
+    여러 포트의 리더 스레드가 같은 파일에 기록할 수 있도록 내부 잠금을 사용한다.
+    INDEX_INTERVAL_NS 또는 INDEX_BYTES 마다 (시각, 오프셋)을 인덱스 파일에 남겨
+    시각으로 빠르게 찾아갈 수 있게 한다.
+    """
+
+    INDEX_INTERVAL_NS = 1_000_000_000
+    INDEX_BYTES = 1024 * 1024
+    BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.start_wall_ns = time.time_ns()
+        self.start_ns = time.monotonic_ns()
+        self.records = 0
+        self.data_bytes = 0
+        self._ports = {}  # 포트 이름 -> ID
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb', buffering=self.BUFFER_SIZE)
+        self._index = open(index_path_for(path), 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.start_wall_ns, self.start_ns))
+        self._offset = HEADER.size
+        self._last_index_ns = None
+        self._last_index_offset = 0
+
+    def port_id(self, name):
+        """포트 이름에 해당하는 ID 반환 (처음이면 등록 레코드 기록)"""
+        with self._lock:
+            port_id = self._ports.get(name)
+            if port_id is None:
+                port_id = len(self._ports)
+                self._ports[name] = port_id
+                self._write_record(KIND_PORT, time.monotonic_ns(), port_id, name.encode('utf-8'))
+            return port_id
+
+    def write(self, port_id, data, timestamp_ns=None):
+        """수신 데이터 청크 기록 (timestamp_ns를 생략하면 현재 monotonic 시각)"""
+        if not data:
+            return
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        with self._lock:
+            if self._file is None:
+                return
+            self._write_record(KIND_DATA, timestamp_ns, port_id, data)
+            self.records += 1
+            self.data_bytes += len(data)
+
+    def _write_record(self, kind, timestamp_ns, port_id, data):
+        if (self._last_index_ns is None or
+                timestamp_ns - self._last_index_ns >= self.INDEX_INTERVAL_NS or
+                self._offset - self._last_index_offset >= self.INDEX_BYTES):
+            self._index.write(INDEX_ENTRY.pack(timestamp_ns, self._offset))
+            self._last_index_ns = timestamp_ns
+            self._last_index_offset = self._offset
+        self._file.write(RECORD.pack(kind, timestamp_ns, port_id, len(data)))
+        self._file.write(data)
+        self._offset += RECORD.size + len(data)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._index.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._index.close()
+            self._file = None
+            self._index = None
+
+
+class CaptureReader:
+    """원시 캡처 파일 읽기 (시각 기준 탐색, 포트별 필터)
+
+    인덱스 파일이 없거나 기록 중 중단되어 잘린 경우에도 읽을 수 있는 데까지 읽는다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("캡처 파일 헤더가 손상되었습니다.")
+        magic, version, self.start_wall_ns, self.start_ns = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("캡처 파일 형식이 아닙니다.")
+        if version != VERSION:
+            raise ValueError(f"지원하지 않는 캡처 파일 버전: {version}")
+
+        self.ports = {}  # 포트 ID -> 이름
+        self._index_times, self._index_offsets = self._load_index()
+
+    def _load_index(self):
+        times, offsets = [], []
+        try:
+            with open(index_path_for(self.path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        for timestamp_ns, offset in INDEX_ENTRY.iter_unpack(data[:usable]):
+            times.append(timestamp_ns)
+            offsets.append(offset)
+        if not offsets:
+            times, offsets = [self.start_ns], [HEADER.size]
+        return times, offsets
+
+    def wall_time(self, timestamp_ns):
+        """monotonic 수신 시각을 datetime으로 변환"""
+        return datetime.datetime.fromtimestamp(
+            (self.start_wall_ns + timestamp_ns - self.start_ns) / 1e9)
+
+    def _read_records(self, offset):
+        """offset부터 모든 레코드를 (종류, 시각, 포트 ID, 데이터)로 반환"""
+        self._file.seek(offset)
+        read = self._file.read
+        while True:
+            header = read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, timestamp_ns, port_id, length = RECORD.unpack(header)
+            data = read(length)
+            if len(data) < length:
+                return  # 기록 도중 잘린 마지막 레코드
+            yield kind, timestamp_ns, port_id, data
+
+    def _scan_ports(self, until):
+        """until 오프셋 이전에 등록된 포트 이름 읽기 (중간부터 읽을 때 필요)"""
+        for kind, _, port_id, data in self._read_records(HEADER.size):
+            if self._file.tell() > until:
+                break
+            if kind == KIND_PORT:
+                self.ports[port_id] = data.decode('utf-8', errors='replace')
+
+    def records(self, start_ns=None, end_ns=None, port_ids=None):
+        """[start_ns, end_ns) 구간의 데이터 레코드를 순서대로 반환"""
+        offset = HEADER.size
+        if start_ns is not None:
+            # start_ns 이전의 가장 가까운 인덱스 지점부터 읽기
+            position = max(0, bisect_right(self._index_times, start_ns) - 1)
+            offset = self._index_offsets[position]
+            if offset > HEADER.size:
+                self._scan_ports(offset)
+
+        for kind, timestamp_ns, port_id, data in self._read_records(offset):
+            if kind == KIND_PORT:
+                self.ports[port_id] = data.decode('utf-8', errors='replace')
+                continue
+            if start_ns is not None and timestamp_ns < start_ns:
+                continue
+            if end_ns is not None and timestamp_ns >= end_ns:
+                break
+            if port_ids is None or port_id in port_ids:
+                yield CaptureRecord(timestamp_ns, port_id, data)
+
+    def __iter__(self):
+        return self.records()
+
+    def close(self):
+        self._file.close()
+
+
+def export_text(reader, out_path, start_ns=None, end_ns=None, port_ids=None):
+    """캡처를 '[시각] 포트: 줄' 형식의 텍스트로 변환
+
+    시각은 각 줄의 첫 바이트가 들어온 청크의 수신 시각이다.
+    """
+    decoders = {}
+    line_times = {}
+    with open(out_path, 'w', encoding='utf-8') as out:
+        def write_line(timestamp_ns, port_id, line):
+            stamp = reader.wall_time(timestamp_ns).strftime('%H:%M:%S.%f')
+            out.write(f"[{stamp}] {reader.ports.get(port_id, port_id)}: {line}")
+
+        for timestamp_ns, port_id, data in reader.records(start_ns, end_ns, port_ids):
+            decoder = decoders.get(port_id)
+            if decoder is None:
+                decoder = decoders[port_id] = LineDecoder()
+            if not decoder.pending:
+                line_times[port_id] = timestamp_ns
+            for line in decoder.feed(data):
+                write_line(line_times[port_id], port_id, line)
+                line_times[port_id] = timestamp_ns
+        for port_id, decoder in decoders.items():
+            if decoder.pending:
+                write_line(line_times[port_id], port_id, decoder.flush() + '\n')
+
+
+def export_csv(reader, out_path, start_ns=None, end_ns=None, port_ids=None):
+    """캡처를 청크 단위 CSV(수신 시각, 포트, 길이, hex 데이터)로 변환"""
+    with open(out_path, 'w', encoding='utf-8', newline='') as out:
+        writer = csv.writer(out)
+        writer.writerow(['timestamp_ns', 'elapsed_s', 'wall_time', 'port', 'length', 'data_hex'])
+        for timestamp_ns, port_id, data in reader.records(start_ns, end_ns, port_ids):
+            writer.writerow([
+                timestamp_ns,
+                f"{(timestamp_ns - reader.start_ns) / 1e9:.6f}",
+                reader.wall_time(timestamp_ns).isoformat(timespec='microseconds'),
+                reader.ports.get(port_id, port_id),
+                len(data),
+                data.hex(),
+            ])
+
+
+def capture_filename(directory, prefix='raw'):
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(directory, f"{prefix}_{timestamp}.scap")
@@ -0,0 +1,355 @@
+import asyncio
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from .packet import LineDecoder
+
+
+def port_fileno(serial_port):
+    """POSIX 포트의 fd (없거나 Windows면 None)"""
+    if os.name != 'posix':
+        return None
+    try:
+        return serial_port.fileno()
+    except Exception:
+        return None
+
+
+class AsyncLineReader(ABC):
+    """비동기 read()로 받은 바이트를 줄 단위로 나누는 공통 기능
+
+    하위 클래스는 read()를 구현한다 (데이터가 올 때까지 대기, 종료 시 b'').
+    """
+
+    def __init__(self, idle_timeout=0.2):
+        self.idle_timeout = idle_timeout
+        self.decoder = LineDecoder()
+        self._last_data_time = time.monotonic()
+
+    @abstractmethod
+    async def read(self, size=None):
+        """수신 바이트 반환 (데이터가 올 때까지 대기, 종료 시 b'')"""
+
+    def __aiter__(self):
+        return self._iter_chunks()
+
+    async def _iter_chunks(self):
+        while True:
+            data = await self.read()
+            if not data:
+                return
+            yield data
+
+    async def read_lines(self, timeout=None):
+        """수신 데이터로 완성된 줄 목록 반환
+
+        timeout(기본 idle_timeout) 동안 데이터가 없으면 빈 목록을 반환하고,
+        idle_timeout 동안 추가 수신이 없으면 미완성 줄도 함께 반환한다.
+        연결이 끝나면 None을 반환한다.
+        """
+        if timeout is None:
+            timeout = self.idle_timeout
+        try:
+            data = await asyncio.wait_for(self.read(), timeout)
+        except asyncio.TimeoutError:
+            data = None
+
+        now = time.monotonic()
+        if data:
+            self._last_data_time = now
+            return self.decoder.feed(data)
+        if data is not None:
+            # 연결 종료: 남은 미완성 줄 반환 후 종료
+            return [self.decoder.flush()] if self.decoder.pending else None
+        if self.decoder.pending and now - self._last_data_time >= self.idle_timeout:
+            return [self.decoder.flush()]
+        return []
+
+    async def lines(self):
+        """수신된 줄을 하나씩 반환하는 비동기 반복자"""
+        while True:
+            lines = await self.read_lines()
+            if lines is None:
+                return
+            for line in lines:
+                yield line
+
+
+class AsyncSerialConnection(AsyncLineReader):
+    """asyncio 이벤트 루프에서 동작하는 논블로킹 시리얼 연결
+
+    POSIX에서는 포트 fd를 이벤트 루프에 등록해 스레드 없이 읽고 쓴다.
+    - 읽기: asyncio.StreamReader 버퍼에 쌓고, read_limit를 넘으면 fd 감시를 멈춰
+      (pause_reading) 소비자가 따라올 때까지 커널/장치 쪽에 데이터를 남긴다.
+    - 쓰기: write()는 즉시 반환하고, 남은 데이터는 fd가 쓰기 가능할 때 전송한다.
+      버퍼가 write_high를 넘으면 drain()이 write_low 아래로 줄 때까지 대기한다.
+    fd 감시를 지원하지 않는 환경(Windows)은 실행기 스레드에서 블로킹 read/write를 수행하며,
+    쓰기는 연결 전용 단일 스레드 실행기로 보내 호출 순서대로 하나씩 전송한다.
+    포트 열기/닫기는 호출한 쪽이 담당한다.
+    """
+
+    READ_SIZE = 64 * 1024
+    READ_LIMIT = 1024 * 1024
+    WRITE_HIGH = 64 * 1024
+    WRITE_LOW = 16 * 1024
+
+    def __init__(self, serial_port, idle_timeout=0.2, read_size=READ_SIZE,
+                 read_limit=READ_LIMIT, write_high=WRITE_HIGH, write_low=WRITE_LOW):
+        super().__init__(idle_timeout)
+        self.serial_port = serial_port
+        self.read_size = read_size
+        self.read_limit = read_limit
+        self.write_high = write_high
+        self.write_low = write_low
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+        self.capture = None
+        self.capture_port_id = None
+
+        self._loop = None
+        self._reader = None
+        self._fd = None
+        self._paused = False
+        self._closed = False
+        self._write_buffer = bytearray()
+        self._drain_waiters = []
+        self._executor_task = None
+        self._write_executor = None
+
+    def set_capture(self, capture, port_name=None):
+        """수신 바이트 원시 캡처 시작 (capture=None이면 중지)"""
+        if capture is None:
+            self.capture = None
+            return
+        if port_name is None:
+            port_name = getattr(self.serial_port, 'port', None) or 'serial'
+        self.capture_port_id = capture.port_id(port_name)
+        self.capture = capture
+
+    @property
+    def write_buffer_size(self):
+        return len(self._write_buffer)
+
+    async def open(self):
+        """현재 이벤트 루프에 포트 등록"""
+        self._loop = asyncio.get_running_loop()
+        self._reader = asyncio.StreamReader(limit=self.read_limit)
+        self._reader.set_transport(self)
+
+        fd = port_fileno(self.serial_port)
+        if fd is not None:
+            try:
+                os.set_blocking(fd, False)
+                self._loop.add_reader(fd, self._on_readable)
+                self._fd = fd
+                return
+            except NotImplementedError:
+                pass
+        # fd 감시 불가: 실행기에서 블로킹 읽기, 쓰기는 단일 스레드에서 순서대로
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='serial-write')
+        self._executor_task = self._loop.create_task(self._executor_read_loop())
+
+    # asyncio.StreamReader가 버퍼 상태에 따라 호출하는 흐름 제어
+    def pause_reading(self):
+        if self._paused or self._closed:
+            return
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+        self._paused = True
+
+    def resume_reading(self):
+        if not self._paused or self._closed:
+            return
+        if self._fd is not None:
+            self._loop.add_reader(self._fd, self._on_readable)
+        self._paused = False
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, self.read_size)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._connection_lost(e)
+            return
+        if not data:
+            # 읽기 가능 상태인데 데이터가 없으면 장치 연결 해제
+            self._connection_lost(IOError("device reports readiness to read but returned no data"))
+            return
+        self._received(data)
+
+    def _received(self, data):
+        self.bytes_read += len(data)
+        capture = self.capture
+        if capture is not None:
+            capture.write(self.capture_port_id, data, time.monotonic_ns())
+        self._reader.feed_data(data)
+
+    def _blocking_read(self):
+        port = self.serial_port
+        data = port.read(1)  # 포트 timeout 동안 대기
+        if data and port.in_waiting:
+            data += port.read(min(port.in_waiting, self.read_size))
+        return data
+
+    async def _executor_read_loop(self):
+        try:
+            while not self._closed:
+                if self._paused:
+                    await asyncio.sleep(0.01)  # 소비자가 따라올 때까지 대기
+                    continue
+                data = await self._loop.run_in_executor(None, self._blocking_read)
+                if data and not self._closed:
+                    self._received(data)
+        except Exception as e:
+            self._connection_lost(e)
+
+    def _connection_lost(self, exc):
+        if self._fd is not None and not self._paused:
+            self._loop.remove_reader(self._fd)
+        self._paused = True
+        if self._write_buffer and self._fd is not None:
+            self._loop.remove_writer(self._fd)
+        self._reader.set_exception(exc)
+        self._wake_drain_waiters(exc)
+
+    async def read(self, size=None):
+        """수신된 바이트 반환 (데이터가 올 때까지 대기, 연결 종료 시 b'')"""
+        return await self._reader.read(size or self.read_size)
+
+    def write(self, data):
+        """데이터 전송 (즉시 반환, 이벤트 루프 스레드에서 호출)"""
+        if self._closed:
+            raise IOError("connection is closed")
+        if not data:
+            return
+        if self._fd is None:
+            self._executor_write(bytes(data))
+            return
+        if not self._write_buffer:
+            # 버퍼가 비어 있으면 바로 쓰기 시도
+            try:
+                written = os.write(self._fd, data)
+            except BlockingIOError:
+                written = 0
+            self.bytes_written += written
+            data = memoryview(data)[written:]
+            if not data:
+                return
+            self._loop.add_writer(self._fd, self._on_writable)
+        self._write_buffer += data
+
+    def _executor_write(self, data):
+        # 작업자가 하나라 쓰기와 완료 콜백이 write() 호출 순서대로 진행됨 (버퍼 앞부분부터 제거)
+        self._write_buffer += data
+
+        def done(future):
+            del self._write_buffer[:len(data)]
+            self.bytes_written += len(data)
+            exc = future.exception()
+            if exc is not None or len(self._write_buffer) <= self.write_low:
+                self._wake_drain_waiters(exc)
+
+        self._loop.run_in_executor(self._write_executor, self.serial_port.write,
+                               data).add_done_callback(done)
+
+    def _on_writable(self):
+        try:
+            written = os.write(self._fd, self._write_buffer)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._loop.remove_writer(self._fd)
+            self._write_buffer.clear()
+            self._wake_drain_waiters(e)
+            return
+        self.bytes_written += written
+        del self._write_buffer[:written]
+        if not self._write_buffer:
+            self._loop.remove_writer(self._fd)
+        if len(self._write_buffer) <= self.write_low:
+            self._wake_drain_waiters()
+
+    def _wake_drain_waiters(self, exc=None):
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                if exc is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(exc)
+
+    async def drain(self):
+        """쓰기 버퍼가 write_high를 넘었으면 write_low 아래로 줄 때까지 대기"""
+        if len(self._write_buffer) <= self.write_high:
+            return
+        waiter = self._loop.create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    async def flush(self):
+        """쓰기 버퍼가 모두 전송될 때까지 대기"""
+        while self._write_buffer and not self._closed:
+            waiter = self._loop.create_future()
+            self._drain_waiters.append(waiter)
+            await waiter
+
+    async def close(self):
+        """이벤트 루프에서 포트 등록 해제 (포트 자체는 닫지 않음)"""
+        if self._closed or self._reader is None:
+            self._closed = True
+            return
+        self._closed = True
+        if self._fd is not None:
+            if not self._paused:
+                self._loop.remove_reader(self._fd)
+            if self._write_buffer:
+                self._loop.remove_writer(self._fd)
+        if self._executor_task is not None:
+            self._executor_task.cancel()
+        if self._write_executor is not None:
+            self._write_executor.shutdown(wait=False)
+        self._paused = True
+        self._reader.feed_eof()
+        self._wake_drain_waiters(IOError("connection is closed"))
+
+
+class SerialEventLoop:
+    """여러 포트의 AsyncSerialConnection을 구동하는 단일 이벤트 루프 스레드"""
+
+    def __init__(self, name='serial-io'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """코루틴 실행 요청 후 concurrent.futures.Future 반환 (어느 스레드에서나 호출 가능)"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+_shared_loop = None
+_shared_loop_lock = threading.Lock()
+
+
+def shared_event_loop():
+    """프로세스 공용 시리얼 이벤트 루프 (처음 호출 시 시작)"""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            _shared_loop = SerialEventLoop()
+        return _shared_loop
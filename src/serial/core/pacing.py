@@ -0,0 +1,76 @@
+import asyncio
+import time
+from collections import namedtuple
+
+# 장치별 전송 속도 설정
+# - chunk_size: 한 번에 보낼 바이트 수 (장치 UART 수신 FIFO 크기 이하)
+# - chunk_gap: 청크가 전송된 뒤 장치가 FIFO를 비울 때까지 더 기다릴 시간(초)
+DeviceProfile = namedtuple('DeviceProfile', 'name chunk_size chunk_gap')
+
+PROFILES = {
+    'legacy': DeviceProfile('legacy', 1, 0.001),     # 글자 단위 1ms 간격 (기존 방식)
+    'default': DeviceProfile('default', 16, 0.002),  # 16바이트 FIFO (16550 계열)
+    'esp32': DeviceProfile('esp32', 120, 0.001),     # 128바이트 RX FIFO
+}
+DEFAULT_PROFILE = PROFILES['default']
+
+BITS_PER_BYTE = 10  # start + 8 data + stop
+
+
+def flow_control(serial_port):
+    """포트에 설정된 흐름 제어 ('rtscts', 'xonxoff' 또는 None)"""
+    if getattr(serial_port, 'rtscts', False):
+        return 'rtscts'
+    if getattr(serial_port, 'xonxoff', False):
+        return 'xonxoff'
+    return None
+
+
+def wire_time(size, baudrate):
+    """size 바이트가 선로로 나가는 데 걸리는 시간(초)"""
+    if not baudrate:
+        return 0.0
+    return size * BITS_PER_BYTE / baudrate
+
+
+class PacedWriter:
+    """장치 수신 FIFO에 맞춰 청크 단위로 나눠 보내는 쓰기 계층 (이벤트 루프에서 사용)
+
+    청크를 보낸 뒤 선로 전송 시간 + chunk_gap이 지나야 다음 청크를 보낸다.
+    마지막 청크 뒤에는 기다리지 않고 다음 write가 남은 시간만큼만 기다리므로
+    단독 명령의 지연은 늘지 않는다. 포트에 RTS/CTS 또는 XON/XOFF가 설정되어 있으면
+    운영체제가 흐름을 제어하므로 나누지 않고 한 번에 보낸다.
+    """
+
+    def __init__(self, port, profile=DEFAULT_PROFILE):
+        self.port = port
+        self.profile = profile
+        self._next_write = 0.0
+
+    @property
+    def flow_control(self):
+        return flow_control(self.port.serial_port)
+
+    async def write(self, data, profile=None):
+        """data를 모두 포트로 넘길 때까지 대기"""
+        profile = profile or self.profile
+        if self.flow_control is not None:
+            await self.port.send(data)
+            return
+
+        baudrate = getattr(self.port.serial_port, 'baudrate', None)
+        size = max(1, profile.chunk_size)
+        for offset in range(0, len(data), size):
+            delay = self._next_write - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chunk = data[offset:offset + size]
+            await self.port.send(chunk)
+            self._next_write = time.monotonic() + wire_time(len(chunk), baudrate) + profile.chunk_gap
+
+    def estimate(self, size, profile=None):
+        """size 바이트를 보내는 데 걸리는 예상 시간(초, 흐름 제어 없음 기준)"""
+        profile = profile or self.profile
+        baudrate = getattr(self.port.serial_port, 'baudrate', None)
+        chunks = -(-size // max(1, profile.chunk_size))
+        return wire_time(size, baudrate) + (chunks - 1) * profile.chunk_gap
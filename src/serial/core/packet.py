@@ -0,0 +1,37 @@
+import codecs
+
+
+class LineDecoder:
+    """바이트 스트림을 줄 단위 문자열로 분리 (증분 UTF-8 디코딩)"""
+
+    def __init__(self, encoding='utf-8', errors='ignore'):
+        # 증분 디코더: 여러 read에 걸쳐 잘린 멀티바이트 문자를 보존
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+        self._partial = ''
+
+    def feed(self, data):
+        """수신 바이트를 넣고 완성된 줄 목록 반환 (줄바꿈 포함)"""
+        text = self._decoder.decode(data)
+        if not text:
+            return []
+
+        parts = (self._partial + text).split('\n')
+        # 마지막 조각은 아직 줄바꿈이 오지 않은 미완성 줄
+        self._partial = parts.pop()
+        return [part + '\n' for part in parts]
+
+    def flush(self):
+        """미완성 줄 반환 (프롬프트처럼 줄바꿈 없이 끝나는 출력 처리용)"""
+        partial = self._partial
+        self._partial = ''
+        return partial
+
+    @property
+    def pending(self):
+        """줄바꿈을 기다리는 미완성 줄 존재 여부"""
+        return bool(self._partial)
+
+    def reset(self):
+        """디코더 상태 초기화"""
+        self._decoder.reset()
+        self._partial = ''
@@ -0,0 +1,228 @@
+import asyncio
+import re
+import threading
+import time
+from collections import deque, namedtuple
+
+from .broker import port_broker
+from .pacing import DEFAULT_PROFILE, PROFILES, DeviceProfile, PacedWriter
+
+CommandResponse = namedtuple('CommandResponse', 'command lines match elapsed')
+
+
+class CommandTimeout(TimeoutError):
+    """명령 응답이 제한 시간 안에 오지 않음"""
+
+
+def compile_expect(expect):
+    """응답 종료 조건을 줄 검사 함수로 변환 (문자열: 포함 여부, 정규식: search)"""
+    if expect is None:
+        return None
+    if isinstance(expect, str):
+        return lambda line: expect in line
+    if isinstance(expect, re.Pattern):
+        return expect.search
+    return expect
+
+
+def parse_fields(lines):
+    """'key = value' 형식의 응답 줄을 딕셔너리로 변환"""
+    fields = {}
+    for line in lines:
+        key, sep, value = line.partition('=')
+        if sep:
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+class _PendingCommand:
+    def __init__(self, command, matcher, future):
+        self.command = command
+        self.matcher = matcher
+        self.future = future
+        self.lines = []
+        self.start = time.monotonic()
+        self.expired = False  # 시간 초과 후 늦은 응답을 흡수하는 자리표시 상태
+
+
+class CommandEngine:
+    """장치 텍스트 셸용 명령/응답 엔진
+
+    포트 브로커를 구독해 응답을 받으므로 모니터와 같은 포트를 함께 쓸 수 있다.
+    명령은 보낸 순서대로 응답과 짝지어지며, 앞 명령의 응답을 기다리지 않고
+    여러 명령을 연달아 보낼 수 있다 (파이프라이닝).
+    - send(): 어느 스레드에서나 호출, concurrent.futures.Future 반환
+    - request(): 이벤트 루프에서 await
+    명령은 장치 프로필(DeviceProfile)에 맞춰 청크 단위로 전송한다.
+    시간 초과된 명령은 응답 끝 줄이 올 때까지 (최대 timeout만큼 더) 대기열에 남아
+    늦게 온 응답이 다음 명령의 응답으로 섞이지 않게 흡수한다.
+    """
+
+    TIMEOUT = 2.0
+
+    # calibrate()에서 시험할 청크 크기/간격 후보
+    CALIBRATION_CHUNK_SIZES = (128, 64, 32, 16, 8, 4, 1)
+    CALIBRATION_GAPS = (0.0, 0.0005, 0.001, 0.002, 0.005, 0.01)
+
+    def __init__(self, port, line_ending='\r\n', timeout=TIMEOUT, profile=DEFAULT_PROFILE):
+        self.port = port
+        self.line_ending = line_ending
+        self.timeout = timeout
+        self.writer = PacedWriter(port, profile)
+        self.subscription = port.subscribe('commands')
+        self._pending = deque()
+        self._write_lock = None
+        self._reader_task = None
+
+    @property
+    def event_loop(self):
+        return self.port.event_loop
+
+    @property
+    def profile(self):
+        return self.writer.profile
+
+    @profile.setter
+    def profile(self, profile):
+        self.writer.profile = profile
+
+    def send(self, command, expect=None, timeout=None):
+        """명령 전송 후 응답 Future 반환 (expect=None이면 전송 완료 시 끝남)"""
+        return self.event_loop.submit(self.request(command, expect, timeout))
+
+    def send_many(self, commands):
+        """(명령, expect[, timeout]) 목록을 응답 대기 없이 연달아 전송"""
+        return [self.send(*command) for command in commands]
+
+    async def request(self, command, expect=None, timeout=None, profile=None):
+        """명령 전송 후 expect와 일치하는 줄까지의 응답 반환 (profile: 이번 전송에만 적용)"""
+        if timeout is None:
+            timeout = self.timeout
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        self._ensure_reader()
+
+        matcher = compile_expect(expect)
+        pending = None
+        try:
+            # 전송 순서와 응답 대기 순서가 같도록 잠금 안에서 등록
+            async with self._write_lock:
+                if matcher is not None:
+                    pending = _PendingCommand(command, matcher,
+                                              asyncio.get_running_loop().create_future())
+                    self._pending.append(pending)
+                start = time.monotonic()
+                await asyncio.wait_for(self._write(command + self.line_ending, profile), timeout)
+            if pending is None:
+                return CommandResponse(command, [], None, time.monotonic() - start)
+            remaining = max(0.0, pending.start + timeout - time.monotonic())
+            return await asyncio.wait_for(asyncio.shield(pending.future), remaining)
+        except asyncio.TimeoutError:
+            if pending is not None and pending in self._pending:
+                pending.expired = True
+                asyncio.get_running_loop().call_later(timeout, self._discard_expired, pending)
+                pending = None
+            raise CommandTimeout(f"'{command}' 응답 시간 초과 ({timeout:g}s)") from None
+        finally:
+            if pending is not None and pending in self._pending:
+                self._pending.remove(pending)
+
+    def _discard_expired(self, pending=None):
+        """늦은 응답을 기다리던 자리표시 제거 (pending=None이면 모두)"""
+        for entry in [entry for entry in self._pending if entry.expired]:
+            if pending is None or entry is pending:
+                self._pending.remove(entry)
+
+    async def _write(self, text, profile=None):
+        await self.writer.write(text.encode('utf-8'), profile)
+
+    def calibrate(self, command, expect, name='calibrated', **options):
+        """calibrate_pacing 실행 요청 (어느 스레드에서나 호출, Future 반환)"""
+        return self.event_loop.submit(self.calibrate_pacing(command, expect, name, **options))
+
+    async def calibrate_pacing(self, command, expect, name='calibrated', chunk_sizes=None,
+                               gaps=None, trials=3, timeout=0.5, echo=True, probe_size=None):
+        """명령이 깨지지 않는 가장 빠른 (청크 크기, 간격) 조합을 측정해 DeviceProfile로 반환
+
+        후보를 예상 전송 시간이 짧은 순으로 시험하며, 각 후보마다 명령을 trials번
+        연달아 보내(파이프라이닝) 모든 응답이 expect와 일치하고 에코(echo=True)가
+        온전하면 통과로 본다. 명령보다 큰 청크는 시험할 수 없으므로 후보에서 빼고,
+        장치 셸이 앞쪽 공백을 무시하면 probe_size만큼 공백을 붙여 큰 청크도 시험한다.
+        통과한 후보가 없으면 None을 반환한다.
+        """
+        if probe_size:
+            command = command.rjust(probe_size - len(self.line_ending))
+        size = len((command + self.line_ending).encode('utf-8'))
+        candidates = sorted(
+            {DeviceProfile(name, min(chunk, size), gap)
+             for chunk in chunk_sizes or self.CALIBRATION_CHUNK_SIZES
+             for gap in gaps or self.CALIBRATION_GAPS},
+            key=lambda p: (self.writer.estimate(size, p), -p.chunk_size, p.chunk_gap))
+        for profile in candidates:
+            if await self._pacing_ok(profile, command, expect, trials, timeout, echo):
+                return profile
+        return None
+
+    async def _pacing_ok(self, profile, command, expect, trials, timeout, echo):
+        results = await asyncio.gather(
+            *(self.request(command, expect, timeout, profile) for _ in range(trials)),
+            return_exceptions=True)
+        ok = all(isinstance(result, CommandResponse) and
+                 (not echo or any(line.endswith(command.strip()) for line in result.lines))
+                 for result in results)
+        if not ok:
+            # 깨진 입력이 장치 줄 버퍼에 남지 않도록 줄바꿈을 보내고 출력이 멎을 때까지 대기
+            async with self._write_lock:
+                await self._write(self.line_ending, PROFILES['legacy'])
+            await asyncio.sleep(timeout)
+            self._discard_expired()  # 출력이 멎었으므로 더 올 응답 없음
+        return ok
+
+    def _ensure_reader(self):
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def _read_loop(self):
+        # 수신 줄을 가장 먼저 보낸 대기 중 명령의 응답으로 모음
+        error = IOError("포트 연결이 종료되었습니다.")
+        try:
+            async for line in self.subscription.lines():
+                if not self._pending:
+                    continue
+                pending = self._pending[0]
+                line = line.rstrip('\r\n')
+                pending.lines.append(line)
+                match = pending.matcher(line)
+                if match:
+                    self._pending.popleft()
+                    if not pending.expired and not pending.future.done():
+                        pending.future.set_result(CommandResponse(
+                            pending.command, pending.lines,
+                            match if isinstance(match, re.Match) else None,
+                            time.monotonic() - pending.start))
+        except Exception as e:
+            error = e
+        while self._pending:
+            pending = self._pending.popleft()
+            if not pending.expired and not pending.future.done():
+                pending.future.set_exception(error)
+
+    def close(self):
+        """구독 해제 (대기 중인 명령은 오류로 끝남)"""
+        self.subscription.close()
+
+
+_engines = {}  # id(BrokeredPort) -> CommandEngine
+_engines_lock = threading.Lock()
+
+
+def command_engine(serial_port, **options):
+    """포트의 공용 명령 엔진 반환 (options는 처음 생성할 때만 적용)"""
+    port = port_broker().attach(serial_port)
+    with _engines_lock:
+        for key in [key for key, engine in _engines.items() if not engine.port.running]:
+            del _engines[key]
+        engine = _engines.get(id(port))
+        if engine is None or engine.port is not port:
+            engine = _engines[id(port)] = CommandEngine(port, **options)
+        return engine
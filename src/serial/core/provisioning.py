@@ -0,0 +1,149 @@
+import asyncio
+import re
+import time
+
+import serial
+
+from .broker import port_broker
+from .pacing import DEFAULT_PROFILE
+from .protocol import CommandEngine, parse_fields
+
+READ_MODEL_COMMAND = "db r model"
+READ_MODEL_END = "serial_number ="  # 모델 정보 응답의 마지막 줄
+
+_RANGE_PATTERN = re.compile(r'^(.*?)(\d+)$')
+
+
+class ProvisionResult:
+    """포트 하나의 모델/시리얼 번호 쓰기 결과"""
+
+    PENDING = '대기'
+    RUNNING = '진행 중'
+    OK = '성공'
+    FAILED = '실패'
+
+    def __init__(self, port_name, serial_number, baudrate=None):
+        self.port_name = port_name
+        self.serial_number = serial_number
+        self.baudrate = baudrate  # 포트를 열 보레이트 (None이면 provision_batch의 baudrate)
+        self.status = self.PENDING
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.message = ''
+
+    @property
+    def ok(self):
+        return self.status == self.OK
+
+
+def parse_serial_range(text):
+    """'EVSCA000100..EVSCA000131' 또는 쉼표로 나눈 시리얼 번호 목록을 펼쳐 반환
+
+    범위의 숫자 부분은 시작 번호의 자릿수를 유지한다.
+    """
+    serials = []
+    for part in (p.strip() for p in text.split(',')):
+        if not part:
+            continue
+        if '..' not in part:
+            serials.append(part)
+            continue
+        start, end = (s.strip() for s in part.split('..', 1))
+        start_match = _RANGE_PATTERN.match(start)
+        end_match = _RANGE_PATTERN.match(end)
+        if not start_match or not end_match:
+            raise ValueError(f"시리얼 범위 형식이 잘못되었습니다: {part}")
+        prefix, first = start_match.groups()
+        end_prefix, last = end_match.groups()
+        if end_prefix and end_prefix != prefix:
+            raise ValueError(f"범위의 접두어가 다릅니다: {part}")
+        if int(last) < int(first):
+            raise ValueError(f"범위의 끝이 시작보다 작습니다: {part}")
+        width = len(first)
+        serials.extend(f"{prefix}{number:0{width}d}" for number in range(int(first), int(last) + 1))
+    return serials
+
+
+def port_sort_key(name):
+    """COM10이 COM9 뒤에 오도록 숫자를 값으로 비교하는 정렬 키"""
+    return [int(token) if token.isdigit() else token for token in re.split(r'(\d+)', name)]
+
+
+def assign_serials(port_names, serials):
+    """포트 이름 순서대로 시리얼 번호를 하나씩 배정한 ProvisionResult 목록"""
+    port_names = sorted(port_names, key=port_sort_key)
+    if len(serials) < len(port_names):
+        raise ValueError(f"시리얼 번호가 부족합니다 (포트 {len(port_names)}개, 번호 {len(serials)}개)")
+    return [ProvisionResult(name, serial_number)
+            for name, serial_number in zip(port_names, serials)]
+
+
+async def provision_board(engine, model_name, result, retries=2, on_update=None):
+    """보드 하나에 모델 정보 쓰기 + 다시 읽어 확인 (실패 시 retries번 재시도)
+
+    쓰기/읽기 명령을 한 번에 보내므로 시도마다 응답 한 번 왕복만 걸린다.
+    """
+    start = time.monotonic()
+    result.status = result.RUNNING
+    if on_update is not None:
+        on_update(result)
+    for attempt in range(1, retries + 2):
+        result.attempts = attempt
+        try:
+            _, response = await asyncio.gather(
+                engine.request(f"db w model 1 {model_name} {result.serial_number}"),
+                engine.request(READ_MODEL_COMMAND, READ_MODEL_END))
+            fields = parse_fields(response.lines)
+            if (fields.get('model_name') == model_name and
+                    fields.get('serial_number') == result.serial_number):
+                result.status = result.OK
+                result.message = ''
+                break
+            result.message = (f"확인 불일치: {fields.get('model_name', '')} "
+                              f"{fields.get('serial_number', '')}").strip()
+        except Exception as e:
+            result.message = str(e)
+        result.status = result.FAILED
+    result.elapsed = time.monotonic() - start
+    if on_update is not None:
+        on_update(result)
+    return result
+
+
+async def provision_batch(results, model_name, baudrate=115200, retries=2, timeout=2.0,
+                          profile=DEFAULT_PROFILE, on_update=None):
+    """여러 포트에 동시에 모델 정보 쓰기 (포트마다 열기 → 쓰기/확인 → 닫기)
+
+    모니터 등에서 이미 열려 브로커가 소유한 포트는 그대로 빌려 쓰고 닫지 않는다.
+    보드마다 보레이트가 다를 수 있으므로 result.baudrate가 있으면 그 값으로 연다.
+    on_update(result)는 포트 상태가 바뀔 때마다 이벤트 루프 스레드에서 호출된다.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def run(result):
+        broker = port_broker()
+        port = broker.find_by_name(result.port_name)
+        opened = None
+        try:
+            if port is None:
+                rate = result.baudrate or baudrate
+                opened = await loop.run_in_executor(
+                    None, lambda: serial.Serial(result.port_name, rate, timeout=1))
+                port = broker.attach(opened)
+        except Exception as e:
+            result.status = result.FAILED
+            result.message = f"포트 열기 실패: {str(e)}"
+            if on_update is not None:
+                on_update(result)
+            return result
+
+        engine = CommandEngine(port, timeout=timeout, profile=profile)
+        try:
+            return await provision_board(engine, model_name, result, retries, on_update)
+        finally:
+            engine.close()
+            if opened is not None:
+                # 브로커 종료 대기가 이벤트 루프를 막지 않도록 실행기에서 닫기
+                await loop.run_in_executor(None, broker.close, opened)
+
+    return await asyncio.gather(*(run(result) for result in results))
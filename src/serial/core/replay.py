@@ -0,0 +1,210 @@
+"""저장된 로그/원시 캡처를 pty로 재생하는 도구 (Linux/macOS)
+
+사용법:
+    python -m src.serial.core.replay log/capture.scap [--speed 10 | --fast]
+    python -m src.serial.core.replay log/log_20240101_120000.txt --baud 921600
+
+출력된 pty 경로(/dev/pts/N 등)를 SerialPortSelector 포트 입력란에 넣으면
+실제 포트처럼 모니터링할 수 있다.
+"""
+import argparse
+import os
+import select
+import sys
+import threading
+import time
+
+try:
+    import tty
+except ImportError:  # Windows에는 pty가 없음
+    tty = None
+
+from .capture import CaptureReader
+
+# 실행 중인 재생 pty 경로 (SerialPortSelector 포트 목록에 표시)
+_active_ports = set()
+_active_lock = threading.Lock()
+
+
+def active_replay_ports():
+    with _active_lock:
+        return sorted(_active_ports)
+
+
+def text_log_chunks(path, chunk_lines=16):
+    """텍스트 로그를 chunk_lines 줄씩 (None, 바이트)로 반환 (수신 시각 없음)"""
+    with open(path, 'rb') as f:
+        lines = []
+        for line in f:
+            lines.append(line)
+            if len(lines) >= chunk_lines:
+                yield None, b''.join(lines)
+                lines = []
+        if lines:
+            yield None, b''.join(lines)
+
+
+def capture_chunks(path, port=None):
+    """원시 캡처를 (수신 시각 ns, 바이트)로 반환 (port: 포트 이름 또는 ID로 필터)"""
+    reader = CaptureReader(path)
+    try:
+        for timestamp_ns, port_id, data in reader.records():
+            if port is None or port in (port_id, reader.ports.get(port_id)):
+                yield timestamp_ns, data
+    finally:
+        reader.close()
+
+
+def open_source(path, port=None):
+    """파일 형식에 맞는 재생 소스 반환"""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic == b'SCAP':
+        return capture_chunks(path, port)
+    return text_log_chunks(path)
+
+
+class PtyReplay(threading.Thread):
+    """청크를 pty master에 기록해 slave 쪽을 시리얼 포트처럼 보이게 하는 재생 스레드
+
+    - speed=1.0: 원래 타이밍, speed=N: N배속, speed=0: 최대 속도 (읽는 쪽 속도에 맞춤)
+    - 수신 시각이 없는 텍스트 로그는 baud 속도(10 bit/byte) 기준으로 타이밍을 만든다.
+    - 앱이 포트에 쓴 데이터(명령 등)는 읽어서 버린다.
+    """
+
+    def __init__(self, chunks, speed=1.0, baud=115200):
+        super().__init__(daemon=True)
+        self.chunks = chunks
+        self.speed = speed
+        self.baud = baud
+        self.bytes_sent = 0
+        self.chunks_sent = 0
+        self.max_lag = 0.0  # 예정 시각보다 늦게 보낸 최대 시간(초)
+        self.error = None
+        self._stop_event = threading.Event()
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port_name = os.ttyname(self._slave)
+        with _active_lock:
+            _active_ports.add(self.port_name)
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = e
+            print(f"재생 오류: {str(e)}")
+
+    def _run(self):
+        start = time.perf_counter()
+        first_ns = None
+        elapsed = 0.0  # 텍스트 로그의 가상 전송 시간
+        for timestamp_ns, data in self.chunks:
+            if self._stop_event.is_set():
+                return
+            if self.speed > 0:
+                if timestamp_ns is not None:
+                    if first_ns is None:
+                        first_ns = timestamp_ns
+                        start = time.perf_counter()
+                    offset = (timestamp_ns - first_ns) / 1e9
+                else:
+                    offset = elapsed
+                    elapsed += len(data) * 10 / self.baud
+                deadline = start + offset / self.speed
+                self._wait_until(deadline)
+                self.max_lag = max(self.max_lag, time.perf_counter() - deadline)
+            self._write(data)
+            self.bytes_sent += len(data)
+            self.chunks_sent += 1
+
+    def _drain(self):
+        """앱이 포트에 쓴 데이터 버리기"""
+        try:
+            os.read(self._master, 65536)
+        except (BlockingIOError, OSError):
+            pass
+
+    def _wait_until(self, deadline):
+        while not self._stop_event.is_set():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            readable, _, _ = select.select([self._master], [], [], remaining)
+            if readable:
+                self._drain()
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view and not self._stop_event.is_set():
+            readable, writable, _ = select.select([self._master], [self._master], [], 0.1)
+            if readable:
+                self._drain()
+            if writable:
+                try:
+                    written = os.write(self._master, view)
+                except BlockingIOError:
+                    continue
+                view = view[written:]
+
+    def stop(self):
+        """재생 중지 후 pty 닫기"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        self.close()
+
+    def close(self):
+        with _active_lock:
+            _active_ports.discard(self.port_name)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._master = self._slave = -1
+
+
+def main(argv=None):
+    if os.name != 'posix':
+        print("pty 재생은 Linux/macOS에서만 사용할 수 있습니다.")
+        return 1
+
+    parser = argparse.ArgumentParser(description="저장된 로그/원시 캡처를 pty로 재생")
+    parser.add_argument('source', help='텍스트 로그 또는 .scap 원시 캡처')
+    parser.add_argument('--speed', type=float, default=1.0, help='재생 배속 (기본 1.0)')
+    parser.add_argument('--fast', action='store_true', help='최대 속도로 재생')
+    parser.add_argument('--baud', type=int, default=115200,
+                        help='텍스트 로그 재생 속도 (bps, 기본 115200)')
+    parser.add_argument('--port', help='원시 캡처에서 재생할 포트 이름')
+    parser.add_argument('--wait', action='store_true',
+                        help='엔터를 누른 뒤 재생 시작 (포트를 먼저 연결할 때)')
+    args = parser.parse_args(argv)
+
+    replay = PtyReplay(open_source(args.source, args.port),
+                       speed=0 if args.fast else args.speed, baud=args.baud)
+    print(f"재생 포트: {replay.port_name}", flush=True)
+    try:
+        if args.wait:
+            input("포트를 연결한 뒤 엔터를 누르세요...")
+        start = time.perf_counter()
+        replay.start()
+        while replay.is_alive():
+            replay.join(0.5)
+        elapsed = time.perf_counter() - start
+        print(f"재생 완료: {replay.bytes_sent:,} bytes, {replay.chunks_sent:,} chunks, "
+              f"{elapsed:.2f} s, 최대 지연 {replay.max_lag * 1000:.1f} ms")
+        # 읽는 쪽이 남은 데이터를 가져갈 때까지 포트 유지
+        input("엔터를 누르면 포트를 닫습니다...")
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        replay.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
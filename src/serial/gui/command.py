@@ -0,0 +1,66 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class CommandRequest(QObject):
+    """CommandEngine Future 목록이 모두 끝나면 GUI 스레드에 시그널로 알리는 어댑터
+
+    finished는 응답(CommandResponse) 목록을 보낸 순서대로 전달하고,
+    하나라도 실패하면 첫 번째 오류 메시지로 failed를 보낸다.
+    """
+    finished = pyqtSignal(list)
+    failed = pyqtSignal(str)
+    _completed = pyqtSignal()
+
+    def __init__(self, futures, parent=None):
+        super().__init__(parent)
+        self.futures = list(futures)
+        self._remaining = len(self.futures)
+        # Future 콜백은 이벤트 루프 스레드에서 호출되므로 시그널로 GUI 스레드에 전달
+        self._completed.connect(self._on_completed)
+        for future in self.futures:
+            future.add_done_callback(lambda _: self._completed.emit())
+
+    @property
+    def running(self):
+        return any(not future.done() for future in self.futures)
+
+    def _on_completed(self):
+        self._remaining -= 1
+        if self._remaining:
+            return
+        for future in self.futures:
+            exc = future.exception() if not future.cancelled() else None
+            if future.cancelled() or exc is not None:
+                self.failed.emit(str(exc) if exc is not None else "명령이 취소되었습니다.")
+                return
+        self.finished.emit([future.result() for future in self.futures])
+
+
+class ProgressRequest(QObject):
+    """진행 상황을 알려주는 작업 Future를 GUI 스레드 시그널로 전달하는 어댑터
+
+    start(on_update)는 작업을 시작하고 Future를 반환해야 한다. on_update(item)은
+    이벤트 루프 스레드에서 호출되며 updated 시그널로 GUI 스레드에 전달된다.
+    """
+    updated = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    _completed = pyqtSignal()
+
+    def __init__(self, start, parent=None):
+        super().__init__(parent)
+        self._completed.connect(self._on_completed)
+        self.future = start(self.updated.emit)
+        self.future.add_done_callback(lambda _: self._completed.emit())
+
+    @property
+    def running(self):
+        return not self.future.done()
+
+    def _on_completed(self):
+        if self.future.cancelled():
+            self.failed.emit("작업이 취소되었습니다.")
+        elif self.future.exception() is not None:
+            self.failed.emit(str(self.future.exception()))
+        else:
+            self.finished.emit(self.future.result())
@@ -0,0 +1,237 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from ..core.broker import DROP_OLDEST, Subscription, port_broker
+
+
+class DeliveryStats:
+    """리더 → LogViewer 전달 통계"""
+
+    def __init__(self):
+        self.lines = 0       # 수신한 줄 수
+        self.flushes = 0     # 리더가 큐에 넣은 청크 수
+        self.coalesced = 0   # 이미 대기 중인 갱신에 합쳐진 청크 수 (시그널 생략)
+        self.dropped = 0     # GUI 지연으로 버려진 줄 수
+        self.overflow_bytes = 0  # 구독 큐 초과로 버려진 바이트 수
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+class ChunkQueue:
+    """리더 쪽에서 넣고 GUI 스레드에서 꺼내는 텍스트 청크 큐
+
+    GUI는 take(max_bytes)로 한 번에 정해진 크기만 꺼내고 나머지는 다음 갱신에서
+    꺼낸다. 대기 중인 크기가 max_pending_bytes를 넘을 때만 (GUI가 계속 따라오지
+    못하는 경우) 가장 오래된 청크를 버린다.
+    """
+
+    MAX_PENDING_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, max_pending_bytes=MAX_PENDING_BYTES):
+        self.stats = DeliveryStats()
+        self._chunks = deque()
+        self._chunk_lines = deque()
+        self._chunk_times = deque()
+        self._pending_bytes = 0
+        self._max_pending_bytes = max_pending_bytes
+        self._lock = threading.Lock()
+        self.last_wait = 0.0  # 마지막 take()에서 가장 오래 기다린 청크의 대기 시간(초)
+
+    def put(self, lines):
+        """줄 목록을 하나의 청크로 넣고, 큐가 비어 있었으면 True (알림 필요)"""
+        chunk = ''.join(lines)
+        with self._lock:
+            self.stats.lines += len(lines)
+            self.stats.flushes += 1
+            notify = not self._chunks
+            while self._chunks and self._pending_bytes + len(chunk) > self._max_pending_bytes:
+                # GUI가 오래 밀려 있으면 가장 오래된 청크 버림
+                self._pending_bytes -= len(self._chunks.popleft())
+                self._chunk_times.popleft()
+                self.stats.dropped += self._chunk_lines.popleft()
+            self._pending_bytes += len(chunk)
+            self._chunks.append(chunk)
+            self._chunk_lines.append(len(lines))
+            self._chunk_times.append(time.monotonic())
+            if not notify:
+                self.stats.coalesced += 1
+        return notify
+
+    def take(self, max_bytes=None):
+        """대기 중인 청크를 앞에서부터 max_bytes까지 꺼내 하나의 문자열로 반환
+
+        max_bytes가 None이면 모두 꺼낸다. 첫 청크가 max_bytes보다 크면 그 안의
+        마지막 줄바꿈까지만 꺼내고 나머지는 큐 앞에 남긴다.
+        """
+        with self._lock:
+            self.last_wait = time.monotonic() - self._chunk_times[0] if self._chunk_times else 0.0
+            if max_bytes is None:
+                max_bytes = self._pending_bytes
+            parts = []
+            size = 0
+            while self._chunks and size + len(self._chunks[0]) <= max_bytes:
+                chunk = self._chunks.popleft()
+                self._chunk_lines.popleft()
+                self._chunk_times.popleft()
+                parts.append(chunk)
+                size += len(chunk)
+            if not parts and self._chunks:
+                chunk = self._chunks[0]
+                cut = chunk.rfind('\n', 0, max_bytes) + 1 or len(chunk)
+                parts.append(chunk[:cut])
+                size = cut
+                if cut == len(chunk):
+                    self._chunks.popleft()
+                    self._chunk_lines.popleft()
+                    self._chunk_times.popleft()
+                else:
+                    self._chunks[0] = chunk[cut:]
+                    self._chunk_lines[0] -= parts[0].count('\n')
+            self._pending_bytes -= size
+        return ''.join(parts)
+
+    @property
+    def pending_chunks(self):
+        return len(self._chunks)
+
+    @property
+    def pending_bytes(self):
+        return self._pending_bytes
+
+
+class AsyncSerialMonitor(QObject):
+    """포트 브로커를 구독해 수신 줄을 Qt 시그널로 전달하는 어댑터
+
+    포트는 브로커(BrokeredPort)가 단독으로 읽고, 이 모니터는 구독자 중 하나로
+    같은 바이트를 받는다. 대화상자 등 다른 구독자와 수신 데이터를 나눠 갖지 않는다.
+    """
+    data_ready = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+
+    FLUSH_INTERVAL_MS = 33          # 최대 갱신 주기 (약 30fps)
+    FLUSH_MAX_BYTES = 64 * 1024     # 주기 전이라도 이 크기를 넘으면 전달
+    APPLY_MAX_BYTES = 64 * 1024     # GUI가 한 번의 갱신에서 꺼내 반영할 최대 크기
+    MAX_PENDING_BYTES = ChunkQueue.MAX_PENDING_BYTES  # GUI가 따라오지 못할 때 보관할 최대 크기
+
+    def __init__(self, serial_port, flush_interval_ms=FLUSH_INTERVAL_MS,
+                 flush_max_bytes=FLUSH_MAX_BYTES,
+                 max_pending_bytes=MAX_PENDING_BYTES, broker=None,
+                 subscription_bytes=Subscription.MAX_BYTES):
+        super().__init__()
+        self.serial_port = serial_port
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_bytes = flush_max_bytes
+        self.broker = broker or port_broker()
+        self.subscription_bytes = subscription_bytes
+        self.port = None
+        self.subscription = None
+        self.queue = ChunkQueue(max_pending_bytes)
+        self.stats = self.queue.stats
+        self._future = None
+        self._task = None
+        self._stopping = False
+        self._done = threading.Event()
+
+    @property
+    def running(self):
+        return self._future is not None and not self._done.is_set()
+
+    def start(self):
+        self._done.clear()
+        self._stopping = False
+        self.port = self.broker.attach(self.serial_port)
+        self.subscription = self.port.subscribe('monitor', self.subscription_bytes, DROP_OLDEST)
+        self._future = self.port.event_loop.submit(self._run())
+        # 코루틴이 시작 전에 취소되어도 완료로 처리
+        self._future.add_done_callback(lambda _: self._done.set())
+
+    async def _run(self):
+        # 수신된 줄을 모아 정해진 주기로 전달
+        subscription = self.subscription
+        pending = []
+        pending_bytes = 0
+        last_flush = time.monotonic()
+        if self._stopping:
+            subscription.close()
+            return
+        self._task = asyncio.current_task()
+        try:
+            while True:
+                timeout = None
+                if pending:
+                    timeout = max(0.0, last_flush + self.flush_interval - time.monotonic())
+                lines = await subscription.read_lines(timeout)
+                if lines is None:
+                    break
+
+                if lines:
+                    pending.extend(lines)
+                    pending_bytes += sum(len(line) for line in lines)
+
+                now = time.monotonic()
+                if pending and (pending_bytes >= self.flush_max_bytes or
+                                now - last_flush >= self.flush_interval):
+                    self._flush(pending)
+                    pending = []
+                    pending_bytes = 0
+                    last_flush = now
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Serial reading error: {str(e)}")
+            self.error_occurred.emit(str(e))
+        finally:
+            if pending:
+                self._flush(pending)
+            subscription.close()
+
+    def _flush(self, lines):
+        self.stats.overflow_bytes = self.subscription.dropped_bytes
+        if self.queue.put(lines):
+            self.data_ready.emit()
+
+    def take_chunks(self, max_bytes=None):
+        return self.queue.take(max_bytes)
+
+    def collect_metrics(self):
+        """포트/구독/전달 큐 카운터와 게이지 (측정값 수집용)"""
+        values = self.stats.as_dict()
+        values['queue_chunks'] = self.queue.pending_chunks
+        values['queue_bytes'] = self.queue.pending_bytes
+        if self.port is not None:
+            values['bytes_read'] = self.port.connection.bytes_read
+            values['bytes_written'] = self.port.connection.bytes_written
+            values['subscribers'] = len(self.port.subscribers)
+        if self.subscription is not None:
+            values['subscription_pending_bytes'] = self.subscription.pending_bytes
+        return values
+
+    def set_capture(self, capture, port_name=None):
+        """포트 원시 캡처 설정 (브로커가 읽는 모든 수신 데이터 기록)"""
+        if self.port is not None:
+            self.port.set_capture(capture, port_name)
+
+    def write(self, data):
+        """포트로 전송 (어느 스레드에서나 호출 가능)"""
+        return self.port.write(data)
+
+    def stop(self):
+        """구독 중지 (남은 줄은 큐에 넣고 종료, 포트는 브로커가 계속 소유)"""
+        if self._future is not None:
+            self.port.event_loop.call_soon(self._stop_on_loop)
+
+    def _stop_on_loop(self):
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+
+    def wait(self, timeout=None):
+        """읽기 작업이 끝날 때까지 대기"""
+        if self._future is None:
+            return True
+        return self._done.wait(timeout)
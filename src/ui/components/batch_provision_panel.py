@@ -0,0 +1,173 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QPushButton,
+                           QLabel, QLineEdit, QComboBox, QSpinBox, QTableWidget,
+                           QTableWidgetItem, QHeaderView, QMessageBox)
+from PyQt5.QtGui import QColor
+import time
+
+from ...models.serial_settings import PortCache, SerialSettings
+from ...serial.core.baud import BAUD_RATES
+from ...serial.core.connection import shared_event_loop
+from ...serial.core.provisioning import assign_serials, parse_serial_range, provision_batch
+from ...serial.gui.command import ProgressRequest
+from ...utils.port_utils import get_available_ports, port_identities
+
+class BatchProvisionPanel(QWidget):
+    """여러 보드에 모델명/시리얼 번호를 동시에 쓰고 결과를 표로 보여주는 패널"""
+
+    COLUMNS = ["포트", "시리얼 번호", "상태", "시도", "시간(ms)", "메시지"]
+    STATUS_COLORS = {'성공': '#27ae60', '실패': '#c0392b', '진행 중': '#2980b9'}
+
+    def __init__(self, model_list, profile_name='qc', parent=None):
+        super().__init__(parent)
+        self.profile_name = profile_name
+        self.serial_settings = SerialSettings()
+        self.port_cache = PortCache()
+        self._request = None
+        self._rows = {}  # 포트 이름 -> 표 행 번호
+        self._start_time = 0.0
+        self.initUI(model_list)
+
+    def initUI(self, model_list):
+        layout = QVBoxLayout(self)
+
+        form = QGridLayout()
+
+        # 포트 목록 (비우면 자동 검색)
+        self.ports_edit = QLineEdit()
+        self.ports_edit.setPlaceholderText("쉼표로 구분 (비우면 연결된 USB 포트 자동 검색)")
+        detect_btn = QPushButton("포트 검색")
+        detect_btn.clicked.connect(self.detect_ports)
+        form.addWidget(QLabel("포트:"), 0, 0)
+        form.addWidget(self.ports_edit, 0, 1)
+        form.addWidget(detect_btn, 0, 2)
+
+        # 모델명
+        self.model_combo = QComboBox()
+        self.model_combo.setEditable(True)
+        self.model_combo.addItems(model_list)
+        form.addWidget(QLabel("모델명:"), 1, 0)
+        form.addWidget(self.model_combo, 1, 1, 1, 2)
+
+        # 시리얼 번호 범위
+        self.serial_range_edit = QLineEdit()
+        self.serial_range_edit.setPlaceholderText("EVSCA000100..EVSCA000131")
+        form.addWidget(QLabel("시리얼 범위:"), 2, 0)
+        form.addWidget(self.serial_range_edit, 2, 1, 1, 2)
+
+        # 보레이트 (자동: 포트마다 마지막으로 감지한 보레이트)
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItem(SerialSettings.AUTO_BAUD)
+        self.baud_combo.addItems([str(rate) for rate in BAUD_RATES])
+        form.addWidget(QLabel("보레이트:"), 3, 0)
+        form.addWidget(self.baud_combo, 3, 1, 1, 2)
+
+        # 재시도 횟수
+        self.retries_spin = QSpinBox()
+        self.retries_spin.setRange(0, 5)
+        self.retries_spin.setValue(2)
+        form.addWidget(QLabel("재시도:"), 4, 0)
+        form.addWidget(self.retries_spin, 4, 1)
+
+        self.start_btn = QPushButton("일괄 쓰기")
+        self.start_btn.clicked.connect(self.start_batch)
+        form.addWidget(self.start_btn, 4, 2)
+        layout.addLayout(form)
+
+        # 포트별 결과 표
+        self.result_table = QTableWidget(0, len(self.COLUMNS))
+        self.result_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.result_table.horizontalHeader().setStretchLastSection(True)
+        self.result_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.result_table)
+
+        self.summary_label = QLabel("준비")
+        layout.addWidget(self.summary_label)
+
+    def detect_ports(self):
+        """연결된 포트를 검색해 입력란에 채우기"""
+        ports = get_available_ports()
+        self.ports_edit.setText(", ".join(ports))
+        self.summary_label.setText(f"포트 {len(ports)}개 검색됨")
+
+    def start_batch(self):
+        """입력한 포트/시리얼 범위로 일괄 쓰기 시작"""
+        if self._request is not None and self._request.running:
+            QMessageBox.warning(self, "경고", "일괄 쓰기가 진행 중입니다.")
+            return
+
+        port_names = [p.strip() for p in self.ports_edit.text().split(',') if p.strip()]
+        if not port_names:
+            port_names = get_available_ports()
+        model_name = self.model_combo.currentText().strip()
+        if not port_names or not model_name:
+            QMessageBox.warning(self, "경고", "포트와 모델명을 확인해주세요.")
+            return
+        try:
+            results = assign_serials(port_names, parse_serial_range(self.serial_range_edit.text()))
+        except ValueError as e:
+            QMessageBox.warning(self, "경고", str(e))
+            return
+
+        self._assign_baudrates(results)
+        self._fill_table(results)
+        profile = self.serial_settings.get_profile(self.profile_name)
+        retries = self.retries_spin.value()
+        self._start_time = time.monotonic()
+        self.start_btn.setEnabled(False)
+        self.summary_label.setText(f"{len(results)}개 보드 진행 중...")
+
+        self._request = ProgressRequest(
+            lambda on_update: shared_event_loop().submit(provision_batch(
+                results, model_name, SerialSettings.BAUD_RATE, retries,
+                profile=profile, on_update=on_update)),
+            self)
+        self._request.updated.connect(self._update_row)
+        self._request.finished.connect(self._on_finished)
+        self._request.failed.connect(self._on_failed)
+
+    def _assign_baudrates(self, results):
+        """포트별 보레이트 지정 (자동이면 PortCache에 저장된 값, 없으면 기본값)"""
+        selected = self.baud_combo.currentText()
+        if selected != SerialSettings.AUTO_BAUD:
+            for result in results:
+                result.baudrate = int(selected)
+            return
+        identities = port_identities([result.port_name for result in results])
+        for result in results:
+            cached = self.port_cache.get_baudrate(identities[result.port_name])
+            result.baudrate = cached or SerialSettings.BAUD_RATE
+
+    def _fill_table(self, results):
+        self.result_table.setRowCount(len(results))
+        self._rows = {}
+        for row, result in enumerate(results):
+            self._rows[result.port_name] = row
+            self._update_row(result)
+
+    def _update_row(self, result):
+        row = self._rows.get(result.port_name)
+        if row is None:
+            return
+        values = [result.port_name, result.serial_number, result.status,
+                  str(result.attempts), f"{result.elapsed * 1000:.0f}", result.message]
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            color = self.STATUS_COLORS.get(result.status)
+            if column == 2 and color:
+                item.setForeground(QColor(color))
+            self.result_table.setItem(row, column, item)
+
+    def _on_finished(self, results):
+        self.start_btn.setEnabled(True)
+        for result in results:
+            self._update_row(result)
+        succeeded = sum(1 for result in results if result.ok)
+        elapsed = time.monotonic() - self._start_time
+        self.summary_label.setText(
+            f"완료: 성공 {succeeded} / 실패 {len(results) - succeeded} ({elapsed:.2f} s)")
+
+    def _on_failed(self, message):
+        self.start_btn.setEnabled(True)
+        self.summary_label.setText("실패")
+        QMessageBox.critical(self, "오류", f"일괄 쓰기 실패: {message}")
@@ -1,11 +1,13 @@
 import os
 from PyQt5.QtWidgets import (QWidget, QPushButton, QLabel, QFileDialog, 
                            QProgressBar, QVBoxLayout, QHBoxLayout, 
-                           QGridLayout, QComboBox, QMessageBox)
+                           QGridLayout, QComboBox, QMessageBox, QCheckBox)
 from PyQt5.QtCore import Qt
 import serial.tools.list_ports
 from ...controllers.esp_controller import ESPController, DownloadThread
+from ...models.firmware_catalog import firmware_catalog
 from ..styles.button_styles import ButtonStyles
+from .esp_gang_dialog import ESPGangDialog
 import subprocess
 import sys
 
@@ -23,6 +25,7 @@ class ESPDownloadComponent(QWidget):
         self.app_label = None
         self.progress_bar = None
         self.status_label = None
+        self.gang_dialog = None
         
         # 기본 파일 경로 설정
         self.default_files = {
@@ -62,6 +65,7 @@ class ESPDownloadComponent(QWidget):
                     
                     if os.path.exists(full_path):
                         print(f"Found {file_type} file: {full_path}")
+                        firmware_catalog().refresh_async([full_path])
                         setattr(self.esp_controller.settings, f'{file_type}_path', full_path)
                         found_files = True
                     else:
@@ -178,12 +182,25 @@ class ESPDownloadComponent(QWidget):
         self.progress_bar.setTextVisible(True)
         download_group.addWidget(self.progress_bar)
         
+        # 차등 플래시 (플래시 내용과 다른 섹터만 쓰기)
+        self.differential_checkbox = QCheckBox('Skip unchanged sectors')
+        self.differential_checkbox.setChecked(self.esp_controller.settings.differential)
+        self.differential_checkbox.toggled.connect(
+            lambda checked: setattr(self.esp_controller.settings, 'differential', checked))
+        download_group.addWidget(self.differential_checkbox)
+        
         # 다운로드 버튼
         self.download_btn = QPushButton("Download ESP32 Firmware")  # 버튼 텍스트 통일
         self.download_btn.setStyleSheet(ButtonStyles.DOWNLOAD_STYLE)  # nRF와 동일한 스타일
         self.download_btn.clicked.connect(self.start_download)
         download_group.addWidget(self.download_btn)
         
+        # 여러 포트 동시 다운로드 (갱 프로그래밍)
+        gang_btn = QPushButton("Gang Download (Multiple Ports)")
+        gang_btn.setStyleSheet(ButtonStyles.DEFAULT_STYLE)
+        gang_btn.clicked.connect(self.show_gang_download)
+        download_group.addWidget(gang_btn)
+        
         layout.addLayout(download_group)
 
     def select_file(self, file_type):
@@ -206,6 +223,8 @@ class ESPDownloadComponent(QWidget):
             }.get(file_type)
             
             if attr_name:
+                # 선택할 때 작업 스레드에서 색인/압축해 두고 다운로드할 때는 그대로 사용
+                firmware_catalog().refresh_async([file_path])
                 setattr(self.esp_controller.settings, attr_name, file_path)
                 self.update_file_label(file_type, file_path)
                 self.update_download_button()
@@ -306,18 +325,19 @@ class ESPDownloadComponent(QWidget):
         if not hasattr(self, 'download_btn') or self.download_btn is None:
             return
             
-        # 각 파일의 실제 존재 여부 확인
+        # 각 파일의 실제 존재 여부 확인 (펌웨어 카탈로그 색인 조회)
+        catalog = firmware_catalog()
         files_exist = all(
             hasattr(self.esp_controller.settings, f'{ft}_path') and
             getattr(self.esp_controller.settings, f'{ft}_path') and
-            os.path.exists(getattr(self.esp_controller.settings, f'{ft}_path'))
+            catalog.exists(getattr(self.esp_controller.settings, f'{ft}_path'))
             for ft in ['bootloader', 'partition', 'ota', 'app']
         )
         
         # 파일이 존재하지 않으면 해당 설정 초기화
         for ft in ['bootloader', 'partition', 'ota', 'app']:
             path = getattr(self.esp_controller.settings, f'{ft}_path', None)
-            if path and not os.path.exists(path):
+            if path and not catalog.exists(path):
                 setattr(self.esp_controller.settings, f'{ft}_path', None)
                 label = getattr(self, f'{ft}_label', None)
                 if label:
@@ -336,6 +356,13 @@ class ESPDownloadComponent(QWidget):
         # 모든 조건이 충족될 때만 버튼 활성화
         self.download_btn.setEnabled(files_exist and port_selected)
 
+    def show_gang_download(self):
+        """여러 포트 동시 다운로드 창 열기 (선택한 펌웨어 파일 사용)"""
+        if self.gang_dialog is None:
+            self.gang_dialog = ESPGangDialog(self.esp_controller.settings, self)
+        self.gang_dialog.show()
+        self.gang_dialog.raise_()
+
     def update_progress(self, value):
         if self.progress_bar:
             self.progress_bar.setValue(value)
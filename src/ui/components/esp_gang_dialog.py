@@ -0,0 +1,171 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton,
+                           QLabel, QListWidget, QListWidgetItem, QSpinBox, QTableWidget,
+                           QTableWidgetItem, QHeaderView, QProgressBar, QMessageBox)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+import time
+
+from ...controllers.esp_controller import GangDownloadThread
+from ...controllers.esp_flasher import GangResult, gang_workers
+from ...utils.port_utils import get_available_ports
+from ..styles.button_styles import ButtonStyles
+
+class ESPGangDialog(QDialog):
+    """같은 ESP32 펌웨어를 여러 포트에 동시에 다운로드하는 창 (갱 프로그래밍)"""
+
+    COLUMNS = ["Port", "Status", "Progress", "Attempts", "Time (s)", "Message"]
+    STATUS_COLORS = {GangResult.DONE: '#27ae60', GangResult.FAILED: '#c0392b',
+                     GangResult.FLASHING: '#2980b9'}
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("ESP32 Gang Download")
+        self.resize(760, 520)
+        self.settings = settings
+        self.download_thread = None
+        self._rows = {}  # 포트 -> 표 행 번호
+        self._start_time = 0.0
+        self.initUI()
+        self.refresh_ports()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        # 포트 목록 (체크한 포트만 다운로드)
+        port_layout = QHBoxLayout()
+        self.port_list = QListWidget()
+        self.port_list.setMaximumHeight(120)
+        port_layout.addWidget(self.port_list)
+
+        port_buttons = QVBoxLayout()
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.refresh_ports)
+        select_all_btn = QPushButton('Select All')
+        select_all_btn.clicked.connect(lambda: self.set_all_checked(True))
+        clear_btn = QPushButton('Clear')
+        clear_btn.clicked.connect(lambda: self.set_all_checked(False))
+        for btn in [refresh_btn, select_all_btn, clear_btn]:
+            btn.setStyleSheet(ButtonStyles.DEFAULT_STYLE)
+            port_buttons.addWidget(btn)
+        port_buttons.addStretch()
+        port_layout.addLayout(port_buttons)
+        layout.addLayout(port_layout)
+
+        # 동시 작업 수 / 재시도
+        option_layout = QGridLayout()
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 32)
+        self.workers_spin.setValue(gang_workers(32, self.settings.flash_baud()))
+        self.workers_spin.setToolTip("동시에 다운로드할 보드 수 (기본값은 USB 대역폭/CPU 기준)")
+        option_layout.addWidget(QLabel('Parallel:'), 0, 0)
+        option_layout.addWidget(self.workers_spin, 0, 1)
+
+        self.retries_spin = QSpinBox()
+        self.retries_spin.setRange(0, 5)
+        self.retries_spin.setValue(1)
+        option_layout.addWidget(QLabel('Retries:'), 0, 2)
+        option_layout.addWidget(self.retries_spin, 0, 3)
+        option_layout.setColumnStretch(4, 1)
+        layout.addLayout(option_layout)
+
+        # 포트별 결과 표
+        self.result_table = QTableWidget(0, len(self.COLUMNS))
+        self.result_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.result_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.result_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.result_table)
+
+        self.summary_label = QLabel("Ready")
+        self.summary_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.summary_label)
+
+        self.start_btn = QPushButton("Download to Selected Ports")
+        self.start_btn.setStyleSheet(ButtonStyles.DOWNLOAD_STYLE)
+        self.start_btn.clicked.connect(self.start_download)
+        layout.addWidget(self.start_btn)
+
+    def refresh_ports(self):
+        """USB 시리얼 포트 목록 새로고침 (체크 상태 유지)"""
+        checked = set(self.checked_ports())
+        self.port_list.clear()
+        for port in get_available_ports():
+            item = QListWidgetItem(port)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if not checked or port in checked else Qt.Unchecked)
+            self.port_list.addItem(item)
+
+    def set_all_checked(self, checked):
+        for row in range(self.port_list.count()):
+            self.port_list.item(row).setCheckState(Qt.Checked if checked else Qt.Unchecked)
+
+    def checked_ports(self):
+        return [self.port_list.item(row).text() for row in range(self.port_list.count())
+                if self.port_list.item(row).checkState() == Qt.Checked]
+
+    def start_download(self):
+        """체크한 포트에 동시에 다운로드 시작"""
+        if self.download_thread is not None and self.download_thread.isRunning():
+            QMessageBox.warning(self, "Warning", "Gang download is in progress.")
+            return
+        ports = self.checked_ports()
+        if not ports:
+            QMessageBox.warning(self, "Warning", "Select at least one port.")
+            return
+        if not all(path for _, path in self.settings.flash_images()):
+            QMessageBox.warning(self, "Warning", "Select all firmware files first.")
+            return
+
+        self._fill_table(ports)
+        self._start_time = time.monotonic()
+        self.start_btn.setEnabled(False)
+        self.summary_label.setText(f"Downloading to {len(ports)} boards...")
+
+        self.download_thread = GangDownloadThread(self.settings, ports,
+                                                  workers=self.workers_spin.value(),
+                                                  retries=self.retries_spin.value())
+        self.download_thread.board_updated.connect(self._update_row)
+        self.download_thread.gang_completed.connect(self._on_completed)
+        self.download_thread.start()
+
+    def _fill_table(self, ports):
+        self.result_table.setRowCount(len(ports))
+        self._rows = {}
+        for row, port in enumerate(ports):
+            self._rows[port] = row
+            progress_bar = QProgressBar()
+            progress_bar.setAlignment(Qt.AlignCenter)
+            self.result_table.setCellWidget(row, 2, progress_bar)
+            self._update_row(GangResult(port))
+
+    def _update_row(self, result):
+        row = self._rows.get(result.port)
+        if row is None:
+            return
+        self.result_table.cellWidget(row, 2).setValue(result.progress)
+        elapsed = f"{result.elapsed:.1f}" if result.elapsed else ""
+        for column, value in [(0, result.port), (1, result.status), (3, str(result.attempts)),
+                              (4, elapsed), (5, result.message)]:
+            item = QTableWidgetItem(value)
+            color = self.STATUS_COLORS.get(result.status)
+            if column == 1 and color:
+                item.setForeground(QColor(color))
+            self.result_table.setItem(row, column, item)
+
+    def _on_completed(self, results):
+        self.start_btn.setEnabled(True)
+        for result in results:
+            self._update_row(result)
+        succeeded = sum(1 for result in results if result.ok)
+        elapsed = time.monotonic() - self._start_time
+        slowest = max((result.elapsed for result in results), default=0.0)
+        self.summary_label.setText(
+            f"Completed: {succeeded} succeeded / {len(results) - succeeded} failed "
+            f"in {elapsed:.1f} s (slowest board {slowest:.1f} s)")
+
+    def closeEvent(self, event):
+        if self.download_thread is not None and self.download_thread.isRunning():
+            QMessageBox.warning(self, "Warning", "Wait until the gang download finishes.")
+            event.ignore()
+            return
+        super().closeEvent(event)
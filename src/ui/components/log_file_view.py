@@ -0,0 +1,259 @@
+import queue
+import re
+
+from PyQt5.QtWidgets import QAbstractScrollArea, QApplication
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QKeySequence
+
+from ...utils.mapped_log import compile_bytes_query
+
+# 검색어 강조 배경색
+SEARCH_BACKGROUND = QColor('yellow')
+
+
+class LogFileView(QAbstractScrollArea):
+    """대용량 로그 파일용 읽기 전용 뷰
+
+    줄마다 위젯/모델 항목을 만들지 않고 세로 스크롤바 값을 첫 줄 번호로 사용해
+    화면에 보이는 줄만 파일에서 읽어 그린다. 줄 수와 무관하게 메모리가 일정하다.
+    선택은 줄 단위(anchor ~ current)로 한다.
+    """
+
+    MARGIN = 4
+    MAX_COPY_LINES = 100000  # 클립보드 복사 최대 줄 수
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.log_file = None
+        self.line_count = 0
+        self.current = 0        # 현재 줄 (검색 결과/커서)
+        self.anchor = 0         # 선택 시작 줄
+        self.search_pattern = None
+        self._max_width = 0
+        self.viewport().setCursor(Qt.IBeamCursor)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+    def set_file(self, log_file):
+        self.log_file = log_file
+        self.line_count = 0
+        self.current = self.anchor = 0
+        self._max_width = 0
+        self.verticalScrollBar().setValue(0)
+        self.horizontalScrollBar().setValue(0)
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def set_line_count(self, count):
+        """인덱싱이 진행된 만큼 스크롤 범위 확장"""
+        if count != self.line_count:
+            self.line_count = count
+            self._update_scrollbars()
+            self.viewport().update()
+
+    def set_search_pattern(self, pattern):
+        """화면에 보이는 줄에서 강조할 검색 패턴 (None이면 해제)"""
+        self.search_pattern = pattern
+        self.viewport().update()
+
+    def _line_height(self):
+        return self.fontMetrics().lineSpacing()
+
+    def _visible_rows(self):
+        return max(1, self.viewport().height() // self._line_height())
+
+    def _update_scrollbars(self):
+        rows = self._visible_rows()
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setRange(0, max(0, self.line_count - rows))
+        scrollbar.setPageStep(rows)
+        horizontal = self.horizontalScrollBar()
+        horizontal.setRange(0, max(0, self._max_width - self.viewport().width()))
+        horizontal.setPageStep(self.viewport().width())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        palette = self.palette()
+        painter.fillRect(self.viewport().rect(), palette.base())
+        if self.log_file is None or not self.line_count:
+            return
+
+        metrics = self.fontMetrics()
+        height = self._line_height()
+        first = self.verticalScrollBar().value()
+        lines = self.log_file.get_lines(first, first + self._visible_rows() + 1)
+        x = self.MARGIN - self.horizontalScrollBar().value()
+        width = self.viewport().width()
+        select_start, select_end = sorted((self.anchor, self.current))
+        max_width = self._max_width
+
+        for row, line in enumerate(lines):
+            line_no = first + row
+            top = row * height
+            text_color = palette.color(palette.Text)
+            if select_start <= line_no <= select_end and select_start != select_end:
+                painter.fillRect(0, top, width, height, palette.highlight())
+                text_color = palette.color(palette.HighlightedText)
+            elif line_no == self.current:
+                painter.fillRect(0, top, width, height, palette.alternateBase())
+
+            # 검색어 위치 강조
+            if self.search_pattern is not None:
+                for match in self.search_pattern.finditer(line):
+                    left = metrics.horizontalAdvance(line[:match.start()])
+                    painter.fillRect(x + left, top,
+                                     metrics.horizontalAdvance(match.group()) or 1, height,
+                                     SEARCH_BACKGROUND)
+
+            painter.setPen(text_color)
+            painter.drawText(x, top + metrics.ascent(), line)
+            max_width = max(max_width, metrics.horizontalAdvance(line) + 2 * self.MARGIN)
+
+        if max_width != self._max_width:
+            # 가로 스크롤 범위는 지금까지 본 가장 긴 줄 기준
+            self._max_width = max_width
+            self._update_scrollbars()
+
+    def _line_at(self, y):
+        line_no = self.verticalScrollBar().value() + y // self._line_height()
+        return max(0, min(line_no, self.line_count - 1))
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton or not self.line_count:
+            return
+        line_no = self._line_at(event.pos().y())
+        self._set_current(line_no, keep_anchor=bool(event.modifiers() & Qt.ShiftModifier))
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self.line_count:
+            self._set_current(self._line_at(event.pos().y()), keep_anchor=True)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            self.copy_selection()
+            return
+        steps = {
+            Qt.Key_Up: -1, Qt.Key_Down: 1,
+            Qt.Key_PageUp: -self._visible_rows(), Qt.Key_PageDown: self._visible_rows(),
+        }
+        key = event.key()
+        if key in steps:
+            line_no = self.current + steps[key]
+        elif key == Qt.Key_Home:
+            line_no = 0
+        elif key == Qt.Key_End:
+            line_no = self.line_count - 1
+        else:
+            super().keyPressEvent(event)
+            return
+        self._set_current(max(0, min(line_no, self.line_count - 1)),
+                          keep_anchor=bool(event.modifiers() & Qt.ShiftModifier))
+
+    def _set_current(self, line_no, keep_anchor=False):
+        self.current = line_no
+        if not keep_anchor:
+            self.anchor = line_no
+        # 현재 줄이 화면 밖이면 스크롤
+        scrollbar = self.verticalScrollBar()
+        if line_no < scrollbar.value():
+            scrollbar.setValue(line_no)
+        elif line_no >= scrollbar.value() + self._visible_rows():
+            scrollbar.setValue(line_no - self._visible_rows() + 1)
+        self.viewport().update()
+
+    def goto_line(self, line_no):
+        """line_no 줄을 선택하고 화면 가운데로 스크롤"""
+        if not 0 <= line_no < self.line_count:
+            return
+        self.current = self.anchor = line_no
+        self.verticalScrollBar().setValue(line_no - self._visible_rows() // 2)
+        self.viewport().update()
+
+    def current_line(self):
+        return self.current
+
+    def selected_lines(self):
+        """선택된 줄 번호 범위 (선택이 없으면 빈 범위)"""
+        if not self.line_count:
+            return range(0)
+        start, end = sorted((self.anchor, self.current))
+        return range(start, end + 1)
+
+    def copy_selection(self):
+        lines = self.selected_lines()
+        if self.log_file is not None and len(lines) <= self.MAX_COPY_LINES:
+            text = '\n'.join(self.log_file.get_lines(lines.start, lines.stop))
+            QApplication.clipboard().setText(text)
+
+class LogFileWorker(QThread):
+    """열린 로그 파일의 줄 인덱스 생성과 검색을 수행하는 스레드
+
+    LogSearchWorker와 같은 검색 시그널을 사용하므로 LogViewer의 검색 UI를 그대로 쓴다.
+    """
+    index_progress = pyqtSignal(int, float)  # (인덱싱된 줄 수, 진행률)
+    index_finished = pyqtSignal(int)
+    search_finished = pyqtSignal(int, list)
+    results_appended = pyqtSignal(int, list)  # 검색이 진행되는 동안 블록 단위 결과
+    search_failed = pyqtSignal(int, str)
+
+    def __init__(self, log_file):
+        super().__init__()
+        self.log_file = log_file
+        self._tasks = queue.Queue()
+        self._query_id = 0
+        self._stopped = False
+        self._tasks.put(('index',))
+
+    def search(self, text, regex=False, case_sensitive=False):
+        """검색 요청 후 검색 ID 반환 (이전 검색은 취소됨)"""
+        self._query_id += 1
+        self._tasks.put(('search', self._query_id, text, regex, case_sensitive))
+        return self._query_id
+
+    def cancel(self):
+        self._query_id += 1
+
+    def stop(self):
+        self._stopped = True
+        self._query_id += 1
+        self._tasks.put(None)
+
+    def run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            try:
+                if task[0] == 'index':
+                    self.log_file.build_index(self.index_progress.emit, lambda: self._stopped)
+                    if not self._stopped:
+                        self.index_finished.emit(self.log_file.line_count)
+                else:
+                    self._search(*task[1:])
+            except Exception as e:
+                print(f"로그 파일 스레드 오류: {str(e)}")
+
+    def _search(self, query_id, text, regex, case_sensitive):
+        if query_id != self._query_id:
+            return
+
+        try:
+            if regex:
+                compile_bytes_query(text, regex, case_sensitive)
+        except re.error as e:
+            self.search_failed.emit(query_id, str(e))
+            return
+
+        # 블록 단위 결과를 바로 보내서 검색 중에도 이동할 수 있게 함
+        results = []
+        for lines in self.log_file.search(text, regex, case_sensitive,
+                                          lambda: query_id != self._query_id):
+            results.extend(lines)
+            self.results_appended.emit(query_id, lines)
+        if query_id == self._query_id:
+            self.search_finished.emit(query_id, results)
@@ -0,0 +1,92 @@
+import re
+
+from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
+
+
+def make_format(foreground=None, background=None, bold=False):
+    """하이라이트용 글자 서식 생성"""
+    fmt = QTextCharFormat()
+    if foreground:
+        fmt.setForeground(QColor(foreground))
+    if background:
+        fmt.setBackground(QColor(background))
+    if bold:
+        fmt.setFontWeight(QFont.Bold)
+    return fmt
+
+
+class LogHighlighter(QSyntaxHighlighter):
+    """화면에 보이는 블록만 하이라이트하는 로그 하이라이터
+
+    여러 규칙(검색어, ERROR/WARN 키워드, 사용자 규칙)을 이름 있는 그룹으로 묶어
+    하나의 정규식으로 컴파일하고, 블록마다 한 번만 스캔한다.
+    화면 밖 블록은 상태를 -1로 남겨두었다가 보이게 될 때 서식을 적용한다.
+    """
+
+    DIRTY = -1
+
+    # 기본 키워드 규칙 (이름, 패턴, 서식)
+    DEFAULT_RULES = [
+        ('error', r'\b(?:ERROR|FAIL(?:ED)?)\b|^E \(\d+\)', make_format('#c0392b', bold=True)),
+        ('warn', r'\bWARN(?:ING)?\b|^W \(\d+\)', make_format('#d35400', bold=True)),
+    ]
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.generation = 0
+        self.visible_range = (0, -1)  # 화면에 보이는 블록 번호 범위
+        self._rules = {}  # 이름 -> (패턴, 서식), 삽입 순서가 우선순위
+        self._formats = {}
+        self._matcher = None
+        for name, pattern, fmt in self.DEFAULT_RULES:
+            self._rules[name] = (pattern, fmt)
+        self._compile()
+
+    def _compile(self):
+        """모든 규칙을 하나의 정규식으로 결합"""
+        parts = []
+        self._formats = {}
+        for index, (name, (pattern, fmt)) in enumerate(self._rules.items()):
+            group = f'r{index}'
+            parts.append(f'(?P<{group}>{pattern})')
+            self._formats[group] = fmt
+        self._matcher = re.compile('|'.join(parts), re.MULTILINE) if parts else None
+        self.generation += 1
+
+    def set_rule(self, name, pattern, fmt, first=False):
+        """규칙 추가/변경 (first=True면 가장 높은 우선순위)"""
+        re.compile(pattern)  # 잘못된 정규식은 여기서 re.error 발생
+        self._rules.pop(name, None)
+        if first:
+            self._rules = {name: (pattern, fmt), **self._rules}
+        else:
+            self._rules[name] = (pattern, fmt)
+        self._compile()
+
+    def remove_rule(self, name):
+        if self._rules.pop(name, None) is not None:
+            self._compile()
+
+    def highlightBlock(self, text):
+        first, last = self.visible_range
+        if not first <= self.currentBlock().blockNumber() <= last:
+            # 화면 밖 블록은 보이게 될 때 처리
+            self.setCurrentBlockState(self.DIRTY)
+            return
+
+        self.setCurrentBlockState(self.generation)
+        if self._matcher is None or not text:
+            return
+        for match in self._matcher.finditer(text):
+            start, end = match.span()
+            if end > start:
+                self.setFormat(start, end - start, self._formats[match.lastgroup])
+
+    def highlight_range(self, first, last):
+        """보이는 블록 범위를 갱신하고 서식이 오래된 블록만 다시 하이라이트"""
+        self.visible_range = (first, last)
+        block = self.document().findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            if block.userState() != self.generation:
+                self.rehighlightBlock(block)
+            block = block.next()
@@ -1,44 +1,193 @@
-from PyQt5.QtWidgets import (QWidget, QTextEdit, QVBoxLayout, 
-                           QPushButton, QHBoxLayout, QMessageBox, QLineEdit)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QTextCursor, QTextCharFormat, QColor, QTextDocument
+from PyQt5.QtWidgets import (QWidget, QPlainTextEdit, QVBoxLayout, 
+                           QPushButton, QHBoxLayout, QMessageBox, QLineEdit,
+                           QCheckBox, QLabel, QStackedWidget, QFileDialog)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint
+from PyQt5.QtGui import QTextCursor, QIntValidator
 import datetime
 import os
+import queue
+import time
 from PyQt5.QtWidgets import QApplication
 import re
 from PyQt5.QtWidgets import QScrollBar
+from ...serial.gui.monitor import AsyncSerialMonitor
+from ...serial.core.capture import CaptureWriter, capture_filename
+from ...utils.log_buffer import LogRingBuffer
+from ...utils.log_index import TokenIndex, SearchResults, compile_query, search_lines
+from ...utils.log_writer import LogCaptureWriter, read_snapshot, write_snapshot_manifest
+from ...utils.mapped_log import MappedLogFile
+from ...utils.metrics import metrics_registry
+from .log_file_view import LogFileView, LogFileWorker
+from .log_highlighter import LogHighlighter, make_format
 
-class SerialReaderThread(QThread):
-    data_received = pyqtSignal(str)
+# ANSI 이스케이프 코드 패턴
+ANSI_PATTERN = re.compile(r'\x1b\[\d+m')
 
-    def __init__(self, serial_port):
+# 검색어 하이라이트 서식 (노란 배경, 검은 글자)
+SEARCH_FORMAT = make_format('black', 'yellow')
+
+
+class LogSearchWorker(QThread):
+    """전체 로그 이력(메모리 + 스필 파일)을 백그라운드에서 인덱싱/검색하는 스레드"""
+    search_finished = pyqtSignal(int, list)   # (검색 ID, 결과 줄 번호 목록)
+    results_appended = pyqtSignal(int, list)  # 검색 후 새로 들어온 줄의 결과
+    search_failed = pyqtSignal(int, str)
+
+    def __init__(self, log_buffer):
         super().__init__()
-        self.serial_port = serial_port
-        self.running = True
+        self.log_buffer = log_buffer
+        self.index = TokenIndex()
+        self._tasks = queue.Queue()
+        self._query_id = 0
+        self._active = None  # (검색 ID, 컴파일된 패턴)
+
+    def add_text(self, first_line, text):
+        """새로 추가된 로그를 인덱싱 대기열에 추가"""
+        self._tasks.put(('index', first_line, text))
+
+    def search(self, text, regex=False, case_sensitive=False):
+        """검색 요청 후 검색 ID 반환 (이전 검색은 취소됨)"""
+        self._query_id += 1
+        self._tasks.put(('search', self._query_id, text, regex, case_sensitive))
+        return self._query_id
+
+    def cancel(self):
+        """진행 중인 검색 취소"""
+        self._query_id += 1
+        self._tasks.put(('cancel',))
+
+    def clear(self):
+        self._tasks.put(('clear',))
+
+    def stop(self):
+        self._query_id += 1
+        self._tasks.put(None)
 
     def run(self):
-        while self.running and self.serial_port and self.serial_port.is_open:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
             try:
-                if self.serial_port.in_waiting:
-                    data = self.serial_port.readline().decode('utf-8', errors='ignore')
-                    if data:
-                        self.data_received.emit(data)
+                kind = task[0]
+                if kind == 'index':
+                    self._index(task[1], task[2])
+                elif kind == 'search':
+                    self._search(*task[1:])
+                elif kind == 'cancel':
+                    self._active = None
+                elif kind == 'clear':
+                    self.index.clear()
+                    self._active = None
             except Exception as e:
-                print(f"Serial reading error: {str(e)}")
-                break
-            self.msleep(10)  # CPU 부하 감소
+                print(f"검색 스레드 오류: {str(e)}")
 
-    def stop(self):
-        self.running = False
+    def _index(self, first_line, text):
+        self.index.add_text(first_line, text)
+
+        # 활성 검색이 있으면 새로 들어온 줄도 바로 검색
+        if self._active is not None:
+            query_id, pattern = self._active
+            if query_id == self._query_id:
+                results = search_lines(text.split('\n'), pattern, first_line)
+                if results:
+                    self.results_appended.emit(query_id, results)
+
+    def _search(self, query_id, text, regex, case_sensitive):
+        if query_id != self._query_id:
+            return  # 새 검색 요청이 들어와 취소됨
+
+        try:
+            pattern = compile_query(text, regex, case_sensitive)
+        except re.error as e:
+            self._active = None
+            self.search_failed.emit(query_id, str(e))
+            return
+
+        # 정규식은 리터럴을 알 수 없으므로 모든 청크, 리터럴은 후보 청크만 스캔
+        if regex:
+            chunks = range(self.index.chunk_count)
+        else:
+            chunks = self.index.candidate_chunks(text)
+
+        chunk_lines = TokenIndex.CHUNK_LINES
+        results = []
+        for chunk in chunks:
+            if query_id != self._query_id:
+                return
+            start = chunk * chunk_lines
+            lines = self.log_buffer.get_lines(start, start + chunk_lines)
+            results.extend(search_lines(lines, pattern, start))
+
+        self._active = (query_id, pattern)
+        self.search_finished.emit(query_id, results)
+
+class LogExportThread(QThread):
+    """로그 파일 저장을 GUI 스레드 밖에서 수행"""
+    export_finished = pyqtSignal(bool, str)  # (성공 여부, 경로 또는 오류 메시지)
+
+    def __init__(self, filepath, export_func):
+        super().__init__()
+        self.filepath = filepath
+        self.export_func = export_func
+
+    def run(self):
+        try:
+            self.export_func(self.filepath)
+            self.export_finished.emit(True, self.filepath)
+        except Exception as e:
+            self.export_finished.emit(False, str(e))
 
 class LogViewer(QWidget):
-    def __init__(self, parent=None):
+    snapshot_saved = pyqtSignal(bool, str)  # (성공 여부, 매니페스트 경로 또는 오류 메시지)
+
+    def __init__(self, parent=None, flush_interval_ms=AsyncSerialMonitor.FLUSH_INTERVAL_MS,
+                 flush_max_bytes=AsyncSerialMonitor.FLUSH_MAX_BYTES,
+                 max_lines=LogRingBuffer.MAX_LINES, max_bytes=LogRingBuffer.MAX_BYTES,
+                 apply_max_bytes=AsyncSerialMonitor.APPLY_MAX_BYTES):
         super().__init__(parent)
         self.reader_thread = None
+        self.metrics = None  # 모니터링 중인 포트의 측정값 (PortMetrics)
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_max_bytes = flush_max_bytes
+        self.apply_max_bytes = apply_max_bytes  # 화면 갱신 한 번에 반영할 최대 크기
         self.user_scrolling = False
         self.is_paused = False
         self.scroll_timer = None
         self.log_dir = self._ensure_log_directory()
+        # 화면에는 최근 줄만 유지하고 밀려난 줄은 스필 파일로 보관
+        self.log_buffer = LogRingBuffer(max_lines, max_bytes, spill_dir=self.log_dir)
+        
+        # 디스크 스트리밍 기록 (기록 버튼으로 시작/중지)
+        self.capture_writer = None
+        self.capture_options = {
+            'max_bytes': LogCaptureWriter.MAX_BYTES,
+            'max_seconds': LogCaptureWriter.MAX_SECONDS,
+            'compression': None,
+        }
+        # 수신 바이트 원시 캡처 (수신 시각 포함, 기록 버튼과 함께 시작/중지)
+        self.raw_capture_enabled = False
+        self.raw_capture = None
+        self.export_threads = []
+        
+        # 저장된 로그 파일 열기 모드 (mmap, 읽기 전용)
+        self.log_file = None
+        self.file_worker = None
+        
+        # 전체 이력 검색 스레드
+        self.search_results = SearchResults()
+        self.search_query_id = 0
+        self.current_hit = None
+        self.search_worker = LogSearchWorker(self.log_buffer)
+        self.search_worker.search_finished.connect(self.on_search_finished)
+        self.search_worker.results_appended.connect(self.on_search_results_appended)
+        self.search_worker.search_failed.connect(self.on_search_failed)
+        self.search_worker.start()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+        self.snapshot_saved.connect(self.on_snapshot_saved)
+        
         self.initUI()
         self.setup_scroll_handling()
 
@@ -54,17 +203,27 @@ class LogViewer(QWidget):
     def initUI(self):
         layout = QVBoxLayout()
         
-        # 로그 표시 영역
-        self.log_text = QTextEdit()
+        # 로그 표시 영역 (QPlainTextEdit: 화면에 보이는 줄만 레이아웃/렌더링)
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
-        self.log_text.setLineWrapMode(QTextEdit.NoWrap)
+        self.log_text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.log_text.setUndoRedoEnabled(False)
+        
+        # 보이는 블록만 서식을 적용하는 하이라이터
+        self.highlighter = LogHighlighter(self.log_text.document())
         
         # 모노스페이스 폰트 설정
         font = self.log_text.font()
         font.setFamily("Courier")
         self.log_text.setFont(font)
         
-        layout.addWidget(self.log_text)
+        # 실시간 로그와 열린 로그 파일 화면 전환
+        self.file_view = LogFileView()
+        self.file_view.setFont(font)
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.log_text)
+        self.view_stack.addWidget(self.file_view)
+        layout.addWidget(self.view_stack)
         
         # 버튼 영역
         button_layout = QHBoxLayout()
@@ -73,7 +232,12 @@ class LogViewer(QWidget):
         save_btn = QPushButton('전체 저장')
         save_selection_btn = QPushButton('선택 저장')
         self.pause_btn = QPushButton('일시정지')
+        self.capture_btn = QPushButton('기록')
+        self.capture_btn.setCheckable(True)
+        self.capture_btn.setToolTip('수신 로그를 log 폴더에 계속 기록')
         self.auto_scroll_btn = QPushButton('자동 스크롤')
+        self.open_btn = QPushButton('파일 열기')
+        self.open_btn.setToolTip('저장된 로그 파일을 읽기 전용으로 열기')
         
         self.pause_btn.setCheckable(True)
         self.auto_scroll_btn.setCheckable(True)
@@ -83,12 +247,16 @@ class LogViewer(QWidget):
         save_btn.clicked.connect(self.save_log)
         save_selection_btn.clicked.connect(self.save_selected_log)
         self.pause_btn.clicked.connect(self.toggle_pause)
+        self.capture_btn.clicked.connect(self.toggle_capture)
+        self.open_btn.clicked.connect(self.toggle_log_file)
         
         button_layout.addWidget(clear_btn)
         button_layout.addWidget(save_btn)
         button_layout.addWidget(save_selection_btn)
         button_layout.addWidget(self.pause_btn)
         button_layout.addWidget(self.auto_scroll_btn)
+        button_layout.addWidget(self.capture_btn)
+        button_layout.addWidget(self.open_btn)
         button_layout.addStretch()
         
         layout.addLayout(button_layout)
@@ -97,7 +265,36 @@ class LogViewer(QWidget):
         self.search_layout = QHBoxLayout()
         self.spot_edit = QLineEdit()
         self.spot_edit.setPlaceholderText("Spotlight 검색")
+        self.spot_edit.returnPressed.connect(self.goto_next_result)
         self.search_layout.addWidget(self.spot_edit)
+        
+        # 검색 옵션 및 결과 이동
+        self.case_check = QCheckBox('Aa')
+        self.case_check.setToolTip('대소문자 구분')
+        self.regex_check = QCheckBox('.*')
+        self.regex_check.setToolTip('정규식')
+        prev_btn = QPushButton('▲')
+        next_btn = QPushButton('▼')
+        prev_btn.setFixedWidth(30)
+        next_btn.setFixedWidth(30)
+        self.search_status = QLabel('')
+        self.line_edit = QLineEdit()
+        self.line_edit.setPlaceholderText('줄 번호')
+        self.line_edit.setValidator(QIntValidator(1, 2**31 - 1))
+        self.line_edit.setFixedWidth(80)
+        self.line_edit.returnPressed.connect(self.goto_entered_line)
+        
+        self.case_check.toggled.connect(self.schedule_search)
+        self.regex_check.toggled.connect(self.schedule_search)
+        prev_btn.clicked.connect(self.goto_previous_result)
+        next_btn.clicked.connect(self.goto_next_result)
+        
+        self.search_layout.addWidget(self.case_check)
+        self.search_layout.addWidget(self.regex_check)
+        self.search_layout.addWidget(prev_btn)
+        self.search_layout.addWidget(next_btn)
+        self.search_layout.addWidget(self.line_edit)
+        self.search_layout.addWidget(self.search_status)
         layout.addLayout(self.search_layout)
         
         # 검색 타이머 설정 (성능 최적화)
@@ -129,6 +326,7 @@ class LogViewer(QWidget):
 
     def on_scroll_value_changed(self, value):
         """스크롤바 값이 변경될 때"""
+        self.highlight_visible()
         scrollbar = self.log_text.verticalScrollBar()
         # 맨 아래로 스크롤되면 자동 스크롤 재개
         if value == scrollbar.maximum():
@@ -139,16 +337,68 @@ class LogViewer(QWidget):
         if self.reader_thread is not None:
             self.stop_monitoring()
         
-        self.reader_thread = SerialReaderThread(serial_port)
-        self.reader_thread.data_received.connect(self.process_log)
+        # 포트는 브로커가 단독으로 읽고 모니터는 구독자로 수신 데이터를 받음
+        self.reader_thread = AsyncSerialMonitor(
+            serial_port,
+            flush_interval_ms=self.flush_interval_ms,
+            flush_max_bytes=self.flush_max_bytes
+        )
+        self.reader_thread.data_ready.connect(self.on_data_ready)
         self.reader_thread.start()
+        if self.raw_capture is not None:
+            self.reader_thread.set_capture(self.raw_capture)
+        
+        # 포트별 처리량/지연 측정값 등록 (통계 오버레이, 내보내기에서 사용)
+        port_name = getattr(serial_port, 'port', None) or 'serial'
+        self.metrics = metrics_registry().register(port_name, self.reader_thread.collect_metrics)
+
+    def set_flush_rate(self, interval_ms, max_bytes=None):
+        """리더 → 화면 갱신 주기 설정 (모니터링 중이면 즉시 적용)"""
+        self.flush_interval_ms = interval_ms
+        if max_bytes is not None:
+            self.flush_max_bytes = max_bytes
+        if self.reader_thread is not None:
+            self.reader_thread.flush_interval = interval_ms / 1000
+            self.reader_thread.flush_max_bytes = self.flush_max_bytes
+
+    def get_delivery_stats(self):
+        """전달 통계 반환 (모니터링 중이 아니면 None)"""
+        if self.reader_thread is None:
+            return None
+        return self.reader_thread.stats.as_dict()
+
+    def on_data_ready(self):
+        """리더에 쌓인 청크를 apply_max_bytes만큼 화면에 반영 (남으면 다음 이벤트 루프 차례에 이어서)"""
+        if self.reader_thread is None:
+            return
+        self._apply_chunks(self.reader_thread)
+        if self.reader_thread.queue.pending_chunks:
+            # 큐가 비어 있지 않으면 리더가 다시 알리지 않으므로 직접 예약
+            QTimer.singleShot(0, self.on_data_ready)
+
+    def _apply_chunks(self, reader):
+        text = reader.take_chunks(self.apply_max_bytes)
+        if text:
+            start = time.perf_counter()
+            if self.capture_writer is not None:
+                # 일시정지 중에도 수신한 모든 로그를 기록
+                self.capture_writer.write(ANSI_PATTERN.sub('', text))
+            self.process_log(text)
+            if self.metrics is not None:
+                self.metrics.observe('delivery_ms', reader.queue.last_wait * 1000)
+                self.metrics.observe('apply_ms', (time.perf_counter() - start) * 1000)
 
     def stop_monitoring(self):
         """시리얼 모니터링 중지"""
         if self.reader_thread is not None:
             self.reader_thread.stop()
             self.reader_thread.wait()  # 스레드가 완전히 종료될 때까지 대기
+            while self.reader_thread.queue.pending_chunks:
+                self._apply_chunks(self.reader_thread)  # 남은 청크 반영
             self.reader_thread = None
+        if self.metrics is not None:
+            metrics_registry().unregister(self.metrics)
+            self.metrics = None
 
     def process_log(self, text):
         """로그 텍스트 처리"""
@@ -161,16 +411,23 @@ class LogViewer(QWidget):
         selection_end = cursor.selectionEnd()
         
         # ANSI 이스케이프 코드 제거
-        ansi_pattern = re.compile(r'\x1b\[\d+m')
-        clean_text = ansi_pattern.sub('', text)
+        clean_text = ANSI_PATTERN.sub('', text)
         
-        # 현재 커서 위치 저장
-        current_position = cursor.position()
+        # 링 버퍼에 추가 (용량 초과분은 스필 파일로 이동) 후 검색 인덱스 갱신
+        first_line = self.log_buffer.next_line
+        evicted = self.log_buffer.append_text(clean_text)
+        self.search_worker.add_text(first_line, clean_text)
         
         # 텍스트 끝으로 이동하여 추가
         cursor.movePosition(QTextCursor.End)
         cursor.insertText(clean_text)
         
+        # 버퍼에서 밀려난 줄은 화면에서도 제거
+        if evicted:
+            removed = self._remove_top_lines(evicted)
+            selection_start = max(0, selection_start - removed)
+            selection_end = max(0, selection_end - removed)
+        
         # 선택 영역이 있었다면 복원
         if had_selection:
             cursor.setPosition(selection_start)
@@ -182,6 +439,25 @@ class LogViewer(QWidget):
         if self.auto_scroll_btn.isChecked() and not self.user_scrolling:
             scrollbar = self.log_text.verticalScrollBar()
             scrollbar.setValue(scrollbar.maximum())
+        
+        # 새로 보이게 된 블록 하이라이트 (스크롤 값이 그대로인 경우 대비)
+        self.highlight_visible()
+
+    def _remove_top_lines(self, count):
+        """문서 앞쪽 count 줄을 한 번에 제거하고 제거된 글자 수 반환"""
+        doc = self.log_text.document()
+        block = doc.findBlockByNumber(count)
+        removed = block.position() if block.isValid() else doc.characterCount() - 1
+        cursor = QTextCursor(doc)
+        cursor.setPosition(removed, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        return removed
+
+    def set_capacity(self, max_lines=None, max_bytes=None):
+        """로그 버퍼 용량 설정 (줄 수, 바이트 수)"""
+        evicted = self.log_buffer.set_capacity(max_lines, max_bytes)
+        if evicted:
+            self._remove_top_lines(evicted)
 
     def append_log(self, text):
         """로그 추가"""
@@ -190,65 +466,158 @@ class LogViewer(QWidget):
     def clear_log(self):
         """로그 지우기"""
         self.log_text.clear()
+        self.log_buffer.clear()
+        self.search_worker.clear()
+        self.search_results = SearchResults()
+        self.current_hit = None
+        self.search_status.setText('')
         self.user_scrolling = False  # 스크롤 상태 초기화
 
+    def shutdown(self):
+        """모니터링/검색/기록 스레드 종료 및 스필 파일 정리"""
+        self.stop_monitoring()
+        self.stop_capture()
+        self.close_log_file()
+        if self.search_worker is not None:
+            self.search_worker.stop()
+            self.search_worker.wait()
+            self.search_worker = None
+        self.log_buffer.close()
+
+    def set_capture_options(self, max_bytes=None, max_seconds=None, compression=None, raw=None):
+        """기록 파일 회전 크기/시간, 압축 방식(None, 'gzip', 'zstd'), 원시 캡처(.scap) 여부 설정"""
+        if raw is not None:
+            self.raw_capture_enabled = raw
+        if max_bytes is not None:
+            self.capture_options['max_bytes'] = max_bytes
+        if max_seconds is not None:
+            self.capture_options['max_seconds'] = max_seconds
+        self.capture_options['compression'] = compression
+
+    def toggle_capture(self):
+        """디스크 기록 시작/중지"""
+        if self.capture_btn.isChecked():
+            self.start_capture()
+        else:
+            self.stop_capture()
+
+    def start_capture(self):
+        """수신 로그를 log 폴더에 스트리밍 기록 시작"""
+        if self.capture_writer is not None:
+            return
+        try:
+            self.capture_writer = LogCaptureWriter(self.log_dir, **self.capture_options)
+            self.capture_writer.start()
+            if self.raw_capture_enabled:
+                self.raw_capture = CaptureWriter(capture_filename(self.log_dir))
+                if self.reader_thread is not None:
+                    self.reader_thread.set_capture(self.raw_capture)
+            self.capture_btn.setChecked(True)
+            self.capture_btn.setText('기록 중')
+        except Exception as e:
+            self.stop_capture()
+            QMessageBox.critical(self, "기록 실패", f"로그 기록을 시작할 수 없습니다: {str(e)}")
+
+    def stop_capture(self):
+        """디스크 기록 중지 (남은 데이터는 모두 기록)"""
+        if self.raw_capture is not None:
+            if self.reader_thread is not None:
+                self.reader_thread.set_capture(None)
+            self.raw_capture.close()
+            self.raw_capture = None
+        if self.capture_writer is not None:
+            self.capture_writer.close()
+            self.capture_writer = None
+        self.capture_btn.setChecked(False)
+        self.capture_btn.setText('기록')
+
+    def _start_export(self, filepath, export_func, success_message):
+        """백그라운드 저장 시작"""
+        thread = LogExportThread(filepath, export_func)
+        
+        def on_finished(success, result):
+            self.export_threads.remove(thread)
+            if success:
+                QMessageBox.information(self, "저장 완료", 
+                                      f"{success_message}\n저장 위치: {result}")
+            else:
+                QMessageBox.critical(self, "저장 실패", f"로그 저장 중 오류 발생: {result}")
+        
+        thread.export_finished.connect(on_finished)
+        self.export_threads.append(thread)
+        thread.start()
+
     def save_log(self):
         """전체 로그 저장"""
         try:
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'log_{timestamp}.txt'
-            filepath = os.path.join(self.log_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(self.log_text.toPlainText())
+            if self.capture_writer is not None:
+                # 기록 중이면 기록 파일의 현재 오프셋만 스냅샷으로 저장 (기록 스레드에서 완료)
+                filepath = os.path.join(self.log_dir, f'log_{timestamp}.snapshot.json')
+                compression = self.capture_writer.compression
+                
+                def on_snapshot(segments, error):
+                    if error is None:
+                        try:
+                            write_snapshot_manifest(filepath, segments, compression)
+                        except Exception as e:
+                            error = e
+                    if error is None:
+                        self.snapshot_saved.emit(True, filepath)
+                    else:
+                        self.snapshot_saved.emit(False, str(error))
+                
+                self.capture_writer.snapshot(on_snapshot)
+                return
             
-            QMessageBox.information(self, "저장 완료", 
-                                  f"로그가 저장되었습니다.\n저장 위치: {filepath}")
+            # 스필 파일에 있는 이전 로그까지 전체 저장 (백그라운드)
+            filepath = os.path.join(self.log_dir, f'log_{timestamp}.txt')
+            self._start_export(filepath, self.log_buffer.export, "로그가 저장되었습니다.")
         except Exception as e:
             QMessageBox.critical(self, "저장 실패", f"로그 저장 중 오류 발생: {str(e)}")
 
+    def on_snapshot_saved(self, success, result):
+        if success:
+            QMessageBox.information(self, "저장 완료", 
+                                  f"로그 스냅샷이 저장되었습니다.\n저장 위치: {result}")
+        else:
+            QMessageBox.critical(self, "저장 실패", f"로그 저장 중 오류 발생: {result}")
+
     def save_selected_log(self):
-        """선택된 부분만 저장"""
+        """선택된 부분만 저장 (위젯이 아닌 로그 버퍼에서 읽음)"""
+        if self.log_file is not None:
+            self._save_selected_file_lines()
+            return
         try:
             cursor = self.log_text.textCursor()
             if not cursor.hasSelection():
                 QMessageBox.warning(self, "선택 없음", "저장할 텍스트를 선택해주세요.")
                 return
 
-            # 선택 시작과 끝 위치 가져오기
-            start = cursor.selectionStart()
-            end = cursor.selectionEnd()
-            
-            # 새로운 커서를 만들어 선택된 텍스트를 블록 단위로 가져오기
+            # 선택 시작/끝 블록과 블록 내 위치
             doc = self.log_text.document()
-            cursor_start = QTextCursor(doc)
-            cursor_start.setPosition(start)
-            cursor_end = QTextCursor(doc)
-            cursor_end.setPosition(end)
+            start_block = doc.findBlock(cursor.selectionStart())
+            end_block = doc.findBlock(cursor.selectionEnd())
+            start_in_block = cursor.selectionStart() - start_block.position()
+            end_in_block = cursor.selectionEnd() - end_block.position()
             
-            start_block = cursor_start.blockNumber()
-            end_block = cursor_end.blockNumber()
+            # 블록 번호 → 전체 줄 번호로 변환 후 버퍼에서 줄 가져오기
+            first_line = self.log_buffer.first_line
+            start_line = first_line + start_block.blockNumber()
+            end_line = first_line + end_block.blockNumber()
+            lines = self.log_buffer.get_lines(start_line, end_line + 1)
+            if not lines:
+                QMessageBox.warning(self, "선택 없음", "저장할 텍스트를 선택해주세요.")
+                return
             
-            # 선택된 텍스트를 줄 단위로 수집
-            selected_lines = []
-            for i in range(start_block, end_block + 1):
-                block = doc.findBlockByNumber(i)
-                line = block.text()
-                
-                # 첫 번째 블록이고 부분 선택된 경우
-                if i == start_block:
-                    start_in_block = start - block.position()
-                    line = line[start_in_block:]
-                
-                # 마지막 블록이고 부분 선택된 경우
-                if i == end_block:
-                    end_in_block = end - block.position()
-                    line = line[:end_in_block]
-                
-                selected_lines.append(line)
+            # 첫 줄/마지막 줄의 부분 선택 반영
+            if len(lines) == end_line - start_line + 1:
+                lines[-1] = lines[-1][:end_in_block]
+            lines[0] = lines[0][start_in_block:]
             
             # 줄바꿈으로 연결
-            selected_text = '\n'.join(selected_lines)
+            selected_text = '\n'.join(lines)
             
             if not selected_text.strip():
                 QMessageBox.warning(self, "선택 없음", "저장할 텍스트를 선택해주세요.")
@@ -258,59 +627,284 @@ class LogViewer(QWidget):
             filename = f'log_partial_{timestamp}.txt'
             filepath = os.path.join(self.log_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(selected_text)
+            def export(path):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(selected_text)
             
-            QMessageBox.information(self, "저장 완료", 
-                                  f"선택된 로그가 저장되었습니다.\n저장 위치: {filepath}")
+            self._start_export(filepath, export, "선택된 로그가 저장되었습니다.")
         except Exception as e:
             QMessageBox.critical(self, "저장 실패", f"로그 저장 중 오류 발생: {str(e)}")
 
+    def _save_selected_file_lines(self):
+        """열린 로그 파일에서 선택된 줄 저장"""
+        lines = self.file_view.selected_lines()
+        if not lines:
+            QMessageBox.warning(self, "선택 없음", "저장할 줄을 선택해주세요.")
+            return
+        log_file = self.log_file
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        filepath = os.path.join(self.log_dir, f'log_partial_{timestamp}.txt')
+        
+        def export(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                for start in range(lines.start, lines.stop, 4096):
+                    batch = log_file.get_lines(start, min(lines.stop, start + 4096))
+                    f.write(''.join(line + '\n' for line in batch))
+        
+        self._start_export(filepath, export, "선택된 로그가 저장되었습니다.")
+
     def schedule_search(self):
         """검색 타이머 시작 (타이핑 중에는 검색하지 않음)"""
         self.search_timer.start(300)  # 300ms 후에 검색 시작
         
     def perform_search(self):
-        """실제 검색 수행"""
+        """전체 이력 검색을 백그라운드 스레드에 요청"""
         search_text = self.spot_edit.text()
+        self.search_results = SearchResults()
+        self.current_hit = None
+        worker = self._active_search_worker()
         if not search_text:
-            # 검색어가 없으면 하이라이트 제거
-            cursor = self.log_text.textCursor()
-            cursor.select(QTextCursor.Document)
-            cursor.setCharFormat(QTextCharFormat())
+            worker.cancel()
+            self.search_status.setText('')
+        else:
+            self.search_status.setText('검색 중...')
+            self.search_query_id = worker.search(
+                search_text,
+                regex=self.regex_check.isChecked(),
+                case_sensitive=self.case_check.isChecked()
+            )
+        self._update_search_highlight(search_text)
+        self.highlight_visible()
+
+    def _update_search_highlight(self, search_text):
+        """검색어 하이라이트 규칙 갱신"""
+        try:
+            pattern = compile_query(search_text, self.regex_check.isChecked(),
+                                    self.case_check.isChecked()) if search_text else None
+        except re.error:
+            pattern = None
+        self.file_view.set_search_pattern(pattern)
+        if not search_text:
+            self.highlighter.remove_rule('search')
             return
-            
+        pattern = search_text if self.regex_check.isChecked() else re.escape(search_text)
+        if not self.case_check.isChecked():
+            pattern = f'(?i:{pattern})'
         try:
-            cursor = self.log_text.textCursor()
-            format = QTextCharFormat()
-            format.setBackground(QColor("yellow"))
-            format.setForeground(QColor("black"))  # 글자색을 검은색으로 설정
-            
-            # 이전 하이라이트 제거
-            cursor.select(QTextCursor.Document)
-            cursor.setCharFormat(QTextCharFormat())
-            
-            # 최근 1000줄만 검색 (성능 최적화)
-            document = self.log_text.document()
-            block_count = document.blockCount()
-            start_block = max(0, block_count - 1000)
-            
-            finder = QTextDocument.FindFlags()
-            pos = document.findBlockByNumber(start_block).position()
-            
-            while True:
-                cursor = document.find(search_text, pos, finder)
-                if cursor.isNull():
-                    break
-                    
-                cursor.mergeCharFormat(format)
-                pos = cursor.position()
-                
-                # UI 응답성을 위해 주기적으로 이벤트 처리
-                QApplication.processEvents()
-                
+            self.highlighter.set_rule('search', pattern, SEARCH_FORMAT, first=True)
+        except re.error:
+            self.highlighter.remove_rule('search')
+
+    def _active_search_worker(self):
+        """현재 화면(실시간 로그/열린 파일)의 검색 스레드"""
+        return self.file_worker if self.log_file is not None else self.search_worker
+
+    def _is_current_query(self, query_id):
+        return (query_id == self.search_query_id and
+                self.sender() is self._active_search_worker())
+
+    def on_search_finished(self, query_id, lines):
+        if not self._is_current_query(query_id):
+            return
+        self.search_results = SearchResults(lines)
+        self._update_search_status()
+
+    def on_search_results_appended(self, query_id, lines):
+        if not self._is_current_query(query_id):
+            return
+        results = self.search_results.lines
+        # 미완성 줄이 이어지면서 같은 줄이 다시 들어올 수 있음
+        if results and lines[0] <= results[-1]:
+            lines = [line for line in lines if line > results[-1]]
+        results.extend(lines)
+        self._update_search_status()
+
+    def on_search_failed(self, query_id, message):
+        if self._is_current_query(query_id):
+            self.search_status.setText(f'정규식 오류: {message}')
+
+    def _update_search_status(self):
+        total = len(self.search_results)
+        if self.current_hit is None:
+            self.search_status.setText(f'{total}건')
+        else:
+            position = self.search_results.position(self.current_hit)
+            self.search_status.setText(f'{position}/{total}')
+
+    def _current_line(self):
+        """검색 이동 기준 줄 번호"""
+        if self.current_hit is not None:
+            return self.current_hit
+        if self.log_file is not None:
+            return self.file_view.current_line()
+        block_number = self.log_text.textCursor().blockNumber()
+        return self.log_buffer.first_line + block_number
+
+    def goto_next_result(self):
+        line_no = self.search_results.next_after(self._current_line())
+        if line_no is not None:
+            self.goto_line(line_no)
+
+    def goto_previous_result(self):
+        line_no = self.search_results.previous_before(self._current_line())
+        if line_no is not None:
+            self.goto_line(line_no)
+
+    def goto_line(self, line_no):
+        """전체 줄 번호로 이동 (스필된 줄은 상태 표시줄에 내용 표시)"""
+        self.current_hit = line_no
+        self._update_search_status()
+        
+        if self.log_file is not None:
+            self.file_view.goto_line(line_no)
+            return
+        
+        block_number = line_no - self.log_buffer.first_line
+        if block_number < 0:
+            line = self.log_buffer.get_line(line_no) or ''
+            self.search_status.setText(
+                f'{self.search_status.text()}  #{line_no + 1} (저장된 이전 로그): {line[:120]}')
+            return
+        
+        block = self.log_text.document().findBlockByNumber(block_number)
+        if not block.isValid():
+            return
+        cursor = QTextCursor(block)
+        
+        # 줄 안에서 검색어 위치 선택
+        try:
+            pattern = compile_query(self.spot_edit.text(), self.regex_check.isChecked(),
+                                    self.case_check.isChecked())
+            match = pattern.search(block.text())
+        except re.error:
+            match = None
+        if match:
+            cursor.setPosition(block.position() + match.start())
+            cursor.setPosition(block.position() + match.end(), QTextCursor.KeepAnchor)
+        
+        self.user_scrolling = True  # 자동 스크롤로 결과가 밀려나지 않도록
+        self.log_text.setTextCursor(cursor)
+        self.log_text.centerCursor()
+
+    def goto_entered_line(self):
+        """줄 번호 입력란의 줄로 이동 (1부터)"""
+        text = self.line_edit.text()
+        if text:
+            self.goto_line(int(text) - 1)
+
+    def toggle_log_file(self):
+        """로그 파일 열기 / 실시간 로그로 돌아가기"""
+        if self.log_file is not None:
+            self.close_log_file()
+            return
+        filepath, _ = QFileDialog.getOpenFileName(self, '로그 파일 열기', self.log_dir,
+                                                  'Log Files (*.txt *.log *.snapshot.json);;'
+                                                  'All Files (*)')
+        if filepath:
+            self.open_log_file(filepath)
+
+    def open_log_file(self, filepath):
+        """저장된 로그 파일을 mmap으로 열고 백그라운드에서 줄 인덱스 생성"""
+        if filepath.endswith('.snapshot.json'):
+            self._open_snapshot(filepath)
+            return
+        self.close_log_file()
+        try:
+            self.log_file = MappedLogFile(filepath)
         except Exception as e:
-            print(f"검색 중 오류 발생: {str(e)}")
+            QMessageBox.critical(self, "열기 실패", f"로그 파일을 열 수 없습니다: {str(e)}")
+            return
+        
+        self.file_view.set_file(self.log_file)
+        self.file_worker = LogFileWorker(self.log_file)
+        self.file_worker.index_progress.connect(self.on_index_progress)
+        self.file_worker.index_finished.connect(self.on_index_finished)
+        self.file_worker.search_finished.connect(self.on_search_finished)
+        self.file_worker.results_appended.connect(self.on_search_results_appended)
+        self.file_worker.search_failed.connect(self.on_search_failed)
+        self.file_worker.start()
+        
+        self.view_stack.setCurrentWidget(self.file_view)
+        self.open_btn.setText('실시간 로그')
+        self.open_btn.setToolTip(filepath)
+        self.perform_search()
+
+    def _open_snapshot(self, manifest_path):
+        """스냅샷 범위의 기록 파일 내용을 .log 파일로 풀어낸 뒤 열기 (백그라운드)"""
+        def extract(filepath):
+            with open(filepath, 'wb') as f:
+                for data in read_snapshot(manifest_path):
+                    f.write(data)
+        
+        filepath = manifest_path[:-len('.json')] + '.log'
+        thread = LogExportThread(filepath, extract)
+        
+        def on_finished(success, result):
+            self.export_threads.remove(thread)
+            if success:
+                self.open_log_file(result)
+            else:
+                QMessageBox.critical(self, "열기 실패", f"로그 스냅샷을 열 수 없습니다: {result}")
+        
+        thread.export_finished.connect(on_finished)
+        self.export_threads.append(thread)
+        thread.start()
+
+    def close_log_file(self):
+        """열린 로그 파일을 닫고 실시간 로그 화면으로 전환"""
+        if self.log_file is None:
+            return
+        for thread in list(self.export_threads):
+            thread.wait()  # 선택 저장이 파일을 읽는 중일 수 있음
+        self.file_worker.stop()
+        self.file_worker.wait()
+        self.file_worker = None
+        self.file_view.set_file(None)
+        self.log_file.close()
+        self.log_file = None
+        
+        self.view_stack.setCurrentWidget(self.log_text)
+        self.open_btn.setText('파일 열기')
+        self.open_btn.setToolTip('저장된 로그 파일을 읽기 전용으로 열기')
+        if self.search_worker is not None:
+            self.perform_search()
+
+    def on_index_progress(self, line_count, fraction):
+        if self.sender() is not self.file_worker:
+            return
+        self.file_view.set_line_count(line_count)
+        self.search_status.setText(f'인덱싱 중... {fraction * 100:.0f}%')
+
+    def on_index_finished(self, line_count):
+        if self.sender() is not self.file_worker:
+            return
+        self.file_view.set_line_count(line_count)
+        if self.spot_edit.text():
+            self.search_status.setText('검색 중...')
+        else:
+            self.search_status.setText(f'{line_count:,}줄')
+
+    def highlight_visible(self):
+        """화면에 보이는 블록만 하이라이트"""
+        viewport = self.log_text.viewport()
+        first = self.log_text.cursorForPosition(QPoint(0, 0)).blockNumber()
+        last = self.log_text.cursorForPosition(QPoint(0, viewport.height() - 1)).blockNumber()
+        self.highlighter.highlight_range(first, last)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.highlight_visible()
+
+    def add_highlight_rule(self, name, pattern, color, case_sensitive=True):
+        """사용자 하이라이트 규칙 추가"""
+        if not case_sensitive:
+            pattern = f'(?i:{pattern})'
+        self.highlighter.set_rule(f'user:{name}', pattern, make_format(background=color))
+        self.highlight_visible()
+
+    def remove_highlight_rule(self, name):
+        self.highlighter.remove_rule(f'user:{name}')
+        self.highlight_visible()
 
     def toggle_pause(self):
         """로그 업데이트 일시정지/재개"""
@@ -0,0 +1,127 @@
+from PyQt5.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+import datetime
+import os
+
+from ...utils.metrics import (MetricsServer, RateTracker, append_json_line,
+                              metrics_registry)
+
+class MetricsOverlay(QFrame):
+    """포트별 처리량/큐/지연을 보여주는 작은 통계 창 (JSON Lines 기록, HTTP 내보내기 포함)"""
+
+    REFRESH_MS = 1000
+    HTTP_PORT = 9464
+
+    def __init__(self, log_dir, parent=None):
+        super().__init__(parent)
+        self.log_dir = log_dir
+        self.registry = metrics_registry()
+        self.rates = RateTracker()
+        self.server = None
+        self.json_path = None
+        self.initUI()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def initUI(self):
+        self.setStyleSheet("""
+            MetricsOverlay {
+                background-color: rgba(30, 30, 30, 210);
+                border-radius: 5px;
+            }
+            QLabel, QCheckBox {
+                color: white;
+            }
+        """)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+
+        self.text_label = QLabel("측정값 없음")
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        self.text_label.setFont(font)
+        layout.addWidget(self.text_label)
+
+        option_layout = QHBoxLayout()
+        self.json_check = QCheckBox("JSON 기록")
+        self.json_check.toggled.connect(self.toggle_json)
+        self.http_check = QCheckBox(f"HTTP :{self.HTTP_PORT}")
+        self.http_check.toggled.connect(self.toggle_http)
+        option_layout.addWidget(self.json_check)
+        option_layout.addWidget(self.http_check)
+        option_layout.addStretch()
+        layout.addLayout(option_layout)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # JSON 기록/HTTP 내보내기 중이면 숨겨도 계속 수집
+        if not self.json_check.isChecked():
+            self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """측정값 갱신 (JSON 기록 중이면 파일에도 추가)"""
+        snapshot = self.registry.snapshot()
+        rates = self.rates.rates(snapshot)
+        if self.json_path is not None:
+            try:
+                append_json_line(self.json_path, snapshot)
+            except OSError as e:
+                print(f"통계 기록 실패: {str(e)}")
+                self.json_check.setChecked(False)
+        if not self.isVisible():
+            return
+
+        rows = []
+        for port in snapshot['ports']:
+            values = port['values']
+            rate = rates.get(port['port'], {})
+            delivery = port['histograms']['delivery_ms']
+            apply = port['histograms']['apply_ms']
+            rows.append(
+                f"{port['port']:<14} {rate.get('bytes_read', 0) / 1024:8.1f} KiB/s "
+                f"{rate.get('lines', 0):8.0f} lines/s  큐 {values.get('queue_chunks', 0):>3}  "
+                f"버림 {values.get('dropped', 0)}/{values.get('overflow_bytes', 0)}B  "
+                f"전달 p99 {delivery['p99']:.1f}ms  반영 p99 {apply['p99']:.1f}ms")
+        if self.server is not None:
+            rows.append(self.server.url)
+        self.text_label.setText('\n'.join(rows) or "측정값 없음")
+        self.adjustSize()
+
+    def toggle_json(self, checked):
+        """측정값을 log/metrics_*.jsonl 에 주기적으로 기록"""
+        if checked:
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.json_path = os.path.join(self.log_dir, f'metrics_{timestamp}.jsonl')
+            self.timer.start()
+        else:
+            self.json_path = None
+            if not self.isVisible():
+                self.timer.stop()
+
+    def toggle_http(self, checked):
+        """localhost HTTP 내보내기 시작/중지 (/metrics, /metrics.json)"""
+        if checked and self.server is None:
+            try:
+                self.server = MetricsServer(self.registry, self.HTTP_PORT)
+            except OSError as e:
+                print(f"통계 서버 시작 실패: {str(e)}")
+                self.http_check.setChecked(False)
+        elif not checked and self.server is not None:
+            self.server.stop()
+            self.server = None
+        self.refresh()
+
+    def shutdown(self):
+        self.timer.stop()
+        self.json_path = None
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
@@ -1,8 +1,47 @@
 from PyQt5.QtWidgets import (QWidget, QComboBox, QPushButton, 
                            QHBoxLayout, QLabel)
-from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QThread, pyqtSignal
 import serial.tools.list_ports
 
+from ...models.serial_settings import PortCache, SerialSettings
+from ...serial.core.baud import BAUD_RATES, DETECT_ORDER, detect_baudrate
+from ...serial.core.broker import port_broker
+from ...serial.core.replay import active_replay_ports
+from ...utils.port_utils import port_identity
+
+class BaudDetectThread(QThread):
+    """포트를 열고 수신 로그로 보레이트 감지 (저장된 보레이트가 있으면 그 값부터 확인)
+
+    저장된 값이 맞으면(GOOD_SCORE 이상) 후보 하나만 받아 보고 끝나고, 장치의
+    보레이트가 바뀌어 깨진 로그가 들어오면 나머지 후보로 다시 감지한다.
+    """
+    port_opened = pyqtSignal(object, object)  # (serial.Serial, 감지한 보레이트 또는 None)
+    open_failed = pyqtSignal(str)
+
+    def __init__(self, port, cached=None):
+        super().__init__()
+        self.port = port
+        self.cached = cached
+
+    def run(self):
+        try:
+            serial_port = serial.Serial(port=self.port,
+                                        baudrate=self.cached or SerialSettings.BAUD_RATE, timeout=1)
+        except Exception as e:
+            self.open_failed.emit(str(e))
+            return
+        candidates = DETECT_ORDER
+        if self.cached:
+            candidates = (self.cached,) + tuple(rate for rate in DETECT_ORDER if rate != self.cached)
+        try:
+            detected = detect_baudrate(serial_port, candidates)
+        except Exception as e:
+            serial_port.close()
+            self.open_failed.emit(str(e))
+            return
+        self.port_opened.emit(serial_port, detected)
+
+
 class SerialPortSelector(QWidget):
     port_connected = pyqtSignal(bool)  # 연결 상태 변경 시그널
     
@@ -10,7 +49,9 @@ class SerialPortSelector(QWidget):
         super().__init__(parent)
         self.is_connected = False
         self.serial_port = None
-        self.baud_rate = 115200  # 고정 보레이트
+        self.baud_rate = SerialSettings.BAUD_RATE  # 현재(마지막) 연결 보레이트
+        self.port_cache = PortCache()
+        self.detect_thread = None
         self.initUI()
 
     def initUI(self):
@@ -24,11 +65,20 @@ class SerialPortSelector(QWidget):
         # 포트 선택 콤보박스
         self.port_combo = QComboBox()
         self.port_combo.setMinimumWidth(150)
+        # 목록에 없는 포트(재생용 pty 등)는 경로를 직접 입력
+        self.port_combo.setEditable(True)
         layout.addWidget(self.port_combo)
         
-        # 보레이트 표시 레이블
-        baud_label = QLabel(f'{self.baud_rate} bps')
-        layout.addWidget(baud_label)
+        # 보레이트 선택 ('자동'은 수신 로그로 감지, 감지 결과는 USB 시리얼 번호별로 저장)
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItem(SerialSettings.AUTO_BAUD)
+        self.baud_combo.addItems([str(rate) for rate in BAUD_RATES])
+        self.baud_combo.setCurrentText(str(self.baud_rate))
+        layout.addWidget(self.baud_combo)
+        
+        # 연결된 보레이트 표시 레이블
+        self.baud_label = QLabel('bps')
+        layout.addWidget(self.baud_label)
         
         # 새로고침 버튼
         refresh_btn = QPushButton('새로고침')
@@ -81,58 +131,36 @@ class SerialPortSelector(QWidget):
         self.port_combo.clear()
         
         ports = [port.device for port in serial.tools.list_ports.comports()]
+        ports += active_replay_ports()
         self.port_combo.addItems(ports)
         
-        # 이전 선택 포트가 있으면 복원
-        if current in ports:
+        # 이전 선택(또는 입력) 포트 복원
+        if current:
             self.port_combo.setCurrentText(current)
             
         # 포트가 없으면 연결 버튼 비활성화
-        self.connect_btn.setEnabled(len(ports) > 0)
+        self.connect_btn.setEnabled(len(ports) > 0 or bool(current))
 
     def toggle_connection(self):
         """연결/해제 토글"""
         if not self.is_connected:
+            port = self.port_combo.currentText()
+            if not port or self.detect_thread is not None:
+                return
+            if self.baud_combo.currentText() == SerialSettings.AUTO_BAUD:
+                self.start_detection(port)
+                return
             try:
-                port = self.port_combo.currentText()
-                if not port:
-                    return
-                
-                # 시리얼 포트 연결
-                self.serial_port = serial.Serial(
-                    port=port,
-                    baudrate=self.baud_rate,
-                    timeout=1
-                )
-                
-                self.is_connected = True
-                self.connect_btn.setText('해제')
-                self.connect_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #c0392b;
-                        color: white;
-                        border: none;
-                        border-radius: 5px;
-                        padding: 5px;
-                    }
-                    QPushButton:hover {
-                        background-color: #e74c3c;
-                    }
-                """)
-                
-                # UI 상태 업데이트
-                self.port_combo.setEnabled(False)
-                self.port_connected.emit(True)
-                
+                serial_port = serial.Serial(port=port, baudrate=int(self.baud_combo.currentText()),
+                                            timeout=1)
             except Exception as e:
-                print(f"연결 실패: {str(e)}")
-                self.is_connected = False
-                self.serial_port = None
-                self.port_connected.emit(False)
+                self.on_open_failed(str(e))
+                return
+            self.on_port_opened(serial_port)
         else:
-            # 연결 해제
+            # 연결 해제 (브로커의 읽기를 멈춘 뒤 포트 닫기)
             if self.serial_port:
-                self.serial_port.close()
+                port_broker().close(self.serial_port)
             
             self.is_connected = False
             self.serial_port = None
@@ -152,8 +180,73 @@ class SerialPortSelector(QWidget):
             
             # UI 상태 업데이트
             self.port_combo.setEnabled(True)
+            self.baud_combo.setEnabled(True)
+            self.baud_label.setText('bps')
             self.port_connected.emit(False)
 
+    def start_detection(self, port):
+        """'자동' 보레이트로 연결 (감지는 작업 스레드에서, 끝나면 on_port_opened)"""
+        key = port_identity(port)
+        cached = self.port_cache.get_baudrate(key)
+        self.detect_thread = BaudDetectThread(port, cached)
+        self.detect_thread.port_opened.connect(
+            lambda serial_port, detected: self.on_baud_detected(key, cached, serial_port, detected))
+        self.detect_thread.open_failed.connect(self.on_open_failed)
+        self.detect_thread.finished.connect(self.on_detect_finished)
+        self.port_combo.setEnabled(False)
+        self.baud_combo.setEnabled(False)
+        self.connect_btn.setEnabled(False)
+        self.baud_label.setText('감지 중...')
+        self.detect_thread.start()
+
+    def on_baud_detected(self, key, cached, serial_port, detected):
+        """감지 결과 저장 (저장된 값과 다를 때만) 후 연결 완료"""
+        if detected:
+            if detected != cached:
+                self.port_cache.set_baudrate(key, detected)
+        else:
+            print(f"보레이트 감지 실패 (수신 없음 또는 판별 불가), {serial_port.baudrate} bps로 연결")
+        self.on_port_opened(serial_port)
+
+    def on_detect_finished(self):
+        self.detect_thread = None
+        self.connect_btn.setEnabled(True)
+
+    def on_open_failed(self, message):
+        print(f"연결 실패: {message}")
+        self.is_connected = False
+        self.serial_port = None
+        self.port_combo.setEnabled(True)
+        self.baud_combo.setEnabled(True)
+        self.baud_label.setText('bps')
+        self.port_connected.emit(False)
+
+    def on_port_opened(self, serial_port):
+        """열린 포트로 연결 상태 전환"""
+        self.serial_port = serial_port
+        self.baud_rate = self.serial_port.baudrate
+        self.baud_label.setText(f'{self.baud_rate} bps')
+        
+        self.is_connected = True
+        self.connect_btn.setText('해제')
+        self.connect_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #c0392b;
+                color: white;
+                border: none;
+                border-radius: 5px;
+                padding: 5px;
+            }
+            QPushButton:hover {
+                background-color: #e74c3c;
+            }
+        """)
+        
+        # UI 상태 업데이트
+        self.port_combo.setEnabled(False)
+        self.baud_combo.setEnabled(False)
+        self.port_connected.emit(True)
+
     def get_serial_port(self):
         """현재 연결된 시리얼 포트 객체 반환"""
         return self.serial_port
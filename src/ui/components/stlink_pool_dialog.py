@@ -0,0 +1,150 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                           QSpinBox, QTableWidget, QTableWidgetItem, QHeaderView,
+                           QProgressBar, QMessageBox)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+import time
+
+from ...controllers.stm_controller import STLinkPoolThread
+from ...controllers.stlink_pool import STMResult, enumerate_stlinks
+from ..styles.button_styles import ButtonStyles
+
+class STLinkPoolDialog(QDialog):
+    """여러 ST-Link로 STM32 펌웨어를 동시에 다운로드하는 창"""
+
+    COLUMNS = ["Board", "ST-Link", "Status", "Progress", "Attempts", "Time (s)", "Message"]
+    STATUS_COLORS = {STMResult.DONE: '#27ae60', STMResult.FAILED: '#c0392b',
+                     STMResult.FLASHING: '#2980b9'}
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("STM32 Multi ST-Link Download")
+        self.resize(760, 480)
+        self.settings = settings
+        self.probes = []
+        self.download_thread = None
+        self._rows = {}  # 보드 이름 -> 표 행 번호
+        self._start_time = 0.0
+        self.initUI()
+        self.scan_probes()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        # 프로브 검색 / 보드 수 / 재시도
+        option_layout = QHBoxLayout()
+        self.probe_label = QLabel("ST-Link: -")
+        option_layout.addWidget(self.probe_label)
+        scan_btn = QPushButton('Scan Probes')
+        scan_btn.setStyleSheet(ButtonStyles.DEFAULT_STYLE)
+        scan_btn.clicked.connect(self.scan_probes)
+        option_layout.addWidget(scan_btn)
+        option_layout.addStretch()
+
+        option_layout.addWidget(QLabel('Boards:'))
+        self.boards_spin = QSpinBox()
+        self.boards_spin.setRange(1, 999)
+        option_layout.addWidget(self.boards_spin)
+
+        option_layout.addWidget(QLabel('Retries:'))
+        self.retries_spin = QSpinBox()
+        self.retries_spin.setRange(0, 5)
+        self.retries_spin.setValue(1)
+        option_layout.addWidget(self.retries_spin)
+        layout.addLayout(option_layout)
+
+        # 보드별 결과 표
+        self.result_table = QTableWidget(0, len(self.COLUMNS))
+        self.result_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.result_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.result_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.result_table)
+
+        self.summary_label = QLabel("Ready")
+        self.summary_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.summary_label)
+
+        self.start_btn = QPushButton("Download with All ST-Links")
+        self.start_btn.setStyleSheet(ButtonStyles.DOWNLOAD_STYLE)
+        self.start_btn.clicked.connect(self.start_download)
+        layout.addWidget(self.start_btn)
+
+    def scan_probes(self):
+        """연결된 ST-Link 검색 (보드 수 기본값 = 프로브 수)"""
+        self.probes = enumerate_stlinks()
+        serials = ", ".join(probe.serial for probe in self.probes)
+        self.probe_label.setText(f"ST-Link: {len(self.probes)} ({serials})" if self.probes
+                                 else "ST-Link: not found")
+        self.boards_spin.setValue(max(1, len(self.probes)))
+
+    def start_download(self):
+        """보드 대기열을 만들고 다운로드 시작"""
+        if self.download_thread is not None and self.download_thread.isRunning():
+            QMessageBox.warning(self, "Warning", "Download is in progress.")
+            return
+        if not self.settings.firmware_path:
+            QMessageBox.warning(self, "Warning", "Please select firmware file first")
+            return
+        if not self.probes:
+            QMessageBox.warning(self, "Warning", "No ST-Link probe found.")
+            return
+
+        boards = [f"Board {number}" for number in range(1, self.boards_spin.value() + 1)]
+        self._fill_table(boards)
+        self._start_time = time.monotonic()
+        self.start_btn.setEnabled(False)
+        self.summary_label.setText(f"Downloading {len(boards)} boards with {len(self.probes)} ST-Links...")
+
+        self.download_thread = STLinkPoolThread(self.probes, self.settings.firmware_path, boards,
+                                                self.retries_spin.value(), self.settings.flash_start,
+                                                self.settings.differential, self.settings.sparse)
+        self.download_thread.board_updated.connect(self._update_row)
+        self.download_thread.pool_completed.connect(self._on_completed)
+        self.download_thread.start()
+
+    def _fill_table(self, boards):
+        self.result_table.setRowCount(len(boards))
+        self._rows = {}
+        for row, board in enumerate(boards):
+            self._rows[board] = row
+            progress_bar = QProgressBar()
+            progress_bar.setAlignment(Qt.AlignCenter)
+            self.result_table.setCellWidget(row, 3, progress_bar)
+            self._update_row(STMResult(board))
+
+    def _update_row(self, result):
+        row = self._rows.get(result.board)
+        if row is None:
+            return
+        self.result_table.cellWidget(row, 3).setValue(result.progress)
+        elapsed = f"{result.elapsed:.1f}" if result.elapsed else ""
+        for column, value in [(0, result.board), (1, result.probe), (2, result.status),
+                              (4, str(result.attempts)), (5, elapsed), (6, result.message)]:
+            item = QTableWidgetItem(value)
+            color = self.STATUS_COLORS.get(result.status)
+            if column == 2 and color:
+                item.setForeground(QColor(color))
+            self.result_table.setItem(row, column, item)
+
+    def _on_completed(self, results):
+        self.start_btn.setEnabled(True)
+        for result in results:
+            self._update_row(result)
+        succeeded = sum(1 for result in results if result.ok)
+        elapsed = time.monotonic() - self._start_time
+        saved = sum(result.saved for result in results)
+        self.summary_label.setText(
+            f"Completed: {succeeded} succeeded / {len(results) - succeeded} failed "
+            f"in {elapsed:.1f} s (OpenOCD reuse saved {saved:.1f} s)")
+
+    def closeEvent(self, event):
+        if self.download_thread is not None and self.download_thread.isRunning():
+            reply = QMessageBox.question(self, "Stop", "Stop the running downloads?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                event.ignore()
+                return
+            self.download_thread.stop()
+            self.download_thread.wait()
+        super().closeEvent(event)
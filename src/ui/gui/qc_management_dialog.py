@@ -8,7 +8,10 @@ from PyQt5.QtCore import Qt
 import hashlib
 import binascii
 from ..components.download_panel import DownloadPanel
-import time
+from ..components.batch_provision_panel import BatchProvisionPanel
+from ...models.serial_settings import SerialSettings
+from ...serial.core.protocol import command_engine, parse_fields
+from ...serial.gui.command import CommandRequest
 
 class HeaderManager:
     def __init__(self):
@@ -119,9 +122,16 @@ class HeaderManager:
         return header
 
 class QCManagementDialog(QDialog):
+    RESPONSE_TIMEOUT = 2.0   # 장치 응답 대기 시간(초)
+    DEVICE_PROFILE = "qc"    # 전송 속도 프로필 이름 (측정 전에는 기본 프로필 사용)
+    READ_MODEL_COMMAND = "db r model"
+    READ_MODEL_END = "serial_number ="  # 모델 정보 응답의 마지막 줄
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.header_manager = HeaderManager()
+        self._command_request = None  # 진행 중인 장치 명령
+        self.serial_settings = SerialSettings()
         self.setWindowTitle('Quality Control Management')
         self.setFixedSize(800, 650)
         # 항상 최상위에 표시
@@ -137,16 +147,19 @@ class QCManagementDialog(QDialog):
         self.header_tab = QWidget()
         self.device_tab = QWidget()
         self.download_tab = QWidget()
+        self.batch_tab = QWidget()
         
         # 각 탭 설정
         self._setup_header_tab()
         self._setup_device_tab()
         self._setup_download_tab()
+        self._setup_batch_tab()
         
         # 탭 추가
         self.tab_widget.addTab(self.header_tab, "Header")
         self.tab_widget.addTab(self.device_tab, "Device")
         self.tab_widget.addTab(self.download_tab, "Download")
+        self.tab_widget.addTab(self.batch_tab, "Batch")
         
         layout.addWidget(self.tab_widget)
         self.setLayout(layout)
@@ -371,10 +384,14 @@ class QCManagementDialog(QDialog):
         write_btn = QPushButton("정보 쓰기")
         read_btn.clicked.connect(self.read_model_info)
         write_btn.clicked.connect(self.write_model_info)
+        calibrate_btn = QPushButton("전송 속도 측정")
+        calibrate_btn.setToolTip("장치가 명령을 놓치지 않는 가장 빠른 전송 간격을 측정해 저장합니다.")
+        calibrate_btn.clicked.connect(self.calibrate_pacing)
         
         btn_layout = QHBoxLayout()
         btn_layout.addWidget(read_btn)
         btn_layout.addWidget(write_btn)
+        btn_layout.addWidget(calibrate_btn)
         info_layout.addLayout(btn_layout, 2, 1)
         
         info_group.setLayout(info_layout)
@@ -434,6 +451,14 @@ class QCManagementDialog(QDialog):
         # 여백 추가
         layout.addStretch()
 
+    def _setup_batch_tab(self):
+        """Batch 탭 설정 (여러 보드 동시 정보 쓰기)"""
+        layout = QVBoxLayout(self.batch_tab)
+        
+        model_list = [self.model_combo.itemText(i) for i in range(self.model_combo.count())]
+        self.batch_panel = BatchProvisionPanel(model_list, self.DEVICE_PROFILE)
+        layout.addWidget(self.batch_panel)
+
     def update_port_status(self):
         """포트 연결 상태 업데이트"""
         # QCWindow의 포트 상태 확인
@@ -460,44 +485,45 @@ class QCManagementDialog(QDialog):
         if not self._check_selected_port_connected():
             return
 
-        try:
-            # 선택된 포트의 SerialPort 객체 가져오기
-            serial_port = self._get_selected_serial_port()
-            if not serial_port:
-                return
+        self._run_commands([(self.READ_MODEL_COMMAND, self.READ_MODEL_END)],
+                           self._on_model_info_read, "모델 정보 읽기 실패")
 
-            # 명령어 전송
-            command = "db r model\r\n"
-            serial_port.write(command.encode())
+    def _on_model_info_read(self, responses):
+        """응답 파싱 후 UI 업데이트"""
+        fields = parse_fields(responses[-1].lines)
+        self.model_name_input.setText(fields.get('model_name', ''))
+        self.serial_number_input.setText(fields.get('serial_number', ''))
 
-            # 응답 읽기
-            response = ""
-            while True:
-                if serial_port.in_waiting:
-                    line = serial_port.readline().decode('utf-8', errors='ignore')
-                    response += line
-                    
-                    # 응답이 완료되었는지 확인
-                    if "serial_number =" in line:
-                        break
+    def _run_commands(self, commands, on_finished, error_title):
+        """장치 명령을 응답 대기 없이 연달아 보내고 완료 시 on_finished(응답 목록) 호출
 
-            # 응답 파싱
-            model_name = ""
-            serial_number = ""
-            
-            for line in response.split('\n'):
-                line = line.strip()
-                if "model_name" in line:
-                    model_name = line.split('=')[1].strip()
-                elif "serial_number" in line:
-                    serial_number = line.split('=')[1].strip()
+        commands에 함수를 주면 명령 엔진을 인자로 호출해 받은 Future 하나를 기다린다.
+        UI를 막지 않고 백그라운드에서 응답을 기다린다.
+        """
+        if self._command_request is not None and self._command_request.running:
+            QMessageBox.warning(self, "경고", "이전 명령을 처리 중입니다.")
+            return
 
-            # UI 업데이트
-            self.model_name_input.setText(model_name)
-            self.serial_number_input.setText(serial_number)
+        # 선택된 포트의 SerialPort 객체 가져오기
+        serial_port = self._get_selected_serial_port()
+        if not serial_port:
+            return
 
+        try:
+            engine = command_engine(serial_port, timeout=self.RESPONSE_TIMEOUT)
+            engine.profile = self.serial_settings.get_profile(self.DEVICE_PROFILE)
+            if callable(commands):
+                futures = [commands(engine)]
+            else:
+                futures = engine.send_many(commands)
+            request = CommandRequest(futures, self)
         except Exception as e:
-            QMessageBox.critical(self, "오류", f"모델 정보 읽기 실패: {str(e)}")
+            QMessageBox.critical(self, "오류", f"{error_title}: {str(e)}")
+            return
+        request.finished.connect(on_finished)
+        request.failed.connect(
+            lambda message: QMessageBox.critical(self, "오류", f"{error_title}: {message}"))
+        self._command_request = request
 
     def _get_selected_serial_port(self):
         """선택된 포트의 SerialPort 객체 반환"""
@@ -525,17 +551,6 @@ class QCManagementDialog(QDialog):
                     formatted += line + '\n'
         return formatted.strip()
 
-    def _write_serial_with_delay(self, serial_port, command, char_delay=0.001):
-        """글자 단위로 딜레이를 주면서 시리얼 데이터 전송"""
-        try:
-            for char in command:
-                serial_port.write(char.encode('utf-8'))
-                serial_port.flush()
-                time.sleep(char_delay)  # 각 글자 사이에 1ms 딜레이
-        except Exception as e:
-            print(f"시리얼 전송 오류: {str(e)}")
-            raise e
-
     def write_model_info(self):
         """일반 모델 정보 쓰기"""
         if not self._check_selected_port_connected():
@@ -550,20 +565,48 @@ class QCManagementDialog(QDialog):
                 QMessageBox.warning(self, "경고", "모델명과 시리얼 번호를 모두 입력해주세요.")
                 return
 
-            command = f"db w model 1 {model_name} {serial_number}\r\n"
-            print(f"전송 명령어: [{command.strip()}]")
-            
-            serial_port = self._get_selected_serial_port()
-            self._write_serial_with_delay(serial_port, command)
-            
-            time.sleep(0.1)
-            
-            QMessageBox.information(self, "성공", "모델 정보가 성공적으로 저장되었습니다.")
-            self.read_model_info()
+            self._write_model(model_name, serial_number)
 
         except Exception as e:
             QMessageBox.critical(self, "오류", f"모델 정보 저장 중 오류가 발생했습니다: {str(e)}")
 
+    def _write_model(self, model_name, serial_number):
+        """모델 정보 쓰기 후 다시 읽어 확인 (쓰기/읽기 명령을 한 번에 전송)"""
+        command = f"db w model 1 {model_name} {serial_number}"
+        print(f"전송 명령어: [{command}]")
+
+        def verify(responses):
+            self._on_model_info_read(responses)
+            fields = parse_fields(responses[-1].lines)
+            if (fields.get('model_name') == model_name and
+                    fields.get('serial_number') == serial_number):
+                QMessageBox.information(self, "성공", "모델 정보가 성공적으로 저장되었습니다.")
+            else:
+                QMessageBox.critical(self, "오류", "저장 후 읽은 모델 정보가 일치하지 않습니다.")
+
+        self._run_commands([(command, None), (self.READ_MODEL_COMMAND, self.READ_MODEL_END)],
+                           verify, "모델 정보 저장 중 오류가 발생했습니다")
+
+    def calibrate_pacing(self):
+        """모델 정보 읽기 명령으로 전송 속도 프로필 측정 후 저장"""
+        if not self._check_selected_port_connected():
+            return
+
+        def on_finished(results):
+            profile = results[0]
+            if profile is None:
+                QMessageBox.warning(self, "경고", "장치 응답이 없어 전송 속도를 측정하지 못했습니다.")
+                return
+            self.serial_settings.save_profile(profile)
+            QMessageBox.information(
+                self, "측정 완료",
+                f"청크 {profile.chunk_size} 바이트, 간격 {profile.chunk_gap * 1000:g} ms로 저장했습니다.")
+
+        self._run_commands(
+            lambda engine: engine.calibrate(self.READ_MODEL_COMMAND, self.READ_MODEL_END,
+                                            self.DEVICE_PROFILE),
+            on_finished, "전송 속도 측정 실패")
+
     def _check_selected_port_connected(self):
         """선택된 포트의 연결 상태 확인"""
         if self.port1_radio.isChecked():
@@ -594,16 +637,7 @@ class QCManagementDialog(QDialog):
             serial_number = serial_number.zfill(6)
             full_serial = f"{serial_prefix}{serial_number}"
 
-            command = f"db w model 1 {model_name} {full_serial}\r\n"
-            print(f"전송 명령어: [{command.strip()}]")
-            
-            serial_port = self._get_selected_serial_port()
-            self._write_serial_with_delay(serial_port, command)
-            
-            time.sleep(0.1)
-            
-            QMessageBox.information(self, "성공", "모델 정보가 성공적으로 저장되었습니다.")
-            self.read_model_info()
+            self._write_model(model_name, full_serial)
 
         except Exception as e:
             QMessageBox.critical(self, "오류", f"모델 정보 저장 중 오류가 발생했습니다: {str(e)}")
@@ -618,6 +652,11 @@ class QCManagementDialog(QDialog):
         self.tab_widget.setCurrentIndex(1)  # Device 탭의 인덱스는 1
         self.show()
 
+    def show_batch_tab(self):
+        """Batch 탭으로 전환"""
+        self.tab_widget.setCurrentIndex(3)  # Batch 탭의 인덱스는 3
+        self.show()
+
     def show_download_tab(self):
         """Download 탭으로 전환"""
         self.tab_widget.setCurrentIndex(2)  # Download 탭의 인덱스는 2
@@ -7,6 +7,7 @@ from ..components.log_viewer import LogViewer
 from ..components.cli_interface import CLIInterface
 from ..components.header_editor import HeaderEditor
 from ..components.device_info_panel import DeviceInfoPanel
+from ..components.metrics_overlay import MetricsOverlay
 from .qc_management_dialog import QCManagementDialog  # 새로 만들 관리 팝업
 
 class QCWindow(QMainWindow):
@@ -25,6 +26,7 @@ class QCWindow(QMainWindow):
         self.cli_interface = None
         self.header_editor = None
         self.device_info = None
+        self.stats_overlay = None
         
         self.initUI()
         
@@ -73,9 +75,11 @@ class QCWindow(QMainWindow):
         self.header_button = QPushButton("Header 정보")
         device_btn = QPushButton('Device 정보')
         download_btn = QPushButton('Download')
+        self.stats_button = QPushButton('통계')
+        self.stats_button.setCheckable(True)
         
         # 버튼 스타일 설정
-        for btn in [self.header_button, device_btn, download_btn]:
+        for btn in [self.header_button, device_btn, download_btn, self.stats_button]:
             btn.setFixedSize(150, 40)
             btn.setStyleSheet("""
                 QPushButton {
@@ -88,21 +92,30 @@ class QCWindow(QMainWindow):
                 QPushButton:hover {
                     background-color: #3498db;
                 }
+                QPushButton:checked {
+                    background-color: #1c5980;
+                }
             """)
         
         # 버튼 이벤트 연결
         self.header_button.clicked.connect(self.show_header_management)
         device_btn.clicked.connect(self.show_device_management)
         download_btn.clicked.connect(self.show_download_management)
+        self.stats_button.toggled.connect(self.toggle_stats_overlay)
         
         button_layout.addStretch()
         button_layout.addWidget(self.header_button)
         button_layout.addWidget(device_btn)
         button_layout.addWidget(download_btn)
+        button_layout.addWidget(self.stats_button)
         button_layout.addStretch()
         
         main_layout.addLayout(button_layout)
 
+        # 포트별 처리량/지연 통계 (모니터 영역 오른쪽 위에 겹쳐 표시)
+        self.stats_overlay = MetricsOverlay(self.left_log_viewer.log_dir, main_widget)
+        self.stats_overlay.hide()
+
         # 시리얼 포트 연결 시그널 연결
         self.left_port_selector.port_connected.connect(self.on_left_port_connection_changed)
         self.right_port_selector.port_connected.connect(self.on_right_port_connection_changed)
@@ -125,6 +138,23 @@ class QCWindow(QMainWindow):
             self.management_dialog = QCManagementDialog(self)
         self.management_dialog.show_download_tab()
 
+    def toggle_stats_overlay(self, checked):
+        """통계 오버레이 표시/숨김"""
+        self.stats_overlay.setVisible(checked)
+        if checked:
+            self.stats_overlay.raise_()
+            self._place_stats_overlay()
+
+    def _place_stats_overlay(self):
+        parent = self.stats_overlay.parentWidget()
+        self.stats_overlay.adjustSize()
+        self.stats_overlay.move(max(0, parent.width() - self.stats_overlay.width() - 20), 40)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.stats_overlay is not None and self.stats_overlay.isVisible():
+            self._place_stats_overlay()
+
     def on_left_port_connection_changed(self, connected):
         if connected:
             serial_port = self.left_port_selector.get_serial_port()
@@ -147,4 +177,5 @@ class QCWindow(QMainWindow):
         """창이 닫힐 때 다이얼로그도 함께 닫기"""
         if self.management_dialog is not None:
             self.management_dialog.close()
+        self.stats_overlay.shutdown()
         super().closeEvent(event)
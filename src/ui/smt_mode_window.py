@@ -1,14 +1,12 @@
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QPushButton, QWidget, 
-                           QProgressBar, QLabel, QHBoxLayout, QMessageBox,
-                           QApplication)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QMetaObject, Q_ARG
-from ..controllers.esp_controller import DownloadThread as ESPDownloadThread
+                           QProgressBar, QLabel, QHBoxLayout, QMessageBox)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from ..controllers.esp_flasher import FlashCancelled, error_message, flash_esp
+from ..controllers.openocd_session import TargetNotConnected, openocd_session
 from ..models.esp_settings import ESPSettings
 from ..models.stm_settings import STMSettings
+import threading
 import time
-import sys
-import subprocess
-import os
 
 class SMTModeWindow(QMainWindow):
     def __init__(self, esp_settings=None, stm_settings=None, mode="AC", parent=None):
@@ -90,6 +88,17 @@ class SMTModeWindow(QMainWindow):
         stm_layout.addWidget(self.stm_progress)
         progress_layout.addLayout(stm_layout)
         
+        if self.mode == "AC":
+            # 전체 진행률 (ESP32/STM32 동시 다운로드)
+            total_layout = QHBoxLayout()
+            total_label = QLabel("Total:")
+            total_label.setFixedWidth(80)
+            self.total_progress = QProgressBar()
+            self.total_progress.setTextVisible(True)
+            total_layout.addWidget(total_label)
+            total_layout.addWidget(self.total_progress)
+            progress_layout.addLayout(total_layout)
+        
         main_layout.addLayout(progress_layout)
         
         # 하단 여백
@@ -98,10 +107,11 @@ class SMTModeWindow(QMainWindow):
         # 초기 상태 설정
         if self.mode == "AC":
             self.esp_progress.setValue(0)
+            self.total_progress.setValue(0)
         self.stm_progress.setValue(0)
     
     def start_download_sequence(self):
-        """ESP32와 STM32 다운로드 순차 실행"""
+        """다운로드 실행 (AC: ESP32/STM32 동시, DC: STM32)"""
         if self.download_in_progress:
             return
             
@@ -111,18 +121,20 @@ class SMTModeWindow(QMainWindow):
         
         if self.mode == "AC":
             self.esp_progress.setValue(0)
+            self.total_progress.setValue(0)
         self.stm_progress.setValue(0)
         
         if self.mode == "AC":
-            # AC 모드: ESP32 + STM32 다운로드
-            self.sequence_thread = SequentialDownloadThread(
+            # AC 모드: ESP32 + STM32 동시 다운로드
+            self.sequence_thread = SMTDownloadThread(
                 self.esp_settings,
                 self.stm_settings
             )
             self.sequence_thread.esp_progress_signal.connect(self.update_esp_progress)
+            self.sequence_thread.total_progress_signal.connect(self.total_progress.setValue)
         else:
             # DC 모드: STM32만 다운로드
-            self.sequence_thread = SequentialDownloadThread(
+            self.sequence_thread = SMTDownloadThread(
                 None,  # ESP 설정 없음
                 self.stm_settings
             )
@@ -139,17 +151,14 @@ class SMTModeWindow(QMainWindow):
         """ESP32 진행률 업데이트 (AC 모드에서만)"""
         if self.mode == "AC":
             self.esp_progress.setValue(value)
-            QApplication.processEvents()
     
     def update_stm_progress(self, value):
         """STM32 진행률 업데이트"""
         self.stm_progress.setValue(value)
-        QApplication.processEvents()
     
     def update_status(self, status):
         """상태 메시지 업데이트"""
         self.status_label.setText(status)
-        QApplication.processEvents()
     
     def on_sequence_completed(self, success):
         self.download_in_progress = False
@@ -160,10 +169,16 @@ class SMTModeWindow(QMainWindow):
         else:
             QMessageBox.critical(self, "Error", "다운로드 실패")
 
-class SequentialDownloadThread(QThread):
+class SMTDownloadThread(QThread):
+    """SMT 다운로드 (AC: ESP32/STM32 동시, DC: STM32만)
+
+    ESP32는 UART, STM32는 SWD로 서로 다른 인터페이스를 쓰므로 AC 모드에서는
+    두 칩을 동시에 다운로드하고, 한쪽이 실패하면 다른 쪽도 바로 중단한다.
+    """
     # 시그널 정의
     esp_progress_signal = pyqtSignal(int)
     stm_progress_signal = pyqtSignal(int)
+    total_progress_signal = pyqtSignal(int)
     status_signal = pyqtSignal(str)
     completed_signal = pyqtSignal(bool)
     
@@ -173,86 +188,112 @@ class SequentialDownloadThread(QThread):
         self.stm_settings = stm_settings
         self.esp_success = False
         self.stm_success = False
+        self._esp_progress = 0
+        self._stm_progress = 0
+        self._failed = threading.Event()  # 한쪽이 실패하면 설정 (다른 쪽 중단)
+        self._stm_session = None  # 다운로드 중인 OpenOCD 세션 (실패 시 abort)
+        self._error = None  # 먼저 실패한 쪽의 메시지
+        self._lock = threading.Lock()
         
     def run(self):
-        try:
-            if self.esp_settings:  # AC 모드
-                # 1. ESP32 다운로드 실행
-                self.status_signal.emit("Downloading ESP32 firmware...")
-                
-                # ESP32 다운로드 스레드 생성
-                esp_thread = ESPDownloadThread(self.esp_settings)
-                esp_thread.progress_updated.connect(self.esp_progress_signal.emit)
-                esp_thread.status_updated.connect(self.status_signal.emit)
-                
-                # 다운로드 시작
-                esp_thread.start()
-                
-                # 완료 대기
-                while esp_thread.isRunning():
-                    for _ in range(10):
-                        QThread.msleep(10)
-                        QApplication.processEvents()
-                
-                # ESP32 다운로드 결과 확인
-                if hasattr(esp_thread, 'process') and esp_thread.process:
-                    self.esp_success = esp_thread.process.returncode == 0
-                else:
-                    self.esp_success = False
-                
-                if not self.esp_success:
-                    self.status_signal.emit("ESP32 download failed!")
-                    self.completed_signal.emit(False)
-                    return
-                
-                # 잠시 대기
-                self.status_signal.emit("ESP32 download completed. Preparing STM32 download...")
-                QThread.sleep(2)
-            
-            # 2. STM32 다운로드 실행 (AC/DC 모드 모두)
+        start = time.monotonic()
+        esp_thread = None
+        if self.esp_settings:  # AC 모드
+            self.status_signal.emit("Downloading ESP32 + STM32 firmware...")
+            esp_thread = threading.Thread(target=self.download_esp32, name="smt-esp32", daemon=True)
+            esp_thread.start()
+        else:
             self.status_signal.emit("Downloading STM32 firmware...")
-            self.stm_success = self.download_stm32()
-            
-            # 최종 결과
-            if self.esp_settings:  # AC 모드
-                success = self.esp_success and self.stm_success
-            else:  # DC 모드
-                success = self.stm_success
-            
-            if success:
-                self.status_signal.emit("Download sequence completed successfully!")
-            else:
-                self.status_signal.emit("Download sequence failed!")
-            
-            self.completed_signal.emit(success)
-                
+        
+        # STM32는 이 스레드에서 실행
+        self.stm_success = self.download_stm32()
+        if esp_thread is not None:
+            esp_thread.join()
+        
+        # 최종 결과
+        if self.esp_settings:  # AC 모드
+            success = self.esp_success and self.stm_success
+        else:  # DC 모드
+            success = self.stm_success
+        
+        elapsed = time.monotonic() - start
+        if success:
+            self.status_signal.emit(f"Download completed successfully! ({elapsed:.1f} s)")
+        else:
+            self.status_signal.emit(self._error or "Download failed")
+        self.completed_signal.emit(success)
+
+    def _update_total(self):
+        if self.esp_settings:
+            self.total_progress_signal.emit((self._esp_progress + self._stm_progress) // 2)
+        else:
+            self.total_progress_signal.emit(self._stm_progress)
+
+    def _fail(self, message):
+        """실패 알림 후 다른 쪽 다운로드 중단"""
+        self.status_signal.emit(message)
+        with self._lock:
+            if self._error is None:
+                self._error = message
+            session = self._stm_session
+        self._failed.set()
+        if session is not None:
+            session.abort()
+    
+    def download_esp32(self):
+        """ESP32 다운로드 실행 (작업 스레드, esptool 프로세스 내 호출)"""
+        def on_progress(value):
+            self._esp_progress = value
+            self.esp_progress_signal.emit(value)
+            self._update_total()
+        
+        try:
+            flash_esp(self.esp_settings.port, self.esp_settings.flash_images(),
+                      baud=self.esp_settings.flash_baud(),
+                      flash_mode=self.esp_settings.FLASH_MODE,
+                      flash_freq=self.esp_settings.FLASH_FREQ,
+                      flash_size=self.esp_settings.FLASH_SIZE,
+                      on_progress=on_progress,
+                      cancel_event=self._failed,
+                      differential=self.esp_settings.differential)
+            self.esp_success = True
+            on_progress(100)
+        except FlashCancelled:
+            self.esp_success = False
         except Exception as e:
-            self.status_signal.emit(f"Error: {str(e)}")
-            self.completed_signal.emit(False)
+            self.esp_success = False
+            self._fail(f"ESP32 download failed: {error_message(e)}")
     
     def download_stm32(self):
-        """STM32 다운로드 실행"""
-        try:
-            from ..controllers.stm_controller import STMController
-            
-            # STM 컨트롤러 생성
-            stm_controller = STMController()
-            stm_controller.settings = self.stm_settings
-            
-            # 진행률 업데이트 콜백
-            def update_progress(value, status):
-                self.stm_progress_signal.emit(value)
+        """STM32 다운로드 실행 (떠 있는 OpenOCD 서버를 보드가 바뀌어도 재사용)"""
+        def on_progress(value, status):
+            # flash()가 시작하면서 abort 표시를 지우므로 진행 중에도 실패 여부 확인
+            if self._failed.is_set():
+                session.abort()
+            self._stm_progress = value
+            self.stm_progress_signal.emit(value)
+            self._update_total()
+            if not self.esp_settings:
                 self.status_signal.emit(status)
-                QApplication.processEvents()  # 이벤트 처리 허용
-            
-            # 다운로드 실행
-            success, message = stm_controller.download(update_progress)
-            
-            if not success:
-                self.status_signal.emit(f"STM32 download failed: {message}")
-            
-            return success
-            
-        except Exception as e:
-            self.status_signal.emit(f"STM32 download error: {str(e)}")
+        
+        if self._failed.is_set():
             return False
+        try:
+            session = openocd_session()
+            with self._lock:
+                self._stm_session = session
+            session.flash(self.stm_settings.firmware_path, self.stm_settings.flash_start,
+                          on_progress, self.stm_settings.differential,
+                          self.stm_settings.sparse)
+            success, message = True, "Download completed successfully"
+        except TargetNotConnected:
+            success, message = False, "Target not connected"
+        except Exception as e:
+            success, message = False, str(e)
+        finally:
+            with self._lock:
+                self._stm_session = None
+        
+        if not success and not self._failed.is_set():
+            self._fail(f"STM32 download failed: {message.splitlines()[-1]}")
+        return success
@@ -1,12 +1,14 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QPushButton, QLabel, 
                            QFileDialog, QProgressBar, QVBoxLayout, 
                            QHBoxLayout, QGridLayout, QMessageBox, QFrame,
-                           QApplication)
-from PyQt5.QtCore import Qt, QTimer
+                           QApplication, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer, QFileSystemWatcher
 import os
 from src.controllers.stm_controller import STMController
+from src.models.firmware_catalog import firmware_catalog
 from src.ui.styles.button_styles import ButtonStyles
 from src.ui.components.esp_component import ESPDownloadComponent
+from src.ui.components.stlink_pool_dialog import STLinkPoolDialog
 from src.ui.smt_mode_window import SMTModeWindow
 import logging
 import shutil
@@ -23,6 +25,7 @@ class STMDownloadWindow(QMainWindow):
         self.progress_bar = None
         self.status_label = None
         self.mode_toggle = None
+        self.pool_dialog = None
         
         # 로거 설정
         self.logger = logging.getLogger(__name__)
@@ -132,13 +135,19 @@ class STMDownloadWindow(QMainWindow):
         # 기본 파일 로드 상태 업데이트
         self.update_firmware_label()
         
-        # 타이머 설정 (주기적으로 버튼 상태 업데이트)
+        # 펌웨어 디렉터리가 바뀔 때만 카탈로그 다시 훑기 (매초 파일 존재 확인 대신)
+        self.firmware_watcher = QFileSystemWatcher(self)
+        self.firmware_watcher.directoryChanged.connect(self.on_firmware_changed)
+        self.firmware_watcher.fileChanged.connect(self.on_firmware_changed)
+        self._watch_firmware()
+
+        # 타이머 설정 (주기적으로 버튼 상태 업데이트, ESP 포트 선택 반영)
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_smt_button_state)
         self.timer.start(1000)  # 1초마다 업데이트
         
         # 윈도우 크기 설정
-        self.setFixedSize(600, 600)
+        self.setFixedSize(600, 740)
 
     def _setup_file_selection(self, layout):
         file_section = QHBoxLayout()
@@ -197,12 +206,25 @@ class STMDownloadWindow(QMainWindow):
         self.progress_bar.setTextVisible(True)
         download_group.addWidget(self.progress_bar)
         
+        # 차등 플래시 (플래시 내용과 다른 섹터만 쓰기)
+        self.differential_checkbox = QCheckBox('Skip unchanged sectors')
+        self.differential_checkbox.setChecked(self.stm_controller.settings.differential)
+        self.differential_checkbox.toggled.connect(
+            lambda checked: setattr(self.stm_controller.settings, 'differential', checked))
+        download_group.addWidget(self.differential_checkbox)
+        
         # 다운로드 버튼
         self.download_btn = QPushButton("Download STM32 Firmware")
         self.download_btn.setStyleSheet(ButtonStyles.DOWNLOAD_STYLE)
         self.download_btn.clicked.connect(self.start_download)
         download_group.addWidget(self.download_btn)
         
+        # 여러 ST-Link 동시 다운로드
+        pool_btn = QPushButton("Multi ST-Link Download")
+        pool_btn.setStyleSheet(ButtonStyles.DEFAULT_STYLE)
+        pool_btn.clicked.connect(self.show_pool_download)
+        download_group.addWidget(pool_btn)
+        
         layout.addLayout(download_group)
 
     def select_file(self):
@@ -251,6 +273,13 @@ class STMDownloadWindow(QMainWindow):
         else:
             QMessageBox.critical(self, "Error", message)
 
+    def show_pool_download(self):
+        """연결된 ST-Link 여러 개로 동시 다운로드하는 창 열기"""
+        if self.pool_dialog is None:
+            self.pool_dialog = STLinkPoolDialog(self.stm_controller.settings, self)
+        self.pool_dialog.show()
+        self.pool_dialog.raise_()
+
     def validate_download(self):
         if not self.stm_controller.settings.firmware_path:
             QMessageBox.warning(self, "Warning", "Please select a firmware file first.")
@@ -268,9 +297,10 @@ class STMDownloadWindow(QMainWindow):
             self.esp_component.esp_controller.settings.port
         ])
         
-        # AC/DC 모드별 펌웨어 파일 존재 여부 확인
-        ac_firmware_exists = self.stm_controller.settings.ac_firmware.exists()
-        dc_firmware_exists = self.stm_controller.settings.dc_firmware.exists()
+        # AC/DC 모드별 펌웨어 파일 존재 여부 확인 (카탈로그 색인 조회, 파일 시스템 접근 없음)
+        catalog = firmware_catalog()
+        ac_firmware_exists = catalog.exists(self.stm_controller.settings.ac_firmware)
+        dc_firmware_exists = catalog.exists(self.stm_controller.settings.dc_firmware)
         
         # AC 모드는 ESP와 STM 모두 준비되어야 하고, AC 펌웨어가 존재해야 함
         self.smt_ac_mode_btn.setEnabled(esp_ready and ac_firmware_exists)
@@ -278,6 +308,25 @@ class STMDownloadWindow(QMainWindow):
         # DC 모드는 DC 펌웨어가 존재해야 함
         self.smt_dc_mode_btn.setEnabled(dc_firmware_exists)
 
+    def _watch_firmware(self):
+        """카탈로그의 펌웨어 디렉터리/파일을 감시 대상에 추가 (새로 생긴 history 폴더 포함)"""
+        catalog = firmware_catalog()
+        paths = catalog.directories() + catalog.files()
+        watched = set(self.firmware_watcher.directories() + self.firmware_watcher.files())
+        new_paths = [path for path in paths if path not in watched]
+        if new_paths:
+            self.firmware_watcher.addPaths(new_paths)
+
+    def on_firmware_changed(self, path):
+        """펌웨어 파일이 추가/교체/삭제되면 바뀐 파일만 다시 색인하고 버튼/라벨 갱신
+
+        색인은 작업 스레드에서 하고, 버튼 상태는 그동안 실제 파일로 확인한다.
+        """
+        firmware_catalog().refresh_async()
+        self._watch_firmware()
+        self.update_smt_button_state()
+        self.update_firmware_label()
+
     def open_smt_ac_mode(self):
         """SMT AC 모드 창 열기"""
         try:
@@ -318,6 +367,9 @@ class STMDownloadWindow(QMainWindow):
         """펌웨어 라벨 업데이트"""
         if self.stm_controller.settings.firmware_path:
             filename = os.path.basename(self.stm_controller.settings.firmware_path)
+            image = self.stm_controller.firmware_image()
+            if image is not None and image.sparse:
+                filename += f" ({image.occupied // 1024} KB code / {image.size // 1024} KB)"
             self.firmware_label.setText(f"Selected: {filename}")
         else:
             self.firmware_label.setText("No file selected")
@@ -0,0 +1,244 @@
+import tempfile
+import threading
+from array import array
+from collections import deque
+from itertools import islice
+
+
+class SpillFile:
+    """링 버퍼에서 밀려난 줄을 저장하는 append-only 임시 파일
+
+    모든 줄의 오프셋을 들고 있으면 메모리가 계속 늘어나므로
+    INDEX_STRIDE 줄마다 한 번씩만 오프셋을 기록한다.
+    """
+
+    INDEX_STRIDE = 1024
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.line_count = 0
+        self.size = 0
+        self._file = None
+        self._offsets = array('Q')  # INDEX_STRIDE 줄 단위 시작 오프셋
+
+    def _open(self):
+        # 닫히면 자동 삭제되는 임시 파일
+        self._file = tempfile.TemporaryFile(mode='w+b', dir=self.directory,
+                                            prefix='spill_', suffix='.log')
+
+    def append(self, lines):
+        """줄 목록을 파일 끝에 추가"""
+        if not lines:
+            return
+        if self._file is None:
+            self._open()
+
+        self._file.seek(0, 2)
+        encoded = []
+        for line in lines:
+            if self.line_count % self.INDEX_STRIDE == 0:
+                # 인덱스 기록 전에 지금까지 모은 줄을 쓰고 오프셋 확정
+                if encoded:
+                    data = b''.join(encoded)
+                    self._file.write(data)
+                    self.size += len(data)
+                    encoded = []
+                self._offsets.append(self.size)
+            encoded.append(line.encode('utf-8') + b'\n')
+            self.line_count += 1
+        data = b''.join(encoded)
+        self._file.write(data)
+        self.size += len(data)
+
+    def iter_lines(self, start=0, end=None):
+        """start 번째 줄부터 end 번째 줄 전까지 순서대로 반환"""
+        if end is None or end > self.line_count:
+            end = self.line_count
+        if self._file is None or start >= end:
+            return
+
+        self._file.flush()
+        block = start // self.INDEX_STRIDE
+        self._file.seek(self._offsets[block])
+        line_no = block * self.INDEX_STRIDE
+        for raw in self._file:
+            if line_no >= end:
+                break
+            if line_no >= start:
+                yield raw[:-1].decode('utf-8', errors='ignore')
+            line_no += 1
+
+    def get_line(self, line_no):
+        for line in self.iter_lines(line_no, line_no + 1):
+            return line
+        return None
+
+    def copy_to(self, out_file):
+        """스필된 전체 내용을 바이너리 파일 객체로 복사"""
+        if self._file is None:
+            return
+        self._file.flush()
+        self._file.seek(0)
+        while True:
+            data = self._file.read(1024 * 1024)
+            if not data:
+                break
+            out_file.write(data)
+
+    def clear(self):
+        self.close()
+        self.line_count = 0
+        self.size = 0
+        self._offsets = array('Q')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LogRingBuffer:
+    """줄 수/바이트 수 제한이 있는 로그 링 버퍼
+
+    용량을 넘어 밀려난 줄은 SpillFile로 옮겨 전체 이력을 검색/저장할 수 있게 한다.
+    줄 번호는 세션 시작부터의 전체 줄 번호(0부터)를 사용한다.
+    GUI 스레드에서 추가하고 검색 스레드에서 읽을 수 있도록 내부 잠금을 사용한다.
+    """
+
+    MAX_LINES = 200000
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_lines=MAX_LINES, max_bytes=MAX_BYTES, spill_dir=None):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.spill = SpillFile(spill_dir)
+        self._lines = deque()
+        self._sizes = deque()
+        self.byte_count = 0
+        self._open_line = False  # 마지막 줄이 줄바꿈 없이 끝났는지 여부
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _line_size(line):
+        return len(line) if line.isascii() else len(line.encode('utf-8'))
+
+    @property
+    def first_line(self):
+        """메모리 버퍼 첫 줄의 전체 줄 번호 (= 스필된 줄 수)"""
+        return self.spill.line_count
+
+    @property
+    def total_lines(self):
+        return self.spill.line_count + len(self._lines)
+
+    @property
+    def next_line(self):
+        """다음에 추가될 텍스트가 시작되는 줄 번호 (미완성 줄이면 그 줄)"""
+        return self.total_lines - 1 if self._open_line else self.total_lines
+
+    def __len__(self):
+        return len(self._lines)
+
+    def append_text(self, text):
+        """텍스트를 줄 단위로 추가하고 메모리에서 밀려난 줄 수 반환"""
+        if not text:
+            return 0
+        with self._lock:
+            return self._append_text(text)
+
+    def _append_text(self, text):
+        parts = text.split('\n')
+        if self._open_line and self._lines:
+            # 줄바꿈 없이 끝났던 마지막 줄에 이어 붙이기
+            head = parts.pop(0)
+            self._lines[-1] += head
+            size = self._line_size(head)
+            self._sizes[-1] += size
+            self.byte_count += size
+
+        # 마지막 조각이 비어 있으면 텍스트가 줄바꿈으로 끝난 것
+        tail = parts.pop()
+        if tail:
+            parts.append(tail)
+        self._open_line = bool(tail)
+
+        for line in parts:
+            size = self._line_size(line)
+            self._lines.append(line)
+            self._sizes.append(size)
+            self.byte_count += size
+
+        return self._evict()
+
+    def _evict(self):
+        """용량 초과분을 스필 파일로 이동"""
+        evicted = []
+        while self._lines and (len(self._lines) > self.max_lines or
+                               self.byte_count > self.max_bytes):
+            evicted.append(self._lines.popleft())
+            self.byte_count -= self._sizes.popleft()
+        if not self._lines:
+            self._open_line = False
+        self.spill.append(evicted)
+        return len(evicted)
+
+    def set_capacity(self, max_lines=None, max_bytes=None):
+        """용량 변경 후 밀려난 줄 수 반환"""
+        with self._lock:
+            if max_lines is not None:
+                self.max_lines = max_lines
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            return self._evict()
+
+    def get_line(self, line_no):
+        """전체 줄 번호로 줄 조회 (메모리 또는 스필 파일)"""
+        with self._lock:
+            if line_no < self.first_line:
+                return self.spill.get_line(line_no)
+            index = line_no - self.first_line
+            if 0 <= index < len(self._lines):
+                return self._lines[index]
+            return None
+
+    def get_lines(self, start, end):
+        """전체 줄 번호 [start, end) 범위의 줄 목록 반환"""
+        with self._lock:
+            if end > self.total_lines:
+                end = self.total_lines
+            first = self.first_line
+            lines = []
+            if start < first:
+                lines.extend(self.spill.iter_lines(start, min(end, first)))
+            lines.extend(islice(self._lines, max(start, first) - first, max(0, end - first)))
+            return lines
+
+    def iter_lines(self, start=0, end=None, batch=4096):
+        """전체 줄 번호 범위의 줄을 순서대로 반환 (batch 단위로 잠금)"""
+        if end is None:
+            end = self.total_lines
+        while start < end:
+            lines = self.get_lines(start, min(end, start + batch))
+            if not lines:
+                break
+            yield from lines
+            start += len(lines)
+
+    def export(self, path):
+        """스필 파일 + 메모리 버퍼 전체를 파일로 저장"""
+        with self._lock, open(path, 'wb') as f:
+            self.spill.copy_to(f)
+            for line in self._lines:
+                f.write(line.encode('utf-8') + b'\n')
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
+            self._sizes.clear()
+            self.byte_count = 0
+            self._open_line = False
+            self.spill.clear()
+
+    def close(self):
+        with self._lock:
+            self.spill.close()
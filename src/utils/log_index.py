@@ -0,0 +1,123 @@
+import re
+from bisect import bisect_left, bisect_right
+
+
+class TokenIndex:
+    """줄 청크 단위 토큰 인덱스 (줄이 들어올 때마다 증분 갱신)
+
+    CHUNK_LINES 줄마다 하나의 청크를 만들고, 청크에 등장한 공백 단위 토큰(소문자)을
+    모아둔다. 검색어를 공백으로 나눈 각 조각은 반드시 어떤 토큰의 부분 문자열이어야
+    하므로, 모든 조각이 토큰 목록에 들어 있는 청크만 실제로 스캔한다.
+    """
+
+    CHUNK_LINES = 4096
+
+    def __init__(self):
+        self._vocabs = []         # 완료된 청크의 토큰 목록 ('\n'으로 연결한 문자열)
+        self._open_chunk = 0      # 현재 채우는 중인 청크 번호
+        self._open_tokens = set()  # 현재 청크의 토큰
+        self._tail = ''           # 줄바꿈 없이 끝난 직전 텍스트의 마지막 토큰
+
+    @property
+    def chunk_count(self):
+        return self._open_chunk + 1
+
+    def _seal(self):
+        """현재 청크의 토큰을 하나의 문자열로 고정"""
+        self._vocabs.append('\n'.join(self._open_tokens))
+        self._open_tokens = set()
+        self._open_chunk += 1
+
+    def add_text(self, first_line, text):
+        """first_line 번째 줄부터 시작하는 텍스트를 인덱스에 추가"""
+        if not text:
+            return
+        text = self._tail + text.lower()
+        # 다음 텍스트에 이어지는 토큰은 다음 번에 합쳐서 다시 인덱싱
+        self._tail = '' if text[-1].isspace() else text.rsplit(None, 1)[-1]
+
+        lines = text.split('\n')
+        line_no = first_line
+        index = 0
+        while index < len(lines):
+            chunk = line_no // self.CHUNK_LINES
+            while chunk > self._open_chunk:
+                self._seal()
+            take = min(len(lines) - index, (chunk + 1) * self.CHUNK_LINES - line_no)
+            self._open_tokens.update(' '.join(lines[index:index + take]).split())
+            index += take
+            line_no += take
+
+    def candidate_chunks(self, literal):
+        """literal(소문자 비교)을 포함할 수 있는 청크 번호 목록"""
+        pieces = literal.lower().split()
+        if not pieces:
+            return list(range(self.chunk_count))
+
+        chunks = [chunk for chunk, vocab in enumerate(self._vocabs)
+                  if all(piece in vocab for piece in pieces)]
+        open_vocab = '\n'.join(self._open_tokens)
+        if all(piece in open_vocab for piece in pieces):
+            chunks.append(self._open_chunk)
+        return chunks
+
+    def clear(self):
+        self._vocabs = []
+        self._open_chunk = 0
+        self._open_tokens = set()
+        self._tail = ''
+
+
+def compile_query(text, regex=False, case_sensitive=False):
+    """검색 옵션에 맞는 정규식 컴파일"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    pattern = text if regex else re.escape(text)
+    return re.compile(pattern, flags)
+
+
+def search_lines(lines, pattern, first_line):
+    """줄 목록에서 패턴이 포함된 줄 번호 목록 반환"""
+    text = '\n'.join(lines)
+    results = []
+    line_no = first_line
+    last_pos = 0
+    last_hit = -1
+    for match in pattern.finditer(text):
+        start = match.start()
+        line_no += text.count('\n', last_pos, start)
+        last_pos = start
+        if line_no != last_hit:
+            results.append(line_no)
+            last_hit = line_no
+    return results
+
+
+class SearchResults:
+    """정렬된 검색 결과 줄 번호와 이전/다음 탐색"""
+
+    def __init__(self, lines=None):
+        self.lines = lines or []
+
+    def __len__(self):
+        return len(self.lines)
+
+    def next_after(self, line_no):
+        """line_no 다음 결과 (끝이면 처음으로 순환)"""
+        if not self.lines:
+            return None
+        index = bisect_right(self.lines, line_no)
+        return self.lines[index % len(self.lines)]
+
+    def previous_before(self, line_no):
+        """line_no 이전 결과 (처음이면 끝으로 순환)"""
+        if not self.lines:
+            return None
+        index = bisect_left(self.lines, line_no) - 1
+        return self.lines[index]
+
+    def position(self, line_no):
+        """결과 목록에서 line_no의 순번 (1부터, 없으면 0)"""
+        index = bisect_left(self.lines, line_no)
+        if index < len(self.lines) and self.lines[index] == line_no:
+            return index + 1
+        return 0
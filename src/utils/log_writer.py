@@ -0,0 +1,276 @@
+import datetime
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd 압축은 선택 사항
+    zstandard = None
+
+
+class _Segment:
+    """회전 단위 로그 파일 하나 (선택적으로 압축)"""
+
+    def __init__(self, path, compression):
+        self.path = path
+        self.compression = compression
+        self.length = 0  # 압축 전 바이트 수
+        self.created = time.monotonic()
+        self._raw = open(path, 'ab')
+        if compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='ab')
+        elif compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._stream = self._raw
+
+    def write(self, data):
+        self._stream.write(data)
+        self.length += len(data)
+
+    def sync(self):
+        """압축기 버퍼까지 비우고 디스크에 기록"""
+        if self.compression == 'gzip':
+            self._stream.flush(zlib.Z_SYNC_FLUSH)
+        elif self.compression == 'zstd':
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def close(self):
+        # 압축 스트림 마무리 (원본 파일은 닫지 않음)
+        if self.compression == 'gzip':
+            self._stream.close()
+        elif self.compression == 'zstd':
+            self._stream.flush(zstandard.FLUSH_FRAME)
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+
+
+class LogCaptureWriter(threading.Thread):
+    """수신 로그를 백그라운드에서 파일에 스트리밍 기록하는 스레드
+
+    - fsync는 FSYNC_INTERVAL 초 또는 FSYNC_BYTES 마다 한 번씩 묶어서 수행
+    - 크기(max_bytes) 또는 시간(max_seconds) 기준으로 파일 회전
+    - compression: None, 'gzip', 'zstd'(zstandard 패키지 필요)
+    - 디스크가 따라오지 못해 대기 중인 텍스트가 max_pending_bytes를 넘으면 새 텍스트를
+      버리고 dropped/dropped_bytes로 세며, 파일에는 누락 표시 줄을 남긴다
+    """
+
+    FSYNC_INTERVAL = 1.0
+    FSYNC_BYTES = 1024 * 1024
+    MAX_BYTES = 64 * 1024 * 1024
+    MAX_SECONDS = 60 * 60
+    MAX_PENDING_BYTES = 16 * 1024 * 1024  # 기록 대기 최대 크기 (문자 수로 셈)
+
+    EXTENSIONS = {None: '.log', 'gzip': '.log.gz', 'zstd': '.log.zst'}
+
+    def __init__(self, directory, prefix='capture', max_bytes=MAX_BYTES,
+                 max_seconds=MAX_SECONDS, compression=None,
+                 max_pending_bytes=MAX_PENDING_BYTES):
+        super().__init__(daemon=True)
+        if compression not in self.EXTENSIONS:
+            raise ValueError(f"지원하지 않는 압축 방식: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise RuntimeError("zstd 압축을 사용하려면 zstandard 패키지를 설치해주세요: "
+                               "pip install zstandard")
+
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compression = compression
+        self.max_pending_bytes = max_pending_bytes
+        self.segments = []  # 완료된 세그먼트 (path, length)
+        self.error = None
+        self.dropped = 0        # 대기 한도를 넘어 버린 텍스트 조각 수
+        self.dropped_bytes = 0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()  # 대기 크기/누락 수 (호출 스레드와 기록 스레드가 공유)
+        self._pending_bytes = 0
+        self._reported_drops = 0  # 누락 표시를 남긴 dropped_bytes
+        self._segment = None
+        self._sequence = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, text):
+        """기록할 텍스트 추가 (호출 스레드를 막지 않음, 대기 한도를 넘으면 버림)"""
+        if not text:
+            return
+        with self._lock:
+            if self._pending_bytes + len(text) > self.max_pending_bytes:
+                self.dropped += 1
+                self.dropped_bytes += len(text)
+                return
+            self._pending_bytes += len(text)
+        self._queue.put(text)
+
+    def snapshot(self, callback):
+        """지금까지 받은 데이터의 (파일 경로, 길이) 목록을 기다리지 않고 요청
+
+        대기 중인 데이터를 먼저 기록한 뒤 callback(segments, error)를 기록 스레드에서
+        호출하므로 요청 시점까지의 로그가 모두 포함된다. 실패하면 segments는 None.
+        """
+        if not self.is_alive():
+            callback(None, self.error or RuntimeError("로그 기록 스레드가 실행 중이 아닙니다."))
+            return
+        self._queue.put(('snapshot', callback))
+
+    def close(self):
+        """남은 데이터를 기록하고 스레드 종료"""
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = e
+            print(f"로그 기록 오류: {str(e)}")
+        finally:
+            if self._segment is not None:
+                self._segment.close()
+            self._fail_snapshots()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.FSYNC_INTERVAL)
+            except queue.Empty:
+                item = ''
+
+            # 쌓여 있는 텍스트를 한 번에 모아서 기록
+            texts = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, tuple):
+                    self._write_batch(texts)
+                    texts = []
+                    self._take_snapshot(item[1])
+                elif item:
+                    texts.append(item)
+                    with self._lock:
+                        self._pending_bytes -= len(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_batch(texts)
+            self._maybe_sync()
+            if stop:
+                break
+
+    def _open_segment(self):
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._sequence += 1
+        filename = f"{self.prefix}_{timestamp}_{self._sequence:03d}{self.EXTENSIONS[self.compression]}"
+        self._segment = _Segment(os.path.join(self.directory, filename), self.compression)
+
+    def _rotate_if_needed(self):
+        segment = self._segment
+        if segment is None:
+            return
+        if (segment.length >= self.max_bytes or
+                time.monotonic() - segment.created >= self.max_seconds):
+            segment.close()
+            self.segments.append((segment.path, segment.length))
+            self._segment = None
+            self._unsynced = 0
+
+    def _write_batch(self, texts):
+        with self._lock:
+            dropped = self.dropped_bytes - self._reported_drops
+            self._reported_drops = self.dropped_bytes
+        if dropped:  # 버린 텍스트는 지금 대기 중이던 텍스트보다 뒤에 들어온 것
+            texts.append(f"\n[로그 기록 지연으로 {dropped}자 누락]\n")
+        if not texts:
+            self._rotate_if_needed()
+            return
+        data = ''.join(texts).encode('utf-8')
+        if self._segment is None:
+            self._open_segment()
+        self._segment.write(data)
+        self._unsynced += len(data)
+        self._rotate_if_needed()
+
+    def _maybe_sync(self):
+        if self._segment is None or not self._unsynced:
+            return
+        now = time.monotonic()
+        if self._unsynced >= self.FSYNC_BYTES or now - self._last_sync >= self.FSYNC_INTERVAL:
+            self._segment.sync()
+            self._unsynced = 0
+            self._last_sync = now
+
+    def _take_snapshot(self, callback):
+        try:
+            if self._segment is not None and self._unsynced:
+                self._segment.sync()
+                self._unsynced = 0
+        except Exception as e:
+            callback(None, e)
+            raise
+        result = list(self.segments)
+        if self._segment is not None:
+            result.append((self._segment.path, self._segment.length))
+        callback(result, None)
+
+    def _fail_snapshots(self):
+        """스레드가 끝날 때 처리하지 못한 스냅샷 요청에 실패 알림"""
+        error = self.error or RuntimeError("로그 기록이 중지되었습니다.")
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, tuple):
+                item[1](None, error)
+
+
+def write_snapshot_manifest(path, segments, compression):
+    """스냅샷(파일 경로와 길이 목록)을 JSON 매니페스트로 저장"""
+    manifest = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'compression': compression,
+        'segments': [{'path': segment_path, 'length': length}
+                     for segment_path, length in segments],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def read_snapshot(manifest_path):
+    """스냅샷 매니페스트에 기록된 범위의 로그를 바이트 청크로 순서대로 반환"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    opener = {
+        None: lambda path: open(path, 'rb'),
+        'gzip': lambda path: gzip.open(path, 'rb'),
+        'zstd': lambda path: zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')),
+    }[manifest['compression']]
+
+    for segment in manifest['segments']:
+        remaining = segment['length']
+        with opener(segment['path']) as f:
+            while remaining > 0:
+                try:
+                    data = f.read(min(remaining, 1024 * 1024))
+                except EOFError:
+                    break  # 기록 중인 압축 파일의 끝
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
@@ -0,0 +1,212 @@
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_right
+
+try:
+    import numpy
+except ImportError:  # numpy가 없으면 정규식으로 줄바꿈 스캔
+    numpy = None
+
+# 스캔이 끝난 페이지를 프로세스 상주 메모리에서 내리기 위한 madvise 플래그 (Linux/macOS)
+_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+
+class MappedLogFile:
+    """저장된 로그 파일을 mmap으로 열어 필요한 줄만 읽는 읽기 전용 파일
+
+    파일 전체를 메모리에 올리지 않고, STRIDE 줄마다 시작 오프셋만 기록하는
+    희소 인덱스를 만든다. 인덱스는 build_index()로 (보통 백그라운드 스레드에서)
+    블록 단위로 줄바꿈을 한 번에 스캔하며 만든다.
+    줄 번호는 0부터 시작한다.
+    """
+
+    STRIDE = 64
+    BLOCK_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        # 빈 파일은 mmap할 수 없음
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self._marks = array('Q', [0])  # STRIDE 줄 단위 시작 오프셋
+        self.line_count = 0           # 지금까지 인덱싱된 줄 수
+        self.indexed = False
+
+    def build_index(self, progress=None, should_stop=None):
+        """줄 오프셋 인덱스 생성
+
+        progress(줄 수, 진행률)는 블록마다 호출되고,
+        should_stop()이 True를 반환하면 중단한다.
+        """
+        if numpy is not None:
+            scan = self._scan_numpy
+        else:
+            scan = self._scan_regex
+
+        for line_count, position in scan():
+            self.line_count = line_count
+            if should_stop is not None and should_stop():
+                return False
+            if progress is not None:
+                progress(line_count, position / self.size if self.size else 1.0)
+
+        # 마지막 줄이 줄바꿈 없이 끝나면 한 줄로 포함
+        last = self._marks[-1]
+        tail_lines = self._map[last:].count(b'\n')
+        line_count = (len(self._marks) - 1) * self.STRIDE + tail_lines
+        if self.size and self._map[-1:] != b'\n':
+            line_count += 1
+        self.line_count = line_count
+        self.indexed = True
+        if progress is not None:
+            progress(line_count, 1.0)
+        return True
+
+    def _scan_numpy(self):
+        """numpy로 블록 내 줄바꿈 위치를 한 번에 찾아 STRIDE 번째마다 기록"""
+        stride = self.STRIDE
+        carry = 0  # 직전 마크 이후 지나온 줄 수
+        position = 0
+        while position < self.size:
+            end = min(self.size, position + self.BLOCK_SIZE)
+            block = numpy.frombuffer(self._map, dtype=numpy.uint8,
+                                     count=end - position, offset=position)
+            newlines = numpy.flatnonzero(block == 10)
+            marks = newlines[stride - 1 - carry::stride] + (position + 1)
+            # 파일 끝 위치는 새 줄의 시작이 아님
+            self._marks.extend(int(mark) for mark in marks if mark < self.size)
+            carry = (carry + len(newlines)) % stride
+            del block
+            self._release(position, end)
+            position = end
+            yield (len(self._marks) - 1) * stride + carry, position
+
+    def _scan_regex(self):
+        """정규식 엔진으로 STRIDE 줄씩 건너뛰며 마크 기록"""
+        pattern = re.compile(rb'(?:[^\n]*\n){%d}' % self.STRIDE)
+        position = 0
+        window = self.BLOCK_SIZE
+        while position < self.size:
+            end = min(self.size, position + window)
+            last = position
+            for match in pattern.finditer(self._map, position, end):
+                last = match.end()
+                if last < self.size:
+                    self._marks.append(last)
+            if last == position:
+                if end == self.size:
+                    break
+                window *= 2  # 아주 긴 줄: 블록을 넓혀서 다시 스캔
+                continue
+            self._release(position, last)
+            position = last
+            yield (len(self._marks) - 1) * self.STRIDE, position
+
+    def _release(self, start, end):
+        """스캔한 구간의 페이지 매핑 해제 (파일 캐시는 그대로라 다시 읽어도 빠름)"""
+        if _DONTNEED is None or not isinstance(self._map, mmap.mmap):
+            return
+        start -= start % mmap.PAGESIZE
+        if end > start:
+            self._map.madvise(_DONTNEED, start, end - start)
+
+    def line_offset(self, line_no):
+        """줄 시작 바이트 오프셋"""
+        block, skip = divmod(line_no, self.STRIDE)
+        offset = self._marks[block]
+        for _ in range(skip):
+            offset = self._map.find(b'\n', offset) + 1
+        return offset
+
+    def line_at(self, offset):
+        """바이트 오프셋이 속한 줄 번호"""
+        block = bisect_right(self._marks, offset) - 1
+        return block * self.STRIDE + self._map[self._marks[block]:offset].count(b'\n')
+
+    def get_lines(self, start, end):
+        """[start, end) 범위의 줄 목록 반환"""
+        end = min(end, self.line_count)
+        if start >= end:
+            return []
+        first = self.line_offset(start)
+        offset = first
+        for _ in range(end - start):
+            offset = self._map.find(b'\n', offset) + 1
+            if offset == 0:
+                offset = self.size
+                break
+        text = self._map[first:offset].decode('utf-8', errors='replace')
+        lines = text.split('\n')
+        if lines and lines[-1] == '':
+            lines.pop()
+        return [line.rstrip('\r') for line in lines]
+
+    def get_line(self, line_no):
+        lines = self.get_lines(line_no, line_no + 1)
+        return lines[0] if lines else None
+
+    def search(self, text, regex=False, case_sensitive=False, should_stop=None):
+        """검색어가 포함된 줄 번호를 블록 단위 목록으로 반환
+
+        리터럴 검색은 블록을 통째로 find(대소문자 무시면 lower 후)하고,
+        정규식은 bytes 정규식으로 검색한다 (대소문자 무시는 ASCII 기준).
+        """
+        pattern = compile_bytes_query(text, regex, case_sensitive) if regex else None
+        needle = text.encode('utf-8') if case_sensitive else text.encode('utf-8').lower()
+        line_no = 0
+        position = 0
+        while position < self.size:
+            if should_stop is not None and should_stop():
+                return
+            # 블록을 줄 경계에서 자름
+            end = min(self.size, position + self.BLOCK_SIZE)
+            if end < self.size:
+                cut = self._map.rfind(b'\n', position, end)
+                end = self._map.find(b'\n', end) + 1 if cut < 0 else cut + 1
+                if end == 0:
+                    end = self.size
+
+            data = self._map[position:end]
+            self._release(position, end)
+            if pattern is None and not case_sensitive:
+                data = data.lower()
+
+            results = []
+            last_pos = 0
+            search_pos = 0
+            while True:
+                if pattern is None:
+                    start = data.find(needle, search_pos)
+                else:
+                    match = pattern.search(data, search_pos)
+                    start = match.start() if match else -1
+                if start < 0:
+                    break
+                line_no += data.count(b'\n', last_pos, start)
+                last_pos = start
+                results.append(line_no)
+                # 같은 줄의 다음 일치는 건너뜀
+                search_pos = data.find(b'\n', start) + 1
+                if search_pos == 0:
+                    break
+            line_no += data.count(b'\n', last_pos)
+            position = end
+            if results:
+                yield results
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+def compile_bytes_query(text, regex=False, case_sensitive=False):
+    """mmap 검색용 bytes 정규식 컴파일 (대소문자 무시는 ASCII 기준)"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    pattern = text.encode('utf-8')
+    if not regex:
+        pattern = re.escape(pattern)
+    return re.compile(pattern, flags)
@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Histogram:
+    """고정 구간(ms) 히스토그램 (관측 비용이 작아 수신 경로에서 바로 기록)"""
+
+    BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms):
+        self.counts[bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, fraction):
+        """구간 상한 기준 근사 백분위수 (관측이 없으면 0)"""
+        if not self.count:
+            return 0.0
+        target = self.count * fraction
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'max': round(self.max, 3),
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+
+class PortMetrics:
+    """포트 하나의 측정값
+
+    카운터/게이지는 collect()가 호출될 때 각 구성요소(브로커, 모니터, 큐)에서 읽어오고,
+    지연 시간은 히스토그램에 직접 기록한다.
+    - delivery_ms: 리더가 큐에 넣은 청크가 GUI 스레드에서 꺼내질 때까지의 시간
+    - apply_ms: LogViewer가 꺼낸 텍스트를 화면/버퍼에 반영하는 데 걸린 시간
+    """
+
+    def __init__(self, name, collect=None):
+        self.name = name
+        self.collect = collect
+        self.histograms = {
+            'delivery_ms': Histogram(),
+            'apply_ms': Histogram(),
+        }
+
+    def observe(self, name, value_ms):
+        self.histograms[name].observe(value_ms)
+
+    def snapshot(self):
+        values = {}
+        if self.collect is not None:
+            try:
+                values = self.collect()
+            except Exception as e:
+                values = {'error': str(e)}
+        return {
+            'port': self.name,
+            'values': values,
+            'histograms': {name: h.as_dict() for name, h in self.histograms.items()},
+        }
+
+
+class MetricsRegistry:
+    """열려 있는 포트별 측정값 목록"""
+
+    def __init__(self):
+        self._ports = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, collect=None):
+        """포트 측정값 등록 (같은 이름이 있으면 교체) 후 PortMetrics 반환"""
+        metrics = PortMetrics(name, collect)
+        with self._lock:
+            self._ports[name] = metrics
+        return metrics
+
+    def unregister(self, metrics):
+        with self._lock:
+            if self._ports.get(metrics.name) is metrics:
+                del self._ports[metrics.name]
+
+    def snapshot(self):
+        """모든 포트의 현재 측정값 (JSON으로 변환 가능한 dict)"""
+        with self._lock:
+            ports = list(self._ports.values())
+        return {'time': time.time(), 'ports': [metrics.snapshot() for metrics in ports]}
+
+
+class RateTracker:
+    """두 스냅샷 사이의 카운터 증가량으로 초당 변화율 계산 (소비자마다 하나씩 사용)"""
+
+    def __init__(self, keys=('bytes_read', 'lines', 'dropped')):
+        self.keys = keys
+        self._last = {}
+
+    def rates(self, snapshot):
+        """포트 이름 -> {키: 초당 증가량}"""
+        now = snapshot['time']
+        result = {}
+        for port in snapshot['ports']:
+            values = port['values']
+            previous = self._last.get(port['port'])
+            rates = {}
+            if previous is not None and now > previous[0]:
+                for key in self.keys:
+                    if key in values and key in previous[1]:
+                        rates[key] = max(0.0, (values[key] - previous[1][key]) / (now - previous[0]))
+            result[port['port']] = rates
+            self._last[port['port']] = (now, values)
+        return result
+
+
+def format_prometheus(snapshot, prefix='serialpy'):
+    """스냅샷을 Prometheus 텍스트 형식으로 변환"""
+    lines = []
+    for port in snapshot['ports']:
+        label = port['port'].replace('\\', '\\\\').replace('"', '\\"')
+        for key, value in port['values'].items():
+            if isinstance(value, (int, float)):
+                lines.append(f'{prefix}_{key}{{port="{label}"}} {value}')
+        for name, histogram in port['histograms'].items():
+            metric = f'{prefix}_{name}'
+            cumulative = 0
+            for bound, count in histogram['buckets'].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{port="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{port="{label}"}} {histogram["sum"]}')
+            lines.append(f'{metric}_count{{port="{label}"}} {histogram["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def append_json_line(path, snapshot):
+    """스냅샷 한 줄을 JSON Lines 파일에 추가"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(snapshot, ensure_ascii=False) + '\n')
+
+
+class MetricsServer:
+    """localhost에서 측정값을 제공하는 HTTP 서버 (/metrics: Prometheus, /metrics.json: JSON)"""
+
+    def __init__(self, registry, port=9464, host='127.0.0.1'):
+        self.registry = registry
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                snapshot = registry_ref.snapshot()
+                if self.path.startswith('/metrics.json'):
+                    body = json.dumps(snapshot, ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                elif self.path.startswith('/metrics'):
+                    body = format_prometheus(snapshot).encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 요청마다 콘솔 출력하지 않음
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.address = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        return f"http://{self.address[0]}:{self.address[1]}/metrics"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+_registry = MetricsRegistry()
+
+
+def metrics_registry():
+    """프로세스 공용 측정값 목록"""
+    return _registry
@@ -13,3 +13,29 @@ def get_available_ports():
             if 'USB' in port.description:
                 ports.append(port.device)
     return ports
+
+def _identity(port):
+    if port.serial_number:
+        return f"usb:{port.serial_number}"
+    if port.vid is not None:
+        return f"usb:{port.vid:04X}:{port.pid:04X}@{port.location or port.device}"
+    return port.device
+
+def port_identity(device):
+    """포트를 다시 꽂아도 바뀌지 않는 식별자 (USB 시리얼 번호 > VID:PID@위치 > 장치 이름)"""
+    return port_identities([device])[device]
+
+def port_identities(devices):
+    """여러 포트의 식별자를 포트 목록을 한 번만 조회해 반환 → {장치 이름: 식별자}"""
+    identities = {device: device for device in devices}
+    for port in serial.tools.list_ports.comports():
+        if port.device in identities:
+            identities[port.device] = _identity(port)
+    return identities
+
+def usb_port(device):
+    """장치 이름에 해당하는 USB 포트 정보 (VID/PID/시리얼 번호, USB 장치가 아니면 None)"""
+    for port in serial.tools.list_ports.comports():
+        if port.device == device:
+            return port if port.vid is not None else None
+    return None
@@ -0,0 +1,96 @@
+"""CommandEngine 응답 짝짓기 테스트 (로컬 pty, Linux/macOS)
+
+사용법:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import threading
+import time
+import tty
+import unittest
+
+import serial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.serial.core.broker import port_broker  # noqa: E402
+from src.serial.core.protocol import CommandEngine, CommandTimeout, parse_fields  # noqa: E402
+
+READ_COMMAND = "db r model"
+READ_END = "serial_number ="
+
+
+class SlowDevice(threading.Thread):
+    """'db r model'에 차례로 응답하는 장치 (replies: [(지연 초, 시리얼 번호), ...])"""
+
+    def __init__(self, master, replies):
+        super().__init__(daemon=True)
+        self.master = master
+        self.replies = list(replies)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        line = b''
+        while not self._stop_event.is_set():
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                return
+            line += data
+            while b'\n' in line:
+                command, line = line.split(b'\n', 1)
+                if command.strip().decode() == READ_COMMAND and self.replies:
+                    delay, serial_number = self.replies.pop(0)
+                    if self._stop_event.wait(delay):
+                        return
+                    os.write(self.master, f"model_name = EVS\r\nserial_number = "
+                                          f"{serial_number}\r\n> ".encode())
+
+    def stop(self):
+        self._stop_event.set()
+
+
+@unittest.skipIf(os.name == 'nt', "pty 필요")
+class CommandEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.master, slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(slave)
+        self.port = serial.Serial(os.ttyname(slave), baudrate=921600, timeout=1)
+        os.close(slave)
+        self.engine = CommandEngine(port_broker().attach(self.port), timeout=0.2)
+
+    def tearDown(self):
+        self.engine.close()
+        port_broker().close(self.port)
+        os.close(self.master)
+
+    def test_late_reply_is_not_matched_to_next_command(self):
+        # 첫 응답이 시간 초과 뒤에 오고, 바로 다시 보낸 명령의 응답은 그 뒤에 옴
+        device = SlowDevice(self.master, [(0.35, 'STALE'), (0.0, 'FRESH')])
+        device.start()
+        try:
+            with self.assertRaises(CommandTimeout):
+                self.engine.send(READ_COMMAND, READ_END).result(2)
+            response = self.engine.send(READ_COMMAND, READ_END, timeout=1.0).result(2)
+            self.assertEqual(parse_fields(response.lines)['serial_number'], 'FRESH')
+        finally:
+            device.stop()
+
+    def test_placeholder_is_dropped_when_no_reply_comes(self):
+        # 늦은 응답이 끝내 오지 않아도 자리표시는 timeout 뒤에 없어져 다음 명령을 막지 않음
+        device = SlowDevice(self.master, [(5.0, 'NEVER')])
+        device.start()
+        try:
+            with self.assertRaises(CommandTimeout):
+                self.engine.send(READ_COMMAND, READ_END).result(2)
+            time.sleep(0.3)
+            self.assertEqual(len(self.engine._pending), 0)
+        finally:
+            device.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()